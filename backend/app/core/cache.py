@@ -0,0 +1,117 @@
+"""
+Cache mémoire borné avec expiration.
+
+TTLCache est un LRU de taille maximale fixe dont chaque entrée expire après un
+délai (TTL, ou jamais si ttl=None : l'entrée ne quitte le cache que par
+éviction). Il est sûr entre threads : les routes, le pool de threads de la
+base et les threads de fond peuvent le partager. Chaque cache nommé est
+enregistré pour que ses métriques (taux de succès, évictions) apparaissent
+dans /admin/metrics.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+# Caches nommés, exposés par get_cache_stats()
+_registry = {}
+_registry_lock = threading.Lock()
+
+class TTLCache:
+    """Cache LRU borné dont les entrées expirent après `ttl` secondes (None : pas d'expiration)"""
+
+    def __init__(self, name, maxsize, ttl):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # clé -> (expiration, valeur), de la moins à la plus récemment utilisée
+        self._lock = threading.Lock()
+        # Métriques
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+        with _registry_lock:
+            _registry[name] = self
+
+    def get(self, key, default=None):
+        """Valeur associée à key, ou default si elle est absente ou expirée"""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self._misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self._expirations += 1
+                self._misses += 1
+                return default
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        """Ajoute ou remplace une entrée ; `ttl` remplace le délai par défaut du cache"""
+        if self.maxsize <= 0:
+            return
+        ttl = self.ttl if ttl is None else ttl
+        if ttl is not None and ttl <= 0:
+            return
+        expires_at = time.monotonic() + ttl if ttl is not None else math.inf
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def pop(self, key, default=None):
+        """Retire une entrée et retourne sa valeur, ou default si elle est absente ou expirée"""
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+        if entry is _MISSING or entry[0] <= time.monotonic():
+            return default
+        return entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def purge_expired(self):
+        """Retire les entrées expirées ; retourne leur nombre"""
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, (expires_at, _) in self._data.items() if expires_at <= now]
+            for key in expired:
+                del self._data[key]
+            self._expirations += len(expired)
+        return len(expired)
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        """Métriques du cache"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
+
+def get_cache_stats():
+    """Métriques de tous les caches nommés"""
+    with _registry_lock:
+        caches = list(_registry.values())
+    return {cache.name: cache.stats() for cache in caches}
@@ -4,55 +4,95 @@ from jose import JWTError, jwt
 import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from ..core.cache import TTLCache
 from ..core.config import settings
-from ..db.database import get_user_by_email, get_user_by_id
+from ..db.database import get_user_by_email, get_password_hash, peek_user_by_id_cached
+from ..db.async_queries import get_user_by_id_cached_async, update_user_async
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import functools
+import hashlib
+import hmac
+import secrets
+import time
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-# Cache pour les vérifications de mot de passe récentes (5 minutes)
-password_verify_cache = {}
+# Vérifications de mot de passe réussies récemment (5 minutes). La clé est un HMAC
+# du mot de passe et du hash, avec une clé aléatoire propre au processus : le
+# cache ne contient jamais de mot de passe en clair ni de valeur réutilisable
+_password_cache_key = secrets.token_bytes(32)
+password_verify_cache = TTLCache("password_verify", maxsize=settings.PASSWORD_CACHE_SIZE, ttl=300)
+
+def _password_cache_key_for(plain_password: str, hashed_password: str) -> str:
+    message = plain_password.encode() + b"\0" + hashed_password.encode()
+    return hmac.new(_password_cache_key, message, hashlib.sha256).hexdigest()
+
+# bcrypt coûte des centaines de millisecondes de CPU par appel (et libère le GIL) :
+# les routes async l'exécutent dans ce pool borné, jamais dans la boucle d'événements
+_password_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+
+def _is_cached_verification(plain_password: str, hashed_password: Optional[str]) -> bool:
+    return bool(hashed_password) and bool(
+        password_verify_cache.get(_password_cache_key_for(plain_password, hashed_password))
+    )
 
 # Fonctions de vérification mot de passe
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash using bcrypt with cache optimization"""
-    # Clé de cache (combinaison du mot de passe en clair et du hash)
-    cache_key = f"{plain_password}:{hashed_password}"
-    current_time = datetime.utcnow()
-    
-    # Vérifier si la combinaison existe dans le cache et est encore valide
-    if cache_key in password_verify_cache:
-        timestamp, result = password_verify_cache[cache_key]
-        # Valide pour 5 minutes
-        if (current_time - timestamp).total_seconds() < 300:
-            return result
+    if _is_cached_verification(plain_password, hashed_password):
+        return True
     
     # Si pas dans le cache ou expiré, vérifier avec bcrypt
     try:
         result = bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
-        # Stocker dans le cache
-        password_verify_cache[cache_key] = (current_time, result)
-        return result
     except Exception:
         # En cas d'erreur, retourner False par sécurité
         return False
     
-# Purge périodique du cache (cache limité à 100 entrées)
-def purge_password_cache():
-    """Purge les entrées de cache expirées ou si le cache dépasse 100 entrées"""
-    global password_verify_cache
-    current_time = datetime.utcnow()
-    
-    # Conserver uniquement les entrées de moins de 10 minutes
-    password_verify_cache = {
-        k: v for k, v in password_verify_cache.items() 
-        if (current_time - v[0]).total_seconds() < 600
-    }
+    # Seuls les succès sont mis en cache : des tentatives erronées (bourrage
+    # d'identifiants) n'évincent pas les vérifications utiles
+    if result:
+        password_verify_cache.set(_password_cache_key_for(plain_password, hashed_password), True)
+    return result
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password exécuté dans le pool bcrypt (le cache est consulté sans changer de thread)"""
+    if _is_cached_verification(plain_password, hashed_password):
+        return True
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash exécuté dans le pool bcrypt"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, get_password_hash, password)
+
+def password_needs_rehash(hashed_password: Optional[str]) -> bool:
+    """Vrai si le hash a été calculé avec un autre coût que BCRYPT_ROUNDS"""
+    try:
+        # Format bcrypt : $2b$<coût>$<sel et hash>
+        return int(hashed_password.split("$")[2]) != settings.BCRYPT_ROUNDS
+    except (AttributeError, IndexError, ValueError):
+        return False
+
+async def rehash_password_if_needed(user: dict, plain_password: str):
+    """
+    Recalcule le hash d'un utilisateur qui vient de s'authentifier si BCRYPT_ROUNDS a
+    changé depuis son calcul (le mot de passe en clair n'est connu qu'à la connexion)
+    """
+    if not password_needs_rehash(user.get("hashed_password")):
+        return
+    hashed_password = await get_password_hash_async(plain_password)
+    await update_user_async(user["id"], {"hashed_password": hashed_password})
+
+def shutdown_password_executor():
+    """Arrête le pool bcrypt"""
+    _password_executor.shutdown(wait=True)
     
-    # Si le cache est toujours trop grand, conserver seulement les 50 entrées les plus récentes
-    if len(password_verify_cache) > 100:
-        sorted_cache = sorted(password_verify_cache.items(), key=lambda x: x[1][0], reverse=True)
-        password_verify_cache = dict(sorted_cache[:50])
+def purge_password_cache():
+    """Purge les vérifications de mot de passe expirées"""
+    password_verify_cache.purge_expired()
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Créer un token JWT pour l'authentification"""
@@ -67,22 +107,50 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
     return encoded_jwt
 
+# Tokens déjà validés -> ID utilisateur, jusqu'à l'expiration du token au plus tard
+token_cache = TTLCache(
+    "tokens",
+    maxsize=settings.USER_CACHE_SIZE if settings.ENABLE_CACHE else 0,
+    ttl=settings.CACHE_TTL
+)
+
+def _decode_token_user_id(token: str) -> Optional[str]:
+    """ID utilisateur d'un token JWT valide (décodage mis en cache), ou None"""
+    user_id = token_cache.get(token)
+    if user_id is not None:
+        return user_id
+    
+    # Lève JWTError si la signature est invalide ou le token expiré
+    payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+    user_id = payload.get("sub")
+    if user_id is None:
+        return None
+    
+    expires_in = payload["exp"] - time.time() if "exp" in payload else settings.CACHE_TTL
+    token_cache.set(token, user_id, ttl=min(settings.CACHE_TTL, expires_in))
+    return user_id
+
 async def get_current_user(token: str = Depends(oauth2_scheme)):
-    """Valider un token JWT et récupérer l'utilisateur correspondant"""
+    """
+    Valider un token JWT et récupérer l'utilisateur correspondant
+    
+    Chemin rapide (token et utilisateur en cache) : deux recherches en mémoire,
+    sans décodage du token ni accès à la base.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        # Décodage du token
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
-        user_id: str = payload.get("sub")
+        user_id = _decode_token_user_id(token)
         if user_id is None:
             raise credentials_exception
             
-        # Récupération de l'utilisateur
-        user = get_user_by_id(user_id)
+        # Récupération de l'utilisateur (cache, puis base de données)
+        user = peek_user_by_id_cached(user_id)
+        if user is None:
+            user = await get_user_by_id_cached_async(user_id)
         if user is None:
             raise credentials_exception
             
@@ -0,0 +1,81 @@
+"""
+Accès asynchrone à la base de données pour les routes FastAPI.
+
+Les fonctions de requête (queries.py, client_queries.py, ...) sont synchrones :
+appelées directement depuis une route `async def`, elles bloquent la boucle
+d'événements et donc toutes les requêtes en cours, le temps d'une requête lente
+ou d'une attente de connexion.
+
+Chaque fonction `xxx_async` exécute la fonction synchrone `xxx` dans un pool de
+threads dédié à la base, dimensionné comme le pool de connexions : un thread de
+ce pool ne tient jamais plus d'une connexion et n'attend pas qu'une se libère
+à cause des autres threads du même pool.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from ..core.config import settings
+from . import client_queries, database, queries, transcript_queries, upload_queries
+
+_executor = ThreadPoolExecutor(max_workers=settings.DB_POOL_SIZE, thread_name_prefix="db")
+
+async def run_db(fn, *args, **kwargs):
+    """Exécute une fonction synchrone d'accès à la base dans le pool de threads dédié"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(fn, *args, **kwargs))
+
+def _async(fn):
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return await run_db(fn, *args, **kwargs)
+    wrapper.__name__ = f"{fn.__name__}_async"
+    return wrapper
+
+def shutdown_db_executor():
+    """Attend la fin des requêtes en cours et arrête le pool de threads"""
+    _executor.shutdown(wait=True)
+
+# Utilisateurs
+create_user_async = _async(database.create_user)
+get_user_by_id_async = _async(database.get_user_by_id)
+get_user_by_id_cached_async = _async(database.get_user_by_id_cached)
+get_user_by_email_async = _async(database.get_user_by_email)
+get_user_by_email_cached_async = _async(database.get_user_by_email_cached)
+get_user_by_oauth_async = _async(database.get_user_by_oauth)
+update_user_async = _async(database.update_user)
+
+# Réunions
+create_meeting_async = _async(queries.create_meeting)
+get_meeting_async = _async(queries.get_meeting)
+list_meetings_page_async = _async(queries.list_meetings_page)
+update_meeting_async = _async(queries.update_meeting)
+delete_meeting_async = _async(queries.delete_meeting)
+get_meeting_by_transcript_id_async = _async(queries.get_meeting_by_transcript_id)
+
+# Locuteurs
+get_meeting_speakers_async = _async(queries.get_meeting_speakers)
+set_meeting_speaker_async = _async(queries.set_meeting_speaker)
+delete_meeting_speaker_async = _async(queries.delete_meeting_speaker)
+get_custom_speaker_name_async = _async(queries.get_custom_speaker_name)
+
+# Clients
+create_client_async = _async(client_queries.create_client)
+get_client_async = _async(client_queries.get_client)
+get_clients_async = _async(client_queries.get_clients)
+update_client_async = _async(client_queries.update_client)
+delete_client_async = _async(client_queries.delete_client)
+
+# Sessions d'upload
+create_upload_session_async = _async(upload_queries.create_upload_session)
+get_upload_session_async = _async(upload_queries.get_upload_session)
+update_upload_session_async = _async(upload_queries.update_upload_session)
+delete_upload_session_async = _async(upload_queries.delete_upload_session)
+claim_upload_write_async = _async(upload_queries.claim_upload_write)
+renew_upload_write_async = _async(upload_queries.renew_upload_write)
+release_upload_write_async = _async(upload_queries.release_upload_write)
+start_upload_finalization_async = _async(upload_queries.start_upload_finalization)
+
+# Transcriptions structurées
+get_transcript_data_async = _async(transcript_queries.get_transcript_data)
@@ -0,0 +1,107 @@
+"""
+Cache des résultats coûteux (table result_cache), adressé par le contenu.
+
+Chaque entrée est identifiée par un type (kind : "summary", "transcript") et une
+clé, empreinte SHA-256 de tout ce qui détermine le résultat (voir
+services/result_cache.py). La valeur est un JSON compressé zlib.
+
+La taille totale est bornée par RESULT_CACHE_MAX_MB : à chaque ajout, les
+entrées les moins récemment utilisées sont supprimées jusqu'à revenir sous la
+limite. Les entrées inutilisées depuis RESULT_CACHE_IDLE_DAYS sont purgées par
+l'instance qui exécute les balayages périodiques.
+"""
+
+import json
+import time
+import zlib
+
+from ..core.config import settings
+from .database import get_db_connection, release_db_connection, execute_write
+
+def get_cached_result(kind, key):
+    """Valeur en cache pour (kind, key), ou None ; un succès rafraîchit la date d'utilisation"""
+    conn = get_db_connection()
+    try:
+        row = conn.execute(
+            "SELECT data FROM result_cache WHERE kind = ? AND key = ?",
+            (kind, key)
+        ).fetchone()
+    finally:
+        release_db_connection(conn)
+    if not row:
+        return None
+
+    execute_write(lambda conn: conn.execute(
+        "UPDATE result_cache SET hits = hits + 1, last_used_at = ? WHERE kind = ? AND key = ?",
+        (time.time(), kind, key)
+    ))
+    return json.loads(zlib.decompress(row["data"]).decode("utf-8"))
+
+def put_cached_result(kind, key, value):
+    """
+    Mettre en cache la valeur (sérialisable en JSON) de (kind, key), puis évincer les
+    entrées les moins récemment utilisées au-delà de RESULT_CACHE_MAX_MB.
+
+    Returns:
+        bool: False si la valeur dépasse RESULT_CACHE_MAX_ENTRY_MB (non conservée)
+    """
+    blob = zlib.compress(json.dumps(value, ensure_ascii=False).encode("utf-8"), 6)
+    if len(blob) > settings.RESULT_CACHE_MAX_ENTRY_MB * 1024 * 1024:
+        return False
+    max_bytes = settings.RESULT_CACHE_MAX_MB * 1024 * 1024
+
+    def write(conn):
+        now = time.time()
+        conn.execute(
+            """
+            INSERT INTO result_cache (kind, key, data, size_bytes, hits, created_at, last_used_at)
+            VALUES (?, ?, ?, ?, 0, ?, ?)
+            ON CONFLICT (kind, key) DO UPDATE SET
+                data = excluded.data,
+                size_bytes = excluded.size_bytes,
+                created_at = excluded.created_at,
+                last_used_at = excluded.last_used_at
+            """,
+            (kind, key, blob, len(blob), now, now)
+        )
+        total = int(conn.execute("SELECT COALESCE(SUM(size_bytes), 0) AS total FROM result_cache").fetchone()["total"])
+        if total <= max_bytes:
+            return True
+
+        # Éviction LRU (l'entrée ajoutée, la plus récente, est conservée)
+        rows = conn.execute(
+            "SELECT kind, key, size_bytes FROM result_cache WHERE NOT (kind = ? AND key = ?) ORDER BY last_used_at",
+            (kind, key)
+        ).fetchall()
+        for row in rows:
+            if total <= max_bytes:
+                break
+            conn.execute("DELETE FROM result_cache WHERE kind = ? AND key = ?", (row["kind"], row["key"]))
+            total -= row["size_bytes"]
+        return True
+
+    return execute_write(write)
+
+def purge_idle_results(idle_seconds=None):
+    """Supprimer les entrées inutilisées depuis plus de idle_seconds (RESULT_CACHE_IDLE_DAYS par défaut)"""
+    if idle_seconds is None:
+        idle_seconds = settings.RESULT_CACHE_IDLE_DAYS * 86400
+    return execute_write(lambda conn: conn.execute(
+        "DELETE FROM result_cache WHERE last_used_at < ?",
+        (time.time() - idle_seconds,)
+    ).rowcount)
+
+def get_cache_stats():
+    """Nombre d'entrées, taille et succès du cache par type"""
+    conn = get_db_connection()
+    try:
+        rows = conn.execute(
+            """
+            SELECT kind, COUNT(*) AS entries, COALESCE(SUM(size_bytes), 0) AS size_bytes,
+                   COALESCE(SUM(hits), 0) AS hits
+            FROM result_cache GROUP BY kind ORDER BY kind
+            """
+        ).fetchall()
+        return {row["kind"]: {key: int(row[key]) for key in ("entries", "size_bytes", "hits")} for row in rows}
+    finally:
+        release_db_connection(conn)
@@ -4,8 +4,15 @@ from pathlib import Path
 import bcrypt
 import uuid
 from datetime import datetime
+import functools
 import threading
 import time
+from collections import deque
+from contextlib import contextmanager
+
+from ..core.cache import TTLCache
+from ..core.config import settings
+from .writer import DatabaseWriter, open_write_connection
 
 # Chemin de la base de données
 # Utiliser le disque persistant Render si disponible, sinon utiliser le chemin par défaut
@@ -13,55 +20,226 @@ import time
 RENDER_DISK_PATH = os.environ.get("RENDER_DISK_PATH", "/data")
 DB_PATH = Path(RENDER_DISK_PATH) / "app.db" if os.path.exists(RENDER_DISK_PATH) else Path(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))) / "app.db"
 
-# Gestionnaire de connexions par thread pour SQLite
-class ThreadLocalConnectionManager:
-    def __init__(self, db_path):
-        self.db_path = db_path
+# Backend choisi par DATABASE_URL : SQLite (par défaut, fichier DB_PATH) ou PostgreSQL
+DB_BACKEND = "postgresql" if settings.DATABASE_URL.startswith(("postgres://", "postgresql://")) else "sqlite"
+
+# Erreurs de base de données à intercepter, quel que soit le backend
+if DB_BACKEND == "postgresql":
+    from . import postgres
+    DB_ERRORS = (sqlite3.Error, postgres.Error)
+    DB_INTEGRITY_ERRORS = (sqlite3.IntegrityError, postgres.IntegrityError)
+else:
+    DB_ERRORS = (sqlite3.Error,)
+    DB_INTEGRITY_ERRORS = (sqlite3.IntegrityError,)
+
+class PoolTimeoutError(TimeoutError):
+    """Aucune connexion libre dans le pool avant l'expiration du délai d'attente"""
+
+def open_read_connection(db_path):
+    """
+    Connexion SQLite en lecture seule : les écritures passent par db_writer (WAL,
+    les lectures ne sont jamais bloquées par la transaction d'écriture en cours)
+    """
+    conn = sqlite3.connect(
+        f"{Path(db_path).resolve().as_uri()}?mode=ro",
+        uri=True,
+        timeout=60.0,
+        isolation_level=None,  # Pas de transaction implicite pour les lectures
+        check_same_thread=False  # Une connexion peut être rendue par un autre thread
+    )
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA busy_timeout = 30000')  # Attendre 30 secondes si la BD est occupée
+    return conn
+
+# Pool borné de connexions
+class ConnectionPool:
+    """
+    Pool de connexions de taille bornée (SQLite en lecture seule, ou PostgreSQL).
+    
+    - acquire()/release() réservent une connexion sans l'attacher au thread
+      (utilisé par la dépendance FastAPI get_db) ;
+    - get_connection()/release_connection() sont réentrantes par thread : un appel
+      imbriqué dans le même thread réutilise la connexion déjà réservée, qui
+      retourne au pool lorsque le dernier appel la libère.
+    
+    Une connexion rendue avec une transaction ouverte est annulée (rollback) ;
+    une connexion fermée par l'appelant est remplacée.
+    """
+    
+    def __init__(self, connect, size, timeout):
+        self._connect = connect
+        self.size = size
+        self.timeout = timeout
         self.local = threading.local()
-        
-    def get_connection(self):
-        # Vérifier si ce thread a déjà une connexion
-        if not hasattr(self.local, 'connection'):
-            # Créer une nouvelle connexion pour ce thread avec un timeout plus long
-            # et une configuration pour améliorer la gestion des verrous
-            self.local.connection = sqlite3.connect(
-                str(self.db_path),
-                timeout=60.0,  # Attendre jusqu'à 60 secondes pour les verrous
-                isolation_level='IMMEDIATE'  # Réduire les conflits de verrous
-            )
-            self.local.connection.row_factory = sqlite3.Row
+        self._idle = deque()
+        self._owned = set()
+        self._created = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        # Métriques
+        self._in_use = 0
+        self._waiters = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+    
+    def acquire(self, timeout=None):
+        """Réserver une connexion, en attendant au plus `timeout` secondes qu'une se libère"""
+        timeout = self.timeout if timeout is None else timeout
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Le pool de connexions est fermé")
             
-            # Configuration pour améliorer la performance et la stabilité
-            self.local.connection.execute('PRAGMA journal_mode = WAL')  # Write-Ahead Logging pour de meilleures performances
-            self.local.connection.execute('PRAGMA synchronous = NORMAL')  # Bon équilibre entre performance et sécurité
-            self.local.connection.execute('PRAGMA busy_timeout = 30000')  # Attendre 30 secondes si la BD est occupée
+            if not self._idle and self._created >= self.size:
+                self._waiters += 1
+                self._waits += 1
+                start = time.monotonic()
+                try:
+                    available = self._condition.wait_for(
+                        lambda: self._idle or self._created < self.size or self._closed,
+                        timeout=timeout
+                    )
+                finally:
+                    self._waiters -= 1
+                    waited = time.monotonic() - start
+                    self._wait_time_total += waited
+                    self._wait_time_max = max(self._wait_time_max, waited)
+                
+                if not available:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(
+                        f"Impossible d'obtenir une connexion à la base de données après {timeout}s "
+                        f"({self._in_use}/{self.size} connexions utilisées)"
+                    )
+                if self._closed:
+                    raise RuntimeError("Le pool de connexions est fermé")
             
-        return self.local.connection
+            if self._idle:
+                conn = self._idle.pop()
+            else:
+                # Réserver la place avant d'ouvrir la connexion hors du verrou
+                self._created += 1
+                conn = None
+            self._in_use += 1
+            self._checkouts += 1
+        
+        if conn is None:
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._condition:
+                    self._created -= 1
+                    self._in_use -= 1
+                    self._condition.notify()
+                raise
+            with self._condition:
+                self._owned.add(conn)
+        return conn
+    
+    def release(self, conn):
+        """Rendre une connexion réservée avec acquire()"""
+        try:
+            # Ne jamais rendre une transaction en cours (et détecter une connexion fermée)
+            if conn.in_transaction:
+                conn.rollback()
+            usable = True
+        except DB_ERRORS:
+            usable = False
+        
+        with self._condition:
+            if conn not in self._owned:
+                # Connexion d'un pool précédent (reset_db_pool)
+                if usable:
+                    conn.close()
+                return
+            self._in_use -= 1
+            if usable and not self._closed:
+                self._idle.append(conn)
+            else:
+                self._owned.discard(conn)
+                self._created -= 1
+                if usable:
+                    conn.close()
+            self._condition.notify()
+    
+    def get_connection(self):
+        # Réutiliser la connexion déjà réservée par ce thread (appels imbriqués)
+        conn = getattr(self.local, 'connection', None)
+        if conn is not None:
+            self.local.depth += 1
+            return conn
+        
+        conn = self.acquire()
+        self.local.connection = conn
+        self.local.depth = 1
+        return conn
     
     def release_connection(self, conn):
-        # Ne rien faire - la connexion reste attachée au thread
-        pass
+        if conn is None:
+            return
+        if getattr(self.local, 'connection', None) is conn:
+            self.local.depth -= 1
+            if self.local.depth > 0:
+                return
+            del self.local.connection
+        self.release(conn)
+    
+    @contextmanager
+    def connection(self):
+        """Connexion du pool pour la durée d'un bloc `with`"""
+        conn = self.get_connection()
+        try:
+            yield conn
+        finally:
+            self.release_connection(conn)
     
     def close_all(self):
-        # Cette méthode n'est pas vraiment utilisée, mais on la garde pour compatibilité
-        pass
-        
-    def close_thread_connection(self):
-        # Fermer la connexion du thread actuel si elle existe
-        if hasattr(self.local, 'connection'):
-            try:
-                self.local.connection.close()
-            except Exception as e:
-                print(f"Erreur lors de la fermeture de la connexion: {e}")
-            finally:
-                del self.local.connection
+        """Fermer les connexions libres ; les connexions en cours sont fermées à leur retour"""
+        with self._condition:
+            self._closed = True
+            while self._idle:
+                conn = self._idle.pop()
+                self._owned.discard(conn)
+                conn.close()
+                self._created -= 1
+            self._condition.notify_all()
+    
+    def stats(self):
+        """Métriques du pool"""
+        with self._condition:
+            return {
+                "size": self.size,
+                "open": self._created,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "waiters": self._waiters,
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "wait_time_total_ms": round(self._wait_time_total * 1000, 1),
+                "wait_time_max_ms": round(self._wait_time_max * 1000, 1),
+            }
 
-# Créer un gestionnaire de connexions par thread global
-db_pool = ThreadLocalConnectionManager(DB_PATH)
+def _create_pool():
+    if DB_BACKEND == "postgresql":
+        connect = functools.partial(postgres.connect, settings.DATABASE_URL)
+    else:
+        connect = functools.partial(open_read_connection, DB_PATH)
+    return ConnectionPool(connect, settings.DB_POOL_SIZE, settings.DB_POOL_TIMEOUT)
+
+# Créer le pool de connexions et l'écrivain globaux
+# (SQLite : thread d'écriture unique ; PostgreSQL : transaction par écriture sur le pool)
+db_pool = _create_pool()
+if DB_BACKEND == "postgresql":
+    db_writer = postgres.PostgresWriter(lambda: db_pool)
+else:
+    db_writer = DatabaseWriter(DB_PATH, settings.DB_WRITE_BATCH_SIZE, settings.DB_WRITE_BATCH_WAIT_MS / 1000)
 
 def get_password_hash(password: str) -> str:
-    """Hash a password using bcrypt"""
-    salt = bcrypt.gensalt()
+    """Hash a password using bcrypt (coût BCRYPT_ROUNDS)"""
+    salt = bcrypt.gensalt(settings.BCRYPT_ROUNDS)
     return bcrypt.hashpw(password.encode(), salt).decode()
 
 def get_db_connection():
@@ -72,18 +250,60 @@ def release_db_connection(conn):
     """Libérer une connexion pour la réutiliser"""
     db_pool.release_connection(conn)
 
+def db_connection():
+    """Context manager : `with db_connection() as conn: ...`"""
+    return db_pool.connection()
+
+def get_db():
+    """Dépendance FastAPI : connexion réservée pour la durée de la requête"""
+    pool = db_pool
+    conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
+
+def get_pool_stats():
+    """Métriques du pool de connexions (connexions utilisées, attentes, temps d'attente)"""
+    return db_pool.stats()
+
+def execute_write(fn, *args, **kwargs):
+    """
+    Exécuter une écriture et attendre son résultat.
+    
+    `fn(conn, *args, **kwargs)` reçoit la connexion en écriture et ne doit pas
+    appeler commit() : avec SQLite, elle s'exécute dans le thread d'écriture unique,
+    dans la transaction du lot en cours ; avec PostgreSQL, dans sa propre transaction.
+    """
+    return db_writer.execute(fn, *args, **kwargs)
+
+def get_writer_stats():
+    """Métriques du thread d'écriture (écritures, lots, taille moyenne des lots)"""
+    return db_writer.stats()
+
 def reset_db_pool():
-    """Réinitialiser le gestionnaire de connexions en cas de problème"""
+    """Réinitialiser le pool de connexions en cas de problème"""
     global db_pool
-    db_pool.close_all()
-    db_pool = ThreadLocalConnectionManager(DB_PATH)
+    old_pool = db_pool
+    db_pool = _create_pool()
+    old_pool.close_all()
     return True
 
 def init_db():
     """Initialiser la base de données avec les tables nécessaires"""
+    if DB_BACKEND == "postgresql":
+        conn = postgres.connect(settings.DATABASE_URL)
+        try:
+            postgres.init_postgres_db(conn)
+            print("Base de données PostgreSQL initialisée")
+        finally:
+            conn.close()
+        return
+    
     conn = None
     try:
-        conn = get_db_connection()
+        # Le schéma est créé avant le démarrage du thread d'écriture, sur une connexion dédiée
+        conn = open_write_connection(DB_PATH)
         cursor = conn.cursor()
         
         # Vérifier si le chemin de la base de données est sur le disque persistant Render
@@ -176,8 +396,13 @@ def init_db():
             cursor.execute("ALTER TABLE meetings ADD COLUMN summary_status TEXT DEFAULT NULL")
             print("Colonne summary_status ajoutée à la table meetings")
         
-        # Création d'index pour améliorer les performances
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_meeting_user ON meetings(user_id)')
+        # Index composites pour les requêtes fréquentes : liste paginée par utilisateur
+        # et balayages par statut, triés par (created_at, id) sans tri temporaire
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_meeting_user_created ON meetings(user_id, created_at DESC, id DESC)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_meeting_transcript_status ON meetings(transcript_status, created_at, id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_meeting_summary_status ON meetings(summary_status, created_at, id)')
+        # Ancien index sur user_id seul, couvert par idx_meeting_user_created
+        cursor.execute('DROP INDEX IF EXISTS idx_meeting_user')
         
         # Vérifier si la colonne client_id existe déjà dans meetings
         cursor.execute("PRAGMA table_info(meetings)")
@@ -187,6 +412,34 @@ def init_db():
         if 'client_id' not in columns:
             cursor.execute("ALTER TABLE meetings ADD COLUMN client_id TEXT")
             print("Colonne client_id ajoutée à la table meetings")
+        
+        # Colonnes décrivant le fichier audio stocké et le gain du transcodage
+        for column, column_type in [
+            ('audio_format', 'TEXT'),
+            ('original_size_bytes', 'INTEGER'),
+            ('stored_size_bytes', 'INTEGER'),
+            ('conversion_ms', 'INTEGER')
+        ]:
+            if column not in columns:
+                cursor.execute(f"ALTER TABLE meetings ADD COLUMN {column} {column_type}")
+                print(f"Colonne {column} ajoutée à la table meetings")
+        
+        # ID de transcription AssemblyAI, utilisé pour retrouver la réunion lors des webhooks
+        if 'transcript_id' not in columns:
+            cursor.execute("ALTER TABLE meetings ADD COLUMN transcript_id TEXT")
+            print("Colonne transcript_id ajoutée à la table meetings")
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_meeting_transcript_id ON meetings(transcript_id)')
+        
+        # Empreinte SHA-256 du fichier audio transmis à AssemblyAI (clé du cache des transcriptions)
+        if 'audio_sha256' not in columns:
+            cursor.execute("ALTER TABLE meetings ADD COLUMN audio_sha256 TEXT")
+            print("Colonne audio_sha256 ajoutée à la table meetings")
+        
+        # Version du rendu de la transcription, incrémentée à chaque renommage de locuteur
+        # ou modification du texte (clé du cache de rendu)
+        if 'speakers_version' not in columns:
+            cursor.execute("ALTER TABLE meetings ADD COLUMN speakers_version INTEGER NOT NULL DEFAULT 0")
+            print("Colonne speakers_version ajoutée à la table meetings")
             
         # Création de la table clients
         cursor.execute('''
@@ -219,11 +472,94 @@ def init_db():
         # Création d'index pour la table meeting_speakers
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_speaker_meeting ON meeting_speakers(meeting_id)')
         
+        # Création de la table upload_sessions pour les uploads reprenables par morceaux
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS upload_sessions (
+                id TEXT PRIMARY KEY,
+                user_id TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                content_type TEXT,
+                title TEXT,
+                client_id TEXT,
+                total_size INTEGER NOT NULL,
+                received_size INTEGER NOT NULL DEFAULT 0,
+                status TEXT NOT NULL DEFAULT 'uploading',
+                meeting_id TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users (id)
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_upload_session_user ON upload_sessions(user_id)')
+        
+        # Transcription structurée (utterances et horodatage des mots), JSON compressé zlib
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS meeting_transcripts (
+                meeting_id TEXT PRIMARY KEY,
+                transcript_id TEXT,
+                data BLOB NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (meeting_id) REFERENCES meetings (id)
+            )
+        ''')
+        
+        # File de tâches persistante (voir job_queries.py) ; dates d'exécution et de bail
+        # en secondes depuis l'epoch pour des comparaisons identiques sous SQLite et PostgreSQL
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                type TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                state TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                next_run_at REAL NOT NULL,
+                lease_owner TEXT,
+                lease_expires_at REAL,
+                dedupe_key TEXT,
+                last_error TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at REAL
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_job_ready ON jobs(state, next_run_at)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_job_lease ON jobs(state, lease_expires_at)')
+        # Une seule tâche active par clé de déduplication (par exemple une transcription par réunion)
+        cursor.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_job_dedupe ON jobs(dedupe_key) WHERE state IN ('queued', 'running')"
+        )
+        
+        # Baux nommés (voir lock_queries.py) : une seule instance exécute chaque tâche périodique
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS locks (
+                name TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                acquired_at REAL NOT NULL,
+                heartbeat_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        ''')
+        
+        # Résultats déjà produits par Mistral et AssemblyAI, par empreinte du contenu (voir cache_queries.py)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS result_cache (
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                data BLOB NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL,
+                PRIMARY KEY (kind, key)
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_result_cache_last_used ON result_cache(last_used_at)')
+        
         conn.commit()
         print("Database initialized successfully")
     finally:
         if conn:
-            release_db_connection(conn)
+            conn.close()
 
 def create_user(user_data):
     """Créer un nouvel utilisateur (classique ou OAuth)"""
@@ -236,29 +572,26 @@ def create_user(user_data):
     oauth_id = user_data.get("oauth_id")
     created_at = datetime.utcnow().isoformat()
     
-    conn = get_db_connection()
-    try:
-        cursor = conn.cursor()
-        cursor.execute(
+    def write(conn):
+        conn.execute(
             """INSERT INTO users (id, email, hashed_password, full_name, profile_picture_url, 
                oauth_provider, oauth_id, created_at) 
                VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
             (user_id, email, hashed_password, full_name, profile_picture_url, 
              oauth_provider, oauth_id, created_at)
         )
-        conn.commit()
-        
-        return {
-            "id": user_id,
-            "email": email,
-            "full_name": full_name,
-            "profile_picture_url": profile_picture_url,
-            "oauth_provider": oauth_provider,
-            "oauth_id": oauth_id,
-            "created_at": created_at
-        }
-    finally:
-        release_db_connection(conn)
+    
+    execute_write(write)
+    
+    return {
+        "id": user_id,
+        "email": email,
+        "full_name": full_name,
+        "profile_picture_url": profile_picture_url,
+        "oauth_provider": oauth_provider,
+        "oauth_id": oauth_id,
+        "created_at": created_at
+    }
 
 def get_user_by_email(email):
     """Récupérer un utilisateur par son email"""
@@ -292,93 +625,90 @@ def get_user_by_id(user_id):
 
 def update_user(user_id, update_data):
     """Mettre à jour les informations d'un utilisateur"""
-    conn = None
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        # Ancienne adresse, pour invalider son entrée du cache si l'email change
+        previous = get_user_by_id(user_id) if "email" in update_data else None
         
         # Construire la requête de mise à jour dynamiquement
         placeholders = ", ".join([f"{k} = ?" for k in update_data.keys()])
         values = list(update_data.values())
         
         query = f"UPDATE users SET {placeholders} WHERE id = ?"
-        cursor.execute(query, (*values, user_id))
-        conn.commit()
-        
-        # Vider le cache pour cet utilisateur
-        cache_key = f"user_id_{user_id}"
-        if cache_key in user_cache:
-            del user_cache[cache_key]
+        execute_write(lambda conn: conn.execute(query, (*values, user_id)))
         
         # Récupérer l'utilisateur mis à jour
-        return get_user_by_id(user_id)
+        user = get_user_by_id(user_id)
+        
+        # Vider le cache pour cet utilisateur (profil, photo, mot de passe)
+        invalidate_user_cache(user_id, *(u["email"] for u in (previous, user) if u))
+        return user
     except Exception as e:
         print(f"Erreur lors de la mise à jour de l'utilisateur: {e}")
-        if conn:
-            conn.rollback()
         return None
-    finally:
-        if conn:
-            release_db_connection(conn)
 
-# Cache utilisateur (pour limiter les requêtes à la base de données)
-user_cache = {}
+# Cache utilisateur (pour limiter les requêtes à la base de données), borné et
+# partagé entre threads ; les entrées sont copiées pour que les appelants
+# puissent modifier l'utilisateur retourné sans altérer le cache
+user_cache = TTLCache(
+    "users",
+    maxsize=settings.USER_CACHE_SIZE if settings.ENABLE_CACHE else 0,
+    ttl=settings.CACHE_TTL
+)
+
+def _cached_user(cache_key):
+    user = user_cache.get(cache_key)
+    return dict(user) if user is not None else None
+
+def peek_user_by_id_cached(user_id):
+    """Utilisateur en cache, sans accès à la base (None si absent ou expiré)"""
+    return _cached_user(f"id:{user_id}")
 
 # Fonctions avec cache pour les utilisateurs
 def get_user_by_email_cached(email, max_age_seconds=60):
     """Version mise en cache de get_user_by_email"""
-    current_time = time.time()
     cache_key = f"email:{email}"
-    
-    # Vérifier si l'utilisateur est dans le cache et si le cache est encore valide
-    if cache_key in user_cache:
-        timestamp, user = user_cache[cache_key]
-        if current_time - timestamp < max_age_seconds:
-            return user
+    user = _cached_user(cache_key)
+    if user is not None:
+        return user
     
     # Si pas dans le cache ou expiré, interroger la base de données
     user = get_user_by_email(email)
     
     # Mettre en cache si l'utilisateur existe
     if user:
-        user_cache[cache_key] = (current_time, user)
+        user_cache.set(cache_key, dict(user), ttl=min(max_age_seconds, settings.CACHE_TTL))
     
     return user
 
 def get_user_by_id_cached(user_id, max_age_seconds=300):
     """Version mise en cache de get_user_by_id"""
-    current_time = time.time()
     cache_key = f"id:{user_id}"
-    
-    # Vérifier si l'utilisateur est dans le cache et si le cache est encore valide
-    if cache_key in user_cache:
-        timestamp, user = user_cache[cache_key]
-        if current_time - timestamp < max_age_seconds:
-            return user
+    user = _cached_user(cache_key)
+    if user is not None:
+        return user
     
     # Si pas dans le cache ou expiré, interroger la base de données
     user = get_user_by_id(user_id)
     
     # Mettre en cache si l'utilisateur existe
     if user:
-        user_cache[cache_key] = (current_time, user)
+        user_cache.set(cache_key, dict(user), ttl=min(max_age_seconds, settings.CACHE_TTL))
     
     return user
 
+def invalidate_user_cache(user_id, *emails):
+    """Retirer un utilisateur du cache (entrée par ID et entrées par email)"""
+    user_cache.pop(f"id:{user_id}")
+    for email in emails:
+        user_cache.pop(f"email:{email}")
+
 def clear_user_cache():
     """Vider le cache utilisateur"""
-    global user_cache
-    user_cache = {}
+    user_cache.clear()
 
-def purge_old_entries_from_cache(max_age_seconds=600):
-    """Purger les entrées de cache trop anciennes"""
-    global user_cache
-    current_time = time.time()
-    
-    user_cache = {
-        k: v for k, v in user_cache.items() 
-        if current_time - v[0] < max_age_seconds
-    }
+def purge_old_entries_from_cache():
+    """Purger les entrées de cache expirées"""
+    user_cache.purge_expired()
 
 def get_user_by_oauth(oauth_provider, oauth_id):
     """Récupérer un utilisateur par ses identifiants OAuth"""
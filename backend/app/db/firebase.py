@@ -61,3 +61,41 @@ def upload_mp3(file_path: str, user_id: str):
     logger.info(f"Chemin absolu du fichier: {target_path}")
     
     return relative_path
+
+def get_partial_upload_path(upload_id: str):
+    """
+    Renvoie le chemin du fichier partiel d'un upload reprenable.
+    Les morceaux reçus sont ajoutés à ce fichier jusqu'à la finalisation.
+    """
+    partial_dir = get_uploads_dir("partial")
+    return partial_dir / f"{upload_id}.part"
+
+def delete_partial_upload(upload_id: str):
+    """
+    Supprime le fichier partiel d'un upload reprenable s'il existe.
+    """
+    partial_path = get_partial_upload_path(upload_id)
+    try:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+            logger.info(f"Fichier partiel supprimé: {partial_path}")
+    except Exception as e:
+        logger.error(f"Erreur lors de la suppression du fichier partiel {partial_path}: {str(e)}")
+
+def purge_orphan_partial_uploads(session_ids, older_than_seconds: int):
+    """
+    Supprime les fichiers partiels sans session d'upload (session purgée ou
+    suppression interrompue), non modifiés depuis older_than_seconds.
+    Retourne le nombre de fichiers supprimés.
+    """
+    partial_dir = get_uploads_dir("partial")
+    cutoff = datetime.now().timestamp() - older_than_seconds
+    removed = 0
+    for partial_path in partial_dir.glob("*.part"):
+        try:
+            if partial_path.stem not in session_ids and partial_path.stat().st_mtime < cutoff:
+                partial_path.unlink()
+                removed += 1
+        except OSError as e:
+            logger.error(f"Erreur lors de la suppression du fichier partiel {partial_path}: {str(e)}")
+    return removed
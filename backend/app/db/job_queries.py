@@ -0,0 +1,285 @@
+"""
+File de tâches persistante (table jobs).
+
+Une tâche passe par les états :
+    queued  -> en attente, exécutable à partir de next_run_at
+    running -> réclamée par un worker, qui la détient jusqu'à lease_expires_at
+    done    -> terminée (purgée après JOB_RETENTION_HOURS)
+    dead    -> abandonnée après max_attempts tentatives, conservée pour analyse
+
+Un worker réclame un lot de tâches (claim_jobs) dans une seule transaction :
+sous PostgreSQL les lignes sont verrouillées avec FOR UPDATE SKIP LOCKED, sous
+SQLite les écritures sont sérialisées par le thread d'écriture. Une tâche n'est
+donc remise qu'à un seul worker, même avec plusieurs instances de l'API. Si le
+worker disparaît sans terminer la tâche, elle est reprise à l'expiration du bail.
+
+complete_job et fail_job ne modifient la tâche que si le bail appartient
+toujours au worker (un worker trop lent ne peut pas écraser le résultat de
+celui qui a repris sa tâche).
+"""
+
+import json
+import logging
+import random
+import time
+import uuid
+
+from ..core.config import settings
+from .database import DB_BACKEND, get_db_connection, release_db_connection, execute_write
+
+JOB_STATES = ("queued", "running", "done", "dead")
+
+def _job_from_row(row):
+    job = dict(row)
+    job["payload"] = json.loads(job["payload"])
+    return job
+
+def _active_job_by_dedupe_key(conn, dedupe_key):
+    return conn.execute(
+        "SELECT * FROM jobs WHERE dedupe_key = ? AND state IN ('queued', 'running')",
+        (dedupe_key,)
+    ).fetchone()
+
+def enqueue_job(job_type, payload, dedupe_key=None, delay_seconds=0, max_attempts=None):
+    """
+    Ajouter une tâche à la file.
+
+    Avec dedupe_key, si une tâche active (queued ou running) porte déjà cette clé,
+    aucune tâche n'est créée et la tâche existante est retournée.
+    """
+    logger = logging.getLogger("fastapi")
+
+    job_id = str(uuid.uuid4())
+    now = time.time()
+
+    def write(conn):
+        conn.execute(
+            """
+            INSERT INTO jobs (id, type, payload, state, attempts, max_attempts, next_run_at, dedupe_key, updated_at)
+            VALUES (?, ?, ?, 'queued', 0, ?, ?, ?, ?)
+            ON CONFLICT (dedupe_key) WHERE state IN ('queued', 'running') DO NOTHING
+            """,
+            (
+                job_id,
+                job_type,
+                json.dumps(payload),
+                max_attempts or settings.JOB_MAX_ATTEMPTS,
+                now + delay_seconds,
+                dedupe_key,
+                now
+            )
+        )
+        if dedupe_key is not None:
+            return _active_job_by_dedupe_key(conn, dedupe_key)
+        return conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+    job = _job_from_row(execute_write(write))
+    if job["id"] == job_id:
+        logger.info(f"Tâche {job_type} {job_id} ajoutée à la file")
+    else:
+        logger.info(f"Tâche {job_type} déjà en file pour {dedupe_key} ({job['id']})")
+    return job
+
+def get_job(job_id):
+    """Récupérer une tâche"""
+    conn = get_db_connection()
+    try:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _job_from_row(row) if row else None
+    finally:
+        release_db_connection(conn)
+
+def get_active_job(dedupe_key):
+    """Récupérer la tâche active (queued ou running) portant cette clé de déduplication"""
+    conn = get_db_connection()
+    try:
+        row = _active_job_by_dedupe_key(conn, dedupe_key)
+        return _job_from_row(row) if row else None
+    finally:
+        release_db_connection(conn)
+
+def claim_jobs(worker_id, limit, job_types=None, lease_seconds=None):
+    """
+    Réclamer jusqu'à `limit` tâches exécutables : tâches en attente arrivées à
+    échéance et tâches dont le bail a expiré (worker disparu).
+
+    Chaque tâche réclamée passe à l'état running, avec attempts incrémenté et un
+    bail de lease_seconds au nom de worker_id.
+
+    Returns:
+        list: tâches réclamées, payload décodé
+    """
+    if limit <= 0:
+        return []
+    lease_seconds = lease_seconds or settings.JOB_LEASE_SECONDS
+    job_types = list(job_types or [])
+    type_filter = f" AND type IN ({', '.join('?' for _ in job_types)})" if job_types else ""
+    # Sous PostgreSQL, les tâches réclamées en parallèle par une autre instance sont ignorées
+    lock_clause = " FOR UPDATE SKIP LOCKED" if DB_BACKEND == "postgresql" else ""
+
+    def write(conn):
+        now = time.time()
+        # Bail expiré après la dernière tentative autorisée : la tâche est abandonnée
+        conn.execute(
+            f"""
+            UPDATE jobs SET state = 'dead', lease_owner = NULL, lease_expires_at = NULL, updated_at = ?,
+                last_error = COALESCE(last_error, 'Bail expiré après la dernière tentative')
+            WHERE state = 'running' AND lease_expires_at <= ? AND attempts >= max_attempts{type_filter}
+            """,
+            (now, now, *job_types)
+        )
+
+        ids = []
+        for condition in ("state = 'queued' AND next_run_at <= ?", "state = 'running' AND lease_expires_at <= ?"):
+            if len(ids) >= limit:
+                break
+            order = "next_run_at" if condition.startswith("state = 'queued'") else "lease_expires_at"
+            rows = conn.execute(
+                f"SELECT id FROM jobs WHERE {condition}{type_filter} ORDER BY {order} LIMIT ?{lock_clause}",
+                (now, *job_types, limit - len(ids))
+            ).fetchall()
+            ids.extend(row["id"] for row in rows)
+        if not ids:
+            return []
+
+        placeholders = ", ".join("?" for _ in ids)
+        conn.execute(
+            f"""
+            UPDATE jobs SET state = 'running', attempts = attempts + 1,
+                lease_owner = ?, lease_expires_at = ?, updated_at = ?
+            WHERE id IN ({placeholders})
+            """,
+            (worker_id, now + lease_seconds, now, *ids)
+        )
+        return conn.execute(
+            f"SELECT * FROM jobs WHERE id IN ({placeholders}) ORDER BY next_run_at", ids
+        ).fetchall()
+
+    return [_job_from_row(row) for row in execute_write(write)]
+
+def extend_job_lease(job_id, worker_id, lease_seconds=None):
+    """Prolonger le bail d'une tâche longue ; False si le bail a été perdu"""
+    now = time.time()
+    lease_seconds = lease_seconds or settings.JOB_LEASE_SECONDS
+    updated = execute_write(lambda conn: conn.execute(
+        """
+        UPDATE jobs SET lease_expires_at = ?, updated_at = ?
+        WHERE id = ? AND state = 'running' AND lease_owner = ?
+        """,
+        (now + lease_seconds, now, job_id, worker_id)
+    ).rowcount)
+    return updated > 0
+
+def complete_job(job_id, worker_id):
+    """Marquer une tâche comme terminée ; False si le bail a été perdu entre-temps"""
+    now = time.time()
+    updated = execute_write(lambda conn: conn.execute(
+        """
+        UPDATE jobs SET state = 'done', lease_owner = NULL, lease_expires_at = NULL, updated_at = ?
+        WHERE id = ? AND state = 'running' AND lease_owner = ?
+        """,
+        (now, job_id, worker_id)
+    ).rowcount)
+    return updated > 0
+
+def release_job(job_id, worker_id):
+    """
+    Rendre une tâche réclamée mais non démarrée (pool plein, arrêt du worker) :
+    elle redevient exécutable immédiatement, sans compter de tentative
+    """
+    now = time.time()
+    updated = execute_write(lambda conn: conn.execute(
+        """
+        UPDATE jobs SET state = 'queued', attempts = attempts - 1, next_run_at = ?,
+            lease_owner = NULL, lease_expires_at = NULL, updated_at = ?
+        WHERE id = ? AND state = 'running' AND lease_owner = ?
+        """,
+        (now, now, job_id, worker_id)
+    ).rowcount)
+    return updated > 0
+
+def retry_delay(attempts):
+    """Délai avant la tentative suivante : backoff exponentiel plafonné, avec gigue"""
+    delay = min(settings.JOB_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0), settings.JOB_RETRY_MAX_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+def fail_job(job_id, worker_id, error, retry_after=None):
+    """
+    Enregistrer l'échec d'une tentative : la tâche est replanifiée avec un backoff
+    exponentiel, ou passe à l'état dead si toutes les tentatives sont épuisées.
+    retry_after (secondes) impose un délai minimal, par exemple celui demandé par
+    une API en limite de débit.
+
+    Returns:
+        str: nouvel état de la tâche ("queued" ou "dead"), None si le bail a été perdu
+    """
+    logger = logging.getLogger("fastapi")
+    error = str(error)[:2000]
+
+    def write(conn):
+        job = conn.execute(
+            "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND state = 'running' AND lease_owner = ?",
+            (job_id, worker_id)
+        ).fetchone()
+        if not job:
+            return None
+        now = time.time()
+        if job["attempts"] >= job["max_attempts"]:
+            conn.execute(
+                """
+                UPDATE jobs SET state = 'dead', last_error = ?, lease_owner = NULL, lease_expires_at = NULL, updated_at = ?
+                WHERE id = ?
+                """,
+                (error, now, job_id)
+            )
+            return "dead"
+        conn.execute(
+            """
+            UPDATE jobs SET state = 'queued', last_error = ?, next_run_at = ?,
+                lease_owner = NULL, lease_expires_at = NULL, updated_at = ?
+            WHERE id = ?
+            """,
+            (error, now + max(retry_delay(job["attempts"]), retry_after or 0), now, job_id)
+        )
+        return "queued"
+
+    state = execute_write(write)
+    if state == "dead":
+        logger.error(f"Tâche {job_id} abandonnée après la dernière tentative: {error}")
+    elif state == "queued":
+        logger.warning(f"Échec de la tâche {job_id}, nouvelle tentative planifiée: {error}")
+    return state
+
+def purge_finished_jobs(older_than_seconds=None):
+    """Supprimer les tâches terminées depuis plus de older_than_seconds (les tâches dead sont conservées)"""
+    if older_than_seconds is None:
+        older_than_seconds = settings.JOB_RETENTION_HOURS * 3600
+    return execute_write(lambda conn: conn.execute(
+        "DELETE FROM jobs WHERE state = 'done' AND updated_at < ?",
+        (time.time() - older_than_seconds,)
+    ).rowcount)
+
+def count_jobs(job_type, states):
+    """Nombre de tâches d'un type dans les états donnés"""
+    conn = get_db_connection()
+    try:
+        placeholders = ", ".join("?" for _ in states)
+        row = conn.execute(
+            f"SELECT COUNT(*) AS count FROM jobs WHERE type = ? AND state IN ({placeholders})",
+            (job_type, *states)
+        ).fetchone()
+        return row["count"]
+    finally:
+        release_db_connection(conn)
+
+def get_job_counts():
+    """Nombre de tâches par type et par état"""
+    conn = get_db_connection()
+    try:
+        rows = conn.execute("SELECT type, state, COUNT(*) AS count FROM jobs GROUP BY type, state").fetchall()
+        counts = {}
+        for row in rows:
+            counts.setdefault(row["type"], {state: 0 for state in JOB_STATES})[row["state"]] = row["count"]
+        return counts
+    finally:
+        release_db_connection(conn)
@@ -0,0 +1,69 @@
+"""
+Baux nommés (table locks) : exclusion mutuelle entre instances.
+
+Un bail est détenu par un propriétaire (hôte:pid) jusqu'à expires_at. Son
+détenteur le renouvelle régulièrement (heartbeat) ; s'il disparaît sans le
+libérer, une autre instance peut le prendre dès son expiration. Les tâches
+périodiques (réconciliation avec AssemblyAI, purge de la file...) ne
+s'exécutent que dans l'instance qui détient leur bail.
+
+L'acquisition est un seul INSERT ... ON CONFLICT DO UPDATE conditionnel, sous
+SQLite comme sous PostgreSQL : deux instances ne peuvent pas obtenir le même
+bail en même temps. Les dates sont en secondes depuis l'epoch : la durée des
+baux doit rester grande devant le décalage d'horloge entre les machines.
+"""
+
+import time
+
+from .database import get_db_connection, release_db_connection, execute_write
+
+def acquire_lock(name, owner, ttl_seconds):
+    """
+    Prendre le bail `name` pour ttl_seconds, ou le renouveler s'il appartient déjà à owner.
+
+    Returns:
+        bool: True si owner détient le bail
+    """
+    def write(conn):
+        now = time.time()
+        conn.execute(
+            """
+            INSERT INTO locks (name, owner, acquired_at, heartbeat_at, expires_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (name) DO UPDATE SET
+                acquired_at = CASE WHEN locks.owner = excluded.owner THEN locks.acquired_at ELSE excluded.acquired_at END,
+                owner = excluded.owner,
+                heartbeat_at = excluded.heartbeat_at,
+                expires_at = excluded.expires_at
+            WHERE locks.owner = excluded.owner OR locks.expires_at <= ?
+            """,
+            (name, owner, now, now, now + ttl_seconds, now)
+        )
+        row = conn.execute("SELECT owner FROM locks WHERE name = ?", (name,)).fetchone()
+        return row is not None and row["owner"] == owner
+
+    return execute_write(write)
+
+def release_lock(name, owner):
+    """Libérer le bail s'il appartient toujours à owner ; False sinon"""
+    deleted = execute_write(lambda conn: conn.execute(
+        "DELETE FROM locks WHERE name = ? AND owner = ?",
+        (name, owner)
+    ).rowcount)
+    return deleted > 0
+
+def get_locks():
+    """Baux enregistrés, avec leur détenteur et le temps restant avant expiration"""
+    conn = get_db_connection()
+    try:
+        rows = conn.execute("SELECT * FROM locks ORDER BY name").fetchall()
+        now = time.time()
+        locks = []
+        for row in rows:
+            lock = dict(row)
+            lock["expires_in"] = round(lock["expires_at"] - now, 1)
+            lock["active"] = lock["expires_at"] > now
+            locks.append(lock)
+        return locks
+    finally:
+        release_db_connection(conn)
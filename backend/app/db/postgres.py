@@ -0,0 +1,344 @@
+"""
+Backend PostgreSQL (DATABASE_URL=postgresql://...).
+
+Les fonctions de requête (queries.py, client_queries.py, ...) sont écrites une
+seule fois, dans le SQL commun à SQLite et PostgreSQL, avec des paramètres `?`.
+Ce module fournit des connexions psycopg qui se comportent comme des connexions
+sqlite3 pour ces fonctions : paramètres `?` traduits en `%s`, lignes accessibles
+par nom de colonne ou par position, conn.execute(), cursor() et rowcount.
+
+PostgreSQL accepte les écritures concurrentes : pas de thread d'écriture unique,
+chaque écriture s'exécute dans sa propre transaction sur une connexion du pool,
+ce qui permet de faire tourner plusieurs instances de l'API sur la même base.
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+from functools import lru_cache
+
+import psycopg
+from psycopg.pq import TransactionStatus
+
+# Erreurs à intercepter en plus de celles de sqlite3
+Error = psycopg.Error
+IntegrityError = psycopg.IntegrityError
+
+# Verrou consultatif pris pendant la création du schéma (instances démarrées simultanément)
+SCHEMA_LOCK_ID = 47_100_001
+
+# Équivalent de CURRENT_TIMESTAMP sous SQLite : date UTC au format texte
+_NOW = "(to_char(timezone('utc', now()), 'YYYY-MM-DD HH24:MI:SS'))"
+
+class Row(dict):
+    """Ligne accessible par nom de colonne ou par position, comme sqlite3.Row"""
+
+    __slots__ = ("_values",)
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return self._values[key]
+        return super().__getitem__(key)
+
+def _row_factory(cursor):
+    names = [column.name for column in cursor.description or ()]
+
+    def make_row(values):
+        row = Row(zip(names, values))
+        row._values = values
+        return row
+
+    return make_row
+
+@lru_cache(maxsize=512)
+def _translate(sql):
+    """Paramètres `?` (sqlite3) vers `%s` (psycopg) ; les `%` littéraux sont échappés"""
+    return sql.replace("%", "%%").replace("?", "%s")
+
+class PostgresCursor:
+    """Curseur psycopg avec l'interface sqlite3 utilisée par les fonctions de requête"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, sql, params=()):
+        self._cursor.execute(_translate(sql), tuple(params))
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        self._cursor.executemany(_translate(sql), [tuple(params) for params in seq_of_params])
+        return self
+
+    def fetchone(self):
+        return self._cursor.fetchone() if self._cursor.description else None
+
+    def fetchall(self):
+        return self._cursor.fetchall() if self._cursor.description else []
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def close(self):
+        self._cursor.close()
+
+class PostgresConnection:
+    """Connexion psycopg avec l'interface sqlite3 utilisée par les fonctions de requête"""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self):
+        return PostgresCursor(self._conn.cursor())
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self.cursor().executemany(sql, seq_of_params)
+
+    @property
+    def in_transaction(self):
+        status = self._conn.info.transaction_status
+        if self._conn.closed or status == TransactionStatus.UNKNOWN:
+            # Connexion fermée ou perdue : elle sera remplacée par le pool
+            raise psycopg.OperationalError("Connexion PostgreSQL fermée")
+        return status != TransactionStatus.IDLE
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        self._conn.close()
+
+def connect(database_url):
+    """Ouvre une connexion PostgreSQL (transactions explicites, comme les connexions sqlite3)"""
+    conn = psycopg.connect(database_url, row_factory=_row_factory, connect_timeout=10)
+    return PostgresConnection(conn)
+
+class PostgresWriter:
+    """
+    Écritures PostgreSQL, avec la même interface que DatabaseWriter.
+
+    `fn(conn, *args, **kwargs)` s'exécute dans le thread appelant, sur la connexion
+    du pool déjà réservée par ce thread ou sur une nouvelle, puis la transaction
+    est validée. Une écriture imbriquée (execute_write appelé depuis fn) rejoint
+    la transaction en cours.
+    """
+
+    def __init__(self, get_pool):
+        self._get_pool = get_pool
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # Métriques
+        self._writes = 0
+        self._errors = 0
+        self._commit_time_total = 0.0
+
+    def execute(self, fn, *args, **kwargs):
+        """Exécute une écriture dans sa transaction et retourne son résultat"""
+        pool = self._get_pool()
+        conn = pool.get_connection()
+        depth = getattr(self._local, "depth", 0)
+        self._local.depth = depth + 1
+        try:
+            if depth:
+                return fn(conn, *args, **kwargs)
+            try:
+                result = fn(conn, *args, **kwargs)
+                start = time.perf_counter()
+                conn.commit()
+                elapsed = time.perf_counter() - start
+            except Exception:
+                conn.rollback()
+                with self._lock:
+                    self._errors += 1
+                raise
+            with self._lock:
+                self._writes += 1
+                self._commit_time_total += elapsed
+            return result
+        finally:
+            self._local.depth = depth
+            pool.release_connection(conn)
+
+    def submit(self, fn, *args, **kwargs):
+        """Exécute l'écriture immédiatement ; Future déjà résolu, pour compatibilité"""
+        future = Future()
+        try:
+            future.set_result(self.execute(fn, *args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def stop(self, timeout=10):
+        """Rien à arrêter : les écritures s'exécutent dans les threads appelants"""
+
+    def stats(self):
+        """Métriques des écritures"""
+        with self._lock:
+            return {
+                "backend": "postgresql",
+                "writes": self._writes,
+                "errors": self._errors,
+                "commit_time_total_ms": round(self._commit_time_total * 1000, 1),
+            }
+
+def init_postgres_db(conn):
+    """Crée ou complète le schéma PostgreSQL (équivalent de init_db pour SQLite)"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT pg_advisory_xact_lock(?)", (SCHEMA_LOCK_ID,))
+
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS users (
+            id TEXT PRIMARY KEY,
+            email TEXT UNIQUE NOT NULL,
+            hashed_password TEXT,
+            full_name TEXT,
+            profile_picture_url TEXT,
+            oauth_provider TEXT,
+            oauth_id TEXT,
+            created_at TEXT DEFAULT {_NOW}
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_email ON users(email)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_oauth ON users(oauth_provider, oauth_id)")
+
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS meetings (
+            id TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL REFERENCES users (id),
+            title TEXT NOT NULL,
+            file_url TEXT NOT NULL,
+            transcript_text TEXT,
+            transcript_status TEXT DEFAULT 'pending',
+            created_at TEXT DEFAULT {_NOW},
+            duration_seconds INTEGER,
+            speakers_count INTEGER,
+            summary_text TEXT,
+            summary_status TEXT DEFAULT NULL,
+            client_id TEXT,
+            audio_format TEXT,
+            original_size_bytes BIGINT,
+            stored_size_bytes BIGINT,
+            conversion_ms INTEGER,
+            transcript_id TEXT,
+            speakers_version INTEGER NOT NULL DEFAULT 0,
+            audio_sha256 TEXT
+        )
+    """)
+    cursor.execute("ALTER TABLE meetings ADD COLUMN IF NOT EXISTS audio_sha256 TEXT")
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_meeting_user_created ON meetings(user_id, created_at DESC, id DESC)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_meeting_transcript_status ON meetings(transcript_status, created_at, id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_meeting_summary_status ON meetings(summary_status, created_at, id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_meeting_transcript_id ON meetings(transcript_id)')
+
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS clients (
+            id TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL REFERENCES users (id),
+            name TEXT NOT NULL,
+            summary_template TEXT,
+            created_at TEXT DEFAULT {_NOW}
+        )
+    """)
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_client_user ON clients(user_id)')
+
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS meeting_speakers (
+            id TEXT PRIMARY KEY,
+            meeting_id TEXT NOT NULL REFERENCES meetings (id) ON DELETE CASCADE,
+            speaker_id TEXT NOT NULL,
+            custom_name TEXT NOT NULL,
+            created_at TEXT DEFAULT {_NOW},
+            UNIQUE (meeting_id, speaker_id)
+        )
+    """)
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_speaker_meeting ON meeting_speakers(meeting_id)')
+
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS upload_sessions (
+            id TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL REFERENCES users (id),
+            filename TEXT NOT NULL,
+            content_type TEXT,
+            title TEXT,
+            client_id TEXT,
+            total_size BIGINT NOT NULL,
+            received_size BIGINT NOT NULL DEFAULT 0,
+            status TEXT NOT NULL DEFAULT 'uploading',
+            meeting_id TEXT,
+            created_at TEXT DEFAULT {_NOW},
+            updated_at TEXT DEFAULT {_NOW}
+        )
+    """)
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_upload_session_user ON upload_sessions(user_id)')
+
+    # Transcription structurée (utterances et horodatage des mots), JSON compressé zlib
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS meeting_transcripts (
+            meeting_id TEXT PRIMARY KEY REFERENCES meetings (id) ON DELETE CASCADE,
+            transcript_id TEXT,
+            data BYTEA NOT NULL,
+            created_at TEXT DEFAULT {_NOW}
+        )
+    """)
+
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            type TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            state TEXT NOT NULL DEFAULT 'queued',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL,
+            next_run_at DOUBLE PRECISION NOT NULL,
+            lease_owner TEXT,
+            lease_expires_at DOUBLE PRECISION,
+            dedupe_key TEXT,
+            last_error TEXT,
+            created_at TEXT DEFAULT {_NOW},
+            updated_at DOUBLE PRECISION
+        )
+    """)
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_job_ready ON jobs(state, next_run_at)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_job_lease ON jobs(state, lease_expires_at)')
+    cursor.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_job_dedupe ON jobs(dedupe_key) WHERE state IN ('queued', 'running')"
+    )
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS locks (
+            name TEXT PRIMARY KEY,
+            owner TEXT NOT NULL,
+            acquired_at DOUBLE PRECISION NOT NULL,
+            heartbeat_at DOUBLE PRECISION NOT NULL,
+            expires_at DOUBLE PRECISION NOT NULL
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS result_cache (
+            kind TEXT NOT NULL,
+            key TEXT NOT NULL,
+            data BYTEA NOT NULL,
+            size_bytes BIGINT NOT NULL,
+            hits INTEGER NOT NULL DEFAULT 0,
+            created_at DOUBLE PRECISION NOT NULL,
+            last_used_at DOUBLE PRECISION NOT NULL,
+            PRIMARY KEY (kind, key)
+        )
+    """)
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_result_cache_last_used ON result_cache(last_used_at)')
+
+    conn.commit()
@@ -1,95 +1,55 @@
-import sqlite3
+import base64
+import json
 import uuid
 from datetime import datetime, timedelta
-from .database import get_db_connection, release_db_connection
+from .database import get_db_connection, release_db_connection, execute_write, DB_ERRORS
 import logging
 
 def create_meeting(meeting_data, user_id):
     """
-    Créer une nouvelle réunion avec une meilleure gestion des transactions
-    pour éviter les erreurs 'database is locked'
+    Créer une nouvelle réunion
+    
+    L'insertion passe par le thread d'écriture unique : elle ne rencontre jamais
+    'database is locked' et n'a donc pas besoin d'être réessayée.
     """
     # Logger pour le débogage
     logger = logging.getLogger("fastapi")
     logger.info(f"Création d'une nouvelle réunion pour l'utilisateur {user_id}")
     
-    # Récupérer une nouvelle connexion pour cette transaction
-    conn = None
-    meeting = None
-    retry_count = 0
-    max_retries = 3
+    # Générer un ID unique pour la réunion
+    meeting_id = str(uuid.uuid4())
+    created_at = datetime.utcnow().isoformat()
     
-    while retry_count < max_retries:
-        try:
-            # Obtenir une nouvelle connexion
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            # Générer un ID unique pour la réunion
-            meeting_id = str(uuid.uuid4())
-            created_at = datetime.utcnow().isoformat()
-            
-            # Utiliser le statut fourni ou 'pending' par défaut
-            transcript_status = meeting_data.get("transcript_status", "pending")
-            
-            # Exécuter la requête d'insertion avec un timeout plus long
-            logger.info(f"Insertion de la réunion {meeting_id} dans la base de données")
-            cursor.execute(
-                """
-                INSERT INTO meetings (
-                    id, user_id, title, file_url, 
-                    transcript_status, created_at
-                ) VALUES (?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    meeting_id, 
-                    user_id, 
-                    meeting_data["title"], 
-                    meeting_data["file_url"], 
-                    transcript_status, 
-                    created_at
-                )
+    # Utiliser le statut fourni ou 'pending' par défaut
+    transcript_status = meeting_data.get("transcript_status", "pending")
+    
+    def write(conn):
+        conn.execute(
+            """
+            INSERT INTO meetings (
+                id, user_id, title, file_url, 
+                transcript_status, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (
+                meeting_id, 
+                user_id, 
+                meeting_data["title"], 
+                meeting_data["file_url"], 
+                transcript_status, 
+                created_at
             )
-            
-            # Valider la transaction immédiatement
-            conn.commit()
-            logger.info(f"Réunion {meeting_id} créée avec succès")
-            
-            # Récupérer la réunion créée dans une nouvelle transaction
-            cursor.execute("SELECT * FROM meetings WHERE id = ?", (meeting_id,))
-            meeting = cursor.fetchone()
-            
-            # Si tout s'est bien passé, sortir de la boucle
-            break
-            
-        except sqlite3.OperationalError as e:
-            # Gestion spécifique de l'erreur 'database is locked'
-            if "database is locked" in str(e):
-                retry_count += 1
-                logger.warning(f"Base de données verrouillée, tentative {retry_count}/{max_retries}")
-                
-                # Attendre un peu avant de réessayer
-                import time
-                time.sleep(1)  # Attendre 1 seconde avant de réessayer
-                
-                # Fermer et réinitialiser la connexion
-                if conn:
-                    try:
-                        conn.close()
-                    except:
-                        pass
-            else:
-                # Autres erreurs SQLite
-                logger.error(f"Erreur SQLite lors de la création de la réunion: {str(e)}")
-                raise
-        except Exception as e:
-            # Autres erreurs non SQLite
-            logger.error(f"Erreur lors de la création de la réunion: {str(e)}")
-            raise
-        finally:
-            # Libérer la connexion dans tous les cas
-            if conn:
-                release_db_connection(conn)
+        )
+        # Relire la réunion créée dans la même transaction (valeurs par défaut incluses)
+        return conn.execute("SELECT * FROM meetings WHERE id = ?", (meeting_id,)).fetchone()
+    
+    try:
+        logger.info(f"Insertion de la réunion {meeting_id} dans la base de données")
+        meeting = execute_write(write)
+        logger.info(f"Réunion {meeting_id} créée avec succès")
+    except Exception as e:
+        logger.error(f"Erreur lors de la création de la réunion: {str(e)}")
+        raise
         
     return dict(meeting) if meeting else None
 
@@ -135,6 +95,20 @@ def get_meeting(meeting_id, user_id):
     finally:
         release_db_connection(conn)
 
+def get_meeting_by_transcript_id(transcript_id):
+    """Récupérer la réunion associée à un ID de transcription AssemblyAI"""
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT * FROM meetings WHERE transcript_id = ?",
+            (transcript_id,)
+        )
+        meeting = cursor.fetchone()
+        return dict(meeting) if meeting else None
+    finally:
+        release_db_connection(conn)
+
 def normalize_transcript_format(text):
     """
     Normalise le format des transcriptions pour être cohérent
@@ -201,13 +175,87 @@ def get_meetings_by_user(user_id, status=None):
     finally:
         release_db_connection(conn)
 
+# Colonnes renvoyées par la liste des réunions (sans transcription ni résumé)
+MEETING_LIST_COLUMNS = (
+    "id", "user_id", "title", "transcript_id", "transcript_status", "summary_status",
+    "duration_seconds", "speakers_count", "created_at", "client_id"
+)
+
+def encode_meeting_cursor(meeting):
+    """Curseur opaque de pagination à partir de la dernière réunion d'une page"""
+    raw = json.dumps([meeting["created_at"], meeting["id"]])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_meeting_cursor(cursor_value):
+    """Décode un curseur de pagination, lève ValueError s'il est invalide"""
+    try:
+        created_at, meeting_id = json.loads(base64.urlsafe_b64decode(cursor_value.encode("ascii")))
+        return str(created_at), str(meeting_id)
+    except Exception:
+        raise ValueError("Curseur de pagination invalide")
+
+def list_meetings_page(user_id, status=None, limit=None, cursor=None):
+    """
+    Lister les réunions d'un utilisateur, sans le contenu des transcriptions et résumés
+    
+    Les réunions sont triées de la plus récente à la plus ancienne (created_at, id).
+    La pagination se fait par curseur : la page suivante commence strictement après
+    la dernière réunion de la page précédente.
+    
+    Args:
+        user_id: ID de l'utilisateur
+        status: Filtre optionnel pour le statut de transcription
+        limit: Nombre maximum de réunions (toutes si None)
+        cursor: Curseur retourné par l'appel précédent
+    
+    Returns:
+        Tuple[list, Optional[str]]: réunions de la page et curseur de la page suivante
+    """
+    conditions = ["user_id = ?"]
+    params = [user_id]
+    
+    if status:
+        conditions.append("transcript_status = ?")
+        params.append(status)
+    
+    if cursor:
+        created_at, meeting_id = decode_meeting_cursor(cursor)
+        conditions.append("(created_at, id) < (?, ?)")
+        params.extend([created_at, meeting_id])
+    
+    query = (
+        f"SELECT {', '.join(MEETING_LIST_COLUMNS)} FROM meetings "
+        f"WHERE {' AND '.join(conditions)} ORDER BY created_at DESC, id DESC"
+    )
+    if limit:
+        # Une ligne de plus pour savoir s'il existe une page suivante
+        query += " LIMIT ?"
+        params.append(limit + 1)
+    
+    conn = get_db_connection()
+    try:
+        cursor_db = conn.cursor()
+        cursor_db.execute(query, params)
+        rows = cursor_db.fetchall()
+    finally:
+        release_db_connection(conn)
+    
+    meetings = []
+    for row in rows[:limit] if limit else rows:
+        meeting_dict = dict(row)
+        meeting_dict['transcription_status'] = meeting_dict.get('transcript_status') or 'pending'
+        meetings.append(meeting_dict)
+    
+    next_cursor = None
+    if limit and len(rows) > limit:
+        next_cursor = encode_meeting_cursor(meetings[-1])
+    
+    return meetings, next_cursor
+
 def update_meeting(meeting_id: str, user_id: str, update_data: dict):
     """Mettre à jour une réunion"""
     logger = logging.getLogger("fastapi")
     
-    # Définir une connexion comme None pour éviter des erreurs dans le bloc finally
-    conn = None
-    
     try:
         # Log des données à mettre à jour
         logger.info(f"Début de mise à jour pour {meeting_id} avec data: {update_data}")
@@ -231,6 +279,10 @@ def update_meeting(meeting_id: str, user_id: str, update_data: dict):
             values.append(value)
             logger.info(f"Ajout de paramètre: {key}={value} (type: {type(value)}, value_repr: {repr(value)})")
         
+        # Un nouveau texte invalide les rendus en cache de la transcription
+        if 'transcript_text' in update_data:
+            query += "speakers_version = speakers_version + 1, "
+        
         # Supprimer la dernière virgule et ajouter la condition WHERE
         query = query.rstrip(", ") + " WHERE id = ? AND user_id = ?"
         values.extend([meeting_id, user_id])
@@ -238,26 +290,28 @@ def update_meeting(meeting_id: str, user_id: str, update_data: dict):
         logger.info(f"Requête SQL: {query}")
         logger.info(f"Valeurs: {values}")
         
-        # Exécuter la requête - Créer une nouvelle connexion à chaque appel
-        # pour éviter les problèmes de thread avec SQLite
+        def write(conn):
+            cursor = conn.execute(query, values)
+            if cursor.rowcount:
+                return cursor.rowcount, None
+            # Vérifier si la réunion existe
+            count = conn.execute(
+                "SELECT COUNT(*) FROM meetings WHERE id = ? AND user_id = ?", (meeting_id, user_id)
+            ).fetchone()[0]
+            return 0, count
+        
+        # Exécuter la requête dans le thread d'écriture
         try:
-            # Créer une nouvelle connexion dans le thread actuel
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute(query, values)
-            conn.commit()
+            rowcount, existing = execute_write(write)
             
             # Log de la mise à jour
             logger.info(f"DB Update: Meeting {meeting_id} updated with data: {update_data}")
             
             # Vérifier si la mise à jour a été effectuée
-            if cursor.rowcount == 0:
+            if rowcount == 0:
                 logger.warning(f"DB Warning: No rows updated for meeting {meeting_id}")
-                # Vérifier si la réunion existe
-                cursor.execute("SELECT COUNT(*) FROM meetings WHERE id = ? AND user_id = ?", (meeting_id, user_id))
-                count = cursor.fetchone()[0]
                 
-                if count == 0:
+                if existing == 0:
                     logger.error(f"DB Error: Meeting {meeting_id} does not exist for user {user_id}")
                 else:
                     logger.warning(f"DB Warning: Meeting exists but no update was necessary")
@@ -265,7 +319,7 @@ def update_meeting(meeting_id: str, user_id: str, update_data: dict):
                 return False
                 
             return True
-        except sqlite3.Error as e:
+        except DB_ERRORS as e:
             logger.error(f"DB Error: Failed to update meeting {meeting_id}: {str(e)}")
             logger.error(f"Traceback (most recent call last):")
             import traceback
@@ -276,14 +330,10 @@ def update_meeting(meeting_id: str, user_id: str, update_data: dict):
         import traceback
         logger.error(f"Traceback: {traceback.format_exc()}")
         return False
-    finally:
-        if conn:
-            release_db_connection(conn)
 
 def delete_meeting(meeting_id, user_id):
     """Supprimer une réunion"""
-    conn = get_db_connection()
-    try:
+    def write(conn):
         cursor = conn.cursor()
         
         # Récupérer l'URL du fichier avant de supprimer
@@ -296,102 +346,98 @@ def delete_meeting(meeting_id, user_id):
         if not meeting:
             return None
         
-        file_url = meeting["file_url"]
-        
-        # Supprimer la réunion
+        # Supprimer la réunion et sa transcription structurée
         cursor.execute(
             "DELETE FROM meetings WHERE id = ? AND user_id = ?", 
             (meeting_id, user_id)
         )
+        cursor.execute("DELETE FROM meeting_transcripts WHERE meeting_id = ?", (meeting_id,))
         
-        conn.commit()
-        
-        return file_url
-    finally:
-        release_db_connection(conn)
+        return meeting["file_url"]
+    
+    return execute_write(write)
 
-def get_pending_transcriptions(max_age_hours=24):
-    """Récupère les transcriptions en attente qui ne sont pas trop anciennes"""
+# Colonnes de statut pouvant servir de filtre aux balayages (indexées avec created_at)
+STATUS_COLUMNS = ("transcript_status", "summary_status")
+
+def _max_age_date(max_age_hours):
+    """Date ISO la plus ancienne retenue par les balayages par statut"""
+    return (datetime.utcnow().replace(microsecond=0) - timedelta(hours=max_age_hours)).isoformat()
+
+def get_meetings_by_status_page(status, status_column="transcript_status", max_age_hours=None,
+                                limit=100, cursor=None):
+    """
+    Récupère une page de réunions ayant un statut donné, de la plus récente à la plus ancienne
+    
+    Args:
+        status: Valeur du statut recherché
+        status_column: 'transcript_status' ou 'summary_status'
+        max_age_hours: Âge maximum des réunions (aucune limite si None)
+        limit: Taille de la page
+        cursor: Curseur retourné par l'appel précédent
+    
+    Returns:
+        Tuple[list, Optional[str]]: réunions de la page et curseur de la page suivante
+    """
+    if status_column not in STATUS_COLUMNS:
+        raise ValueError(f"Colonne de statut inconnue: {status_column}")
+    
+    conditions = [f"{status_column} = ?"]
+    params = [status]
+    
+    if max_age_hours is not None:
+        conditions.append("created_at > ?")
+        params.append(_max_age_date(max_age_hours))
+    
+    if cursor:
+        created_at, meeting_id = decode_meeting_cursor(cursor)
+        conditions.append("(created_at, id) < (?, ?)")
+        params.extend([created_at, meeting_id])
+    
+    params.append(limit + 1)
+    
     conn = get_db_connection()
     try:
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT * FROM meetings 
-            WHERE transcript_status = 'pending' 
-            AND created_at > datetime('now', ? || ' hours')
-            """,
-            (f"-{max_age_hours}",)
+        cursor_db = conn.cursor()
+        cursor_db.execute(
+            f"""SELECT * FROM meetings 
+               WHERE {' AND '.join(conditions)}
+               ORDER BY created_at DESC, id DESC
+               LIMIT ?""",
+            params
         )
-        meetings = cursor.fetchall()
-        return [dict(m) for m in meetings]
+        rows = cursor_db.fetchall()
     finally:
         release_db_connection(conn)
+    
+    meetings = [dict(row) for row in rows[:limit]]
+    next_cursor = encode_meeting_cursor(meetings[-1]) if len(rows) > limit else None
+    return meetings, next_cursor
 
-def get_meetings_by_status(status, max_age_hours=72):
-    """Récupère les réunions avec un statut spécifique qui ne sont pas trop anciennes"""
-    logger = logging.getLogger("fastapi")
-    conn = get_db_connection()
-    try:
-        cursor = conn.cursor()
-        
-        # Log pour le debugging
-        logger.info(f"DB Query: Getting meetings with status: {status}, max age: {max_age_hours} hours")
-        
-        cursor.execute(
-            """
-            SELECT * FROM meetings 
-            WHERE transcript_status = ? 
-            AND created_at > datetime('now', ? || ' hours')
-            """,
-            (status, f"-{max_age_hours}")
+def iter_meetings_by_status(status, status_column="transcript_status", max_age_hours=None, batch_size=100):
+    """Parcourt toutes les réunions d'un statut par pages successives"""
+    cursor = None
+    while True:
+        meetings, cursor = get_meetings_by_status_page(
+            status, status_column, max_age_hours, batch_size, cursor
         )
-        meetings = cursor.fetchall()
-        
-        # Convertir en dictionnaires
-        result = [dict(m) for m in meetings]
-        logger.info(f"Found {len(result)} meetings with status '{status}'")
-        
-        return result
-    except Exception as e:
-        logger.error(f"Error fetching meetings with status '{status}': {str(e)}")
-        return []
-    finally:
-        release_db_connection(conn)
+        yield from meetings
+        if not cursor:
+            return
+
+def get_pending_transcriptions(max_age_hours=24):
+    """Récupère les transcriptions en attente qui ne sont pas trop anciennes"""
+    return list(iter_meetings_by_status("pending", max_age_hours=max_age_hours))
 
 def get_meetings_by_status(status, max_age_hours=72):
     """
     Récupère les réunions avec un statut spécifique qui ne sont pas trop anciennes
     """
-    conn = get_db_connection()
     try:
-        cursor = conn.cursor()
-        
-        # Calculer la date de début pour le filtrage (maintenant - max_age_hours)
-        max_age_date = (datetime.utcnow().replace(microsecond=0) - 
-                       timedelta(hours=max_age_hours)).isoformat()
-        
-        # Récupérer toutes les réunions correspondant au statut et pas trop anciennes
-        cursor.execute(
-            """SELECT * FROM meetings 
-               WHERE transcript_status = ? 
-               AND created_at > ?
-               ORDER BY created_at DESC""", 
-            (status, max_age_date)
-        )
-        
-        meetings = cursor.fetchall()
-        
-        if meetings:
-            # Convertir les résultats en liste de dictionnaires
-            return [dict(meeting) for meeting in meetings]
+        return list(iter_meetings_by_status(status, max_age_hours=max_age_hours))
+    except DB_ERRORS as e:
+        logging.error(f"Erreur de base de données lors de la récupération des réunions par statut: {str(e)}")
         return []
-    
-    except sqlite3.Error as e:
-        logging.error(f"Erreur SQLite lors de la récupération des réunions par statut: {str(e)}")
-        return []
-    finally:
-        release_db_connection(conn)
 
 
 def get_meeting_speakers(meeting_id, user_id):
@@ -419,17 +465,24 @@ def get_meeting_speakers(meeting_id, user_id):
             return [dict(speaker) for speaker in speakers]
         return []
     
-    except sqlite3.Error as e:
+    except DB_ERRORS as e:
         logging.error(f"Erreur lors de la récupération des locuteurs personnalisés: {str(e)}")
         return None
     finally:
         release_db_connection(conn)
 
 
+def _bump_speakers_version(cursor, meeting_id):
+    """Incrémente la version des noms de locuteurs (invalide les rendus en cache)"""
+    cursor.execute(
+        "UPDATE meetings SET speakers_version = speakers_version + 1 WHERE id = ?",
+        (meeting_id,)
+    )
+
+
 def set_meeting_speaker(meeting_id, user_id, speaker_id, custom_name):
     """Définit ou met à jour un nom personnalisé pour un locuteur dans une réunion"""
-    conn = get_db_connection()
-    try:
+    def write(conn):
         cursor = conn.cursor()
         
         # Vérifier d'abord que la réunion appartient à l'utilisateur
@@ -461,21 +514,19 @@ def set_meeting_speaker(meeting_id, user_id, speaker_id, custom_name):
                 (speaker_mapping_id, meeting_id, speaker_id, custom_name)
             )
         
-        conn.commit()
+        _bump_speakers_version(cursor, meeting_id)
         return True
     
-    except sqlite3.Error as e:
+    try:
+        return execute_write(write)
+    except DB_ERRORS as e:
         logging.error(f"Erreur lors de la définition du nom personnalisé du locuteur: {str(e)}")
-        conn.rollback()
         return False
-    finally:
-        release_db_connection(conn)
 
 
 def delete_meeting_speaker(meeting_id, user_id, speaker_id):
     """Supprime un nom personnalisé de locuteur pour une réunion"""
-    conn = get_db_connection()
-    try:
+    def write(conn):
         cursor = conn.cursor()
         
         # Vérifier d'abord que la réunion appartient à l'utilisateur
@@ -492,15 +543,14 @@ def delete_meeting_speaker(meeting_id, user_id, speaker_id):
             (meeting_id, speaker_id)
         )
         
-        conn.commit()
+        _bump_speakers_version(cursor, meeting_id)
         return True
     
-    except sqlite3.Error as e:
+    try:
+        return execute_write(write)
+    except DB_ERRORS as e:
         logging.error(f"Erreur lors de la suppression du nom personnalisé du locuteur: {str(e)}")
-        conn.rollback()
         return False
-    finally:
-        release_db_connection(conn)
 
 
 def get_custom_speaker_name(meeting_id, speaker_id):
@@ -517,7 +567,7 @@ def get_custom_speaker_name(meeting_id, speaker_id):
         result = cursor.fetchone()
         return result["custom_name"] if result else None
     
-    except sqlite3.Error as e:
+    except DB_ERRORS as e:
         logging.error(f"Erreur lors de la récupération du nom personnalisé du locuteur: {str(e)}")
         return None
     finally:
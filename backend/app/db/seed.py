@@ -1,6 +1,5 @@
-from ..db.database import get_user_by_email_cached, create_user, get_password_hash
+from ..db.database import get_user_by_email_cached, create_user, get_password_hash, DB_INTEGRITY_ERRORS
 from loguru import logger
-import sqlite3
 
 def create_default_users():
     """
@@ -51,7 +50,7 @@ def create_default_users():
                 try:
                     new_user = create_user(user_dict)
                     logger.info(f"Utilisateur par défaut créé: {user_data['email']}")
-                except sqlite3.IntegrityError:
+                except DB_INTEGRITY_ERRORS:
                     # Un autre worker a probablement créé l'utilisateur entre temps
                     logger.info(f"L'utilisateur {user_data['email']} a déjà été créé par un autre processus")
             else:
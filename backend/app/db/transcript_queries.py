@@ -0,0 +1,70 @@
+import json
+import zlib
+from .database import get_db_connection, release_db_connection, execute_write
+import logging
+
+# Champs conservés pour chaque utterance et chaque mot
+UTTERANCE_FIELDS = ("speaker", "text", "start", "end", "confidence")
+WORD_FIELDS = ("text", "start", "end", "confidence", "speaker")
+
+def compact_transcript(transcript_data):
+    """Ne conserve que les données utiles au rendu de la transcription"""
+    utterances = []
+    for utterance in transcript_data.get("utterances") or []:
+        entry = {key: utterance.get(key) for key in UTTERANCE_FIELDS}
+        entry["words"] = [
+            {key: word.get(key) for key in WORD_FIELDS}
+            for word in utterance.get("words") or []
+        ]
+        utterances.append(entry)
+
+    return {
+        "id": transcript_data.get("id"),
+        "status": transcript_data.get("status"),
+        "text": transcript_data.get("text"),
+        "audio_duration": transcript_data.get("audio_duration"),
+        "language_code": transcript_data.get("language_code"),
+        "utterances": utterances
+    }
+
+def save_transcript_data(meeting_id, transcript_id, transcript_data):
+    """Enregistrer la transcription structurée d'une réunion (JSON compressé)"""
+    logger = logging.getLogger("fastapi")
+
+    payload = json.dumps(compact_transcript(transcript_data), ensure_ascii=False).encode("utf-8")
+    blob = zlib.compress(payload, 6)
+
+    execute_write(lambda conn: conn.execute(
+        """
+        INSERT INTO meeting_transcripts (meeting_id, transcript_id, data)
+        VALUES (?, ?, ?)
+        ON CONFLICT (meeting_id) DO UPDATE SET transcript_id = excluded.transcript_id, data = excluded.data
+        """,
+        (meeting_id, transcript_id, blob)
+    ))
+    logger.info(f"Transcription structurée enregistrée pour la réunion {meeting_id} "
+                f"({len(payload) // 1024} KB -> {len(blob) // 1024} KB)")
+    return True
+
+def get_transcript_data(meeting_id):
+    """Récupérer la transcription structurée d'une réunion, ou None si elle n'est pas stockée"""
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT data FROM meeting_transcripts WHERE meeting_id = ?",
+            (meeting_id,)
+        )
+        row = cursor.fetchone()
+        if not row:
+            return None
+        return json.loads(zlib.decompress(row["data"]).decode("utf-8"))
+    finally:
+        release_db_connection(conn)
+
+def delete_transcript_data(meeting_id):
+    """Supprimer la transcription structurée d'une réunion"""
+    deleted = execute_write(lambda conn: conn.execute(
+        "DELETE FROM meeting_transcripts WHERE meeting_id = ?", (meeting_id,)
+    ).rowcount)
+    return deleted > 0
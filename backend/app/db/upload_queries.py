@@ -0,0 +1,171 @@
+import uuid
+from datetime import datetime, timedelta
+from .database import get_db_connection, release_db_connection, execute_write
+import logging
+
+def create_upload_session(session_data, user_id):
+    """Créer une nouvelle session d'upload reprenable"""
+    logger = logging.getLogger("fastapi")
+
+    upload_id = str(uuid.uuid4())
+    now = datetime.utcnow().isoformat()
+
+    def write(conn):
+        conn.execute(
+            """
+            INSERT INTO upload_sessions (
+                id, user_id, filename, content_type, title, client_id,
+                total_size, received_size, status, created_at, updated_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, 0, 'uploading', ?, ?)
+            """,
+            (
+                upload_id,
+                user_id,
+                session_data["filename"],
+                session_data.get("content_type"),
+                session_data.get("title"),
+                session_data.get("client_id"),
+                session_data["total_size"],
+                now,
+                now
+            )
+        )
+        return conn.execute("SELECT * FROM upload_sessions WHERE id = ?", (upload_id,)).fetchone()
+
+    session = execute_write(write)
+    logger.info(f"Session d'upload {upload_id} créée pour l'utilisateur {user_id}")
+    return dict(session) if session else None
+
+def get_upload_session(upload_id, user_id):
+    """Récupérer une session d'upload appartenant à l'utilisateur"""
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT * FROM upload_sessions WHERE id = ? AND user_id = ?",
+            (upload_id, user_id)
+        )
+        session = cursor.fetchone()
+        return dict(session) if session else None
+    finally:
+        release_db_connection(conn)
+
+def update_upload_session(upload_id, user_id, update_data):
+    """Mettre à jour une session d'upload (offset reçu, statut, réunion créée)"""
+    update_data = dict(update_data)
+    update_data["updated_at"] = datetime.utcnow().isoformat()
+
+    placeholders = ", ".join([f"{k} = ?" for k in update_data.keys()])
+    values = list(update_data.values())
+
+    updated = execute_write(lambda conn: conn.execute(
+        f"UPDATE upload_sessions SET {placeholders} WHERE id = ? AND user_id = ?",
+        (*values, upload_id, user_id)
+    ).rowcount)
+    return updated > 0
+
+def claim_upload_write(upload_id, user_id, offset, stale_after_seconds):
+    """
+    Réserver la session pour l'écriture d'un morceau à `offset` (statut 'writing').
+
+    La réservation échoue si l'offset ne correspond plus ou si un autre envoi est
+    en cours, sauf s'il n'a plus donné de nouvelles depuis stale_after_seconds.
+
+    Returns:
+        str: jeton d'écriture (updated_at posé par la réservation), ou None
+    """
+    now = datetime.utcnow()
+    token = now.isoformat()
+    stale_before = (now - timedelta(seconds=stale_after_seconds)).isoformat()
+    claimed = execute_write(lambda conn: conn.execute(
+        """
+        UPDATE upload_sessions SET status = 'writing', updated_at = ?
+        WHERE id = ? AND user_id = ? AND received_size = ?
+            AND (status = 'uploading' OR (status = 'writing' AND updated_at < ?))
+        """,
+        (token, upload_id, user_id, offset, stale_before)
+    ).rowcount)
+    return token if claimed else None
+
+def renew_upload_write(upload_id, token):
+    """Signaler que l'écriture est toujours en cours ; nouveau jeton, ou None si la réservation a été reprise"""
+    new_token = datetime.utcnow().isoformat()
+    renewed = execute_write(lambda conn: conn.execute(
+        "UPDATE upload_sessions SET updated_at = ? WHERE id = ? AND status = 'writing' AND updated_at = ?",
+        (new_token, upload_id, token)
+    ).rowcount)
+    return new_token if renewed else None
+
+def release_upload_write(upload_id, token, received_size):
+    """Terminer l'écriture : enregistrer l'offset atteint et rendre la session ; False si elle a été reprise"""
+    released = execute_write(lambda conn: conn.execute(
+        """
+        UPDATE upload_sessions SET status = 'uploading', received_size = ?, updated_at = ?
+        WHERE id = ? AND status = 'writing' AND updated_at = ?
+        """,
+        (received_size, datetime.utcnow().isoformat(), upload_id, token)
+    ).rowcount)
+    return released > 0
+
+def start_upload_finalization(upload_id, user_id):
+    """
+    Passer un upload complet à l'état 'finalizing' (depuis 'uploading' ou 'error').
+
+    Returns:
+        bool: False si l'upload n'est pas complet ou a changé d'état (finalisation concurrente)
+    """
+    started = execute_write(lambda conn: conn.execute(
+        """
+        UPDATE upload_sessions SET status = 'finalizing', updated_at = ?
+        WHERE id = ? AND user_id = ? AND status IN ('uploading', 'error')
+            AND received_size = total_size
+        """,
+        (datetime.utcnow().isoformat(), upload_id, user_id)
+    ).rowcount)
+    return started > 0
+
+def purge_stale_upload_sessions(older_than_seconds):
+    """
+    Supprimer les sessions d'upload sans activité depuis plus de older_than_seconds
+    (abandonnées par le client, ou finalisées).
+
+    Returns:
+        list: identifiants des sessions supprimées (pour supprimer leur fichier partiel)
+    """
+    cutoff = (datetime.utcnow() - timedelta(seconds=older_than_seconds)).isoformat()
+
+    def purge(conn):
+        rows = conn.execute(
+            "SELECT id FROM upload_sessions WHERE updated_at < ?", (cutoff,)
+        ).fetchall()
+        conn.execute("DELETE FROM upload_sessions WHERE updated_at < ?", (cutoff,))
+        return [row["id"] for row in rows]
+
+    return execute_write(purge)
+
+def get_upload_session_ids():
+    """Identifiants de toutes les sessions d'upload existantes"""
+    conn = get_db_connection()
+    try:
+        return {row["id"] for row in conn.execute("SELECT id FROM upload_sessions").fetchall()}
+    finally:
+        release_db_connection(conn)
+
+def delete_upload_session(upload_id, user_id, stale_after_seconds):
+    """
+    Supprimer une session d'upload qui n'est ni en cours d'écriture ni en cours de
+    finalisation (une écriture sans nouvelles depuis stale_after_seconds est abandonnée).
+
+    Returns:
+        bool: False si la session n'existe pas ou est utilisée par une autre requête
+    """
+    stale_before = (datetime.utcnow() - timedelta(seconds=stale_after_seconds)).isoformat()
+    deleted = execute_write(lambda conn: conn.execute(
+        """
+        DELETE FROM upload_sessions
+        WHERE id = ? AND user_id = ?
+            AND (status IN ('uploading', 'error') OR (status = 'writing' AND updated_at < ?))
+        """,
+        (upload_id, user_id, stale_before)
+    ).rowcount)
+    return deleted > 0
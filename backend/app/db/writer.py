@@ -0,0 +1,166 @@
+"""
+Écrivain unique de la base SQLite.
+
+SQLite n'accepte qu'une transaction d'écriture à la fois : plutôt que de laisser
+chaque thread (handlers API, processeur de file, threads de transcription)
+prendre le verrou d'écriture et réessayer sur « database is locked », toutes les
+écritures passent par un thread dédié qui possède la seule connexion en écriture.
+
+Les écritures soumises pendant qu'une transaction est en cours sont regroupées
+dans la suivante (group commit) : un seul COMMIT pour tout le lot. Chaque écriture
+s'exécute dans son propre SAVEPOINT, de sorte qu'une erreur n'annule que
+l'écriture fautive. Le résultat est transmis à l'appelant via un Future, résolu
+après le COMMIT.
+"""
+
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+logger = logging.getLogger("fastapi")
+
+def open_write_connection(db_path):
+    """Ouvre une connexion en écriture, en mode autocommit (transactions explicites)"""
+    conn = sqlite3.connect(str(db_path), timeout=60.0, isolation_level=None, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode = WAL')  # Lectures concurrentes pendant les écritures
+    conn.execute('PRAGMA synchronous = NORMAL')  # Bon équilibre entre performance et sécurité
+    conn.execute('PRAGMA busy_timeout = 30000')  # Scripts de maintenance éventuellement concurrents
+    return conn
+
+class DatabaseWriter:
+    """Thread d'écriture unique avec regroupement des COMMIT"""
+
+    def __init__(self, db_path, batch_size=64, batch_wait=0.002):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._conn = None
+        # Métriques
+        self._writes = 0
+        self._batches = 0
+        self._errors = 0
+        self._commit_time_total = 0.0
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._conn = open_write_connection(self.db_path)
+                self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Soumet une écriture. `fn(conn, *args, **kwargs)` est exécutée dans le thread
+        d'écriture et ne doit pas appeler commit().
+
+        Returns:
+            Future: résolu avec le retour de fn après le COMMIT du lot
+        """
+        future = Future()
+        if threading.current_thread() is self._thread:
+            # Écriture imbriquée depuis le thread d'écriture : exécution directe
+            try:
+                future.set_result(fn(self._conn, *args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        self._ensure_started()
+        self._queue.put((fn, args, kwargs, future))
+        return future
+
+    def execute(self, fn, *args, **kwargs):
+        """Soumet une écriture et attend son résultat"""
+        return self.submit(fn, *args, **kwargs).result()
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch[0] is None:
+                return
+            self._process(batch)
+
+    def _process(self, batch):
+        outcomes = []
+        try:
+            self._conn.execute("BEGIN IMMEDIATE")
+            for item in batch:
+                if item is None:
+                    # Arrêt demandé : le placer en tête de la prochaine itération
+                    self._queue.put(None)
+                    continue
+                fn, args, kwargs, future = item
+                if not future.set_running_or_notify_cancel():
+                    continue
+                self._conn.execute("SAVEPOINT write")
+                try:
+                    result = fn(self._conn, *args, **kwargs)
+                    self._conn.execute("RELEASE write")
+                    outcomes.append((future, result, None))
+                except Exception as e:
+                    self._conn.execute("ROLLBACK TO write")
+                    self._conn.execute("RELEASE write")
+                    self._errors += 1
+                    outcomes.append((future, None, e))
+
+            start = time.perf_counter()
+            self._conn.execute("COMMIT")
+            self._commit_time_total += time.perf_counter() - start
+        except Exception as e:
+            logger.error(f"Échec du lot d'écritures ({len(batch)} écritures): {str(e)}")
+            if self._conn.in_transaction:
+                self._conn.execute("ROLLBACK")
+            # Tout le lot est annulé, y compris les écritures qui avaient réussi
+            for item in batch:
+                if item is not None and not item[3].done():
+                    item[3].set_exception(e)
+            outcomes = []
+
+        self._batches += 1
+        self._writes += len(batch)
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def stop(self, timeout=10):
+        """Termine les écritures en attente puis arrête le thread d'écriture"""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._conn.close()
+        self._thread = None
+
+    def stats(self):
+        """Métriques du thread d'écriture"""
+        return {
+            "writes": self._writes,
+            "batches": self._batches,
+            "errors": self._errors,
+            "pending": self._queue.qsize(),
+            "avg_batch_size": round(self._writes / self._batches, 2) if self._batches else 0,
+            "commit_time_total_ms": round(self._commit_time_total * 1000, 1),
+        }
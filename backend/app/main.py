@@ -3,12 +3,15 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse, RedirectResponse
 from fastapi.openapi.utils import get_openapi
-from .routes import auth, meetings, profile, simple_meetings, clients, admin, speakers
+from .routes import auth, meetings, profile, simple_meetings, clients, admin, speakers, uploads, webhooks
+from .core.cache import TTLCache
 from .core.config import settings
 from .core.security import get_current_user
+from .db.database import PoolTimeoutError, get_pool_stats
 import time
 import logging
 import os
+import asyncio
 from contextlib import asynccontextmanager
 from .services.queue_processor import start_queue_processor, stop_queue_processor
 
@@ -33,23 +36,41 @@ async def lifespan(app: FastAPI):
     logger.info("Création des utilisateurs par défaut si nécessaire")
     create_default_users()
     
-    # Traiter immédiatement les transcriptions en attente au démarrage
-    from .services.assemblyai import process_pending_transcriptions
-    logger.info("Traitement des transcriptions en attente au démarrage")
-    process_pending_transcriptions()
-    
-    # Démarrer le processeur de file d'attente
-    await start_queue_processor()
+    if settings.RUN_BACKGROUND_JOBS:
+        # Relancer les conversions audio interrompues par un redémarrage
+        from .services.conversion import resume_pending_conversions
+        resume_pending_conversions()
+        
+        # Démarrer le processeur de file d'attente (lance aussi la réconciliation
+        # des transcriptions bloquées en arrière-plan, sans retarder le démarrage)
+        await start_queue_processor()
+    else:
+        logger.info("Traitement en arrière-plan désactivé (RUN_BACKGROUND_JOBS=false), confié à app.worker")
     
     # Générer le schéma OpenAPI
     yield
-    # Opérations de fermeture
+    # Opérations de fermeture : ne plus réclamer de tâches, puis laisser les
+    # conversions, transcriptions et vérifications en cours se terminer
     await stop_queue_processor()
+    
+    # Fermer les connexions HTTP vers AssemblyAI
+    from .services.assemblyai_client import assemblyai_client
+    await assemblyai_client.aclose()
+    
+    # Arrêter le pool bcrypt
+    from .core.security import shutdown_password_executor
+    await asyncio.to_thread(shutdown_password_executor)
+    
+    # Terminer les requêtes base en cours puis valider les écritures en attente
+    from .db.async_queries import shutdown_db_executor
+    await asyncio.to_thread(shutdown_db_executor)
+    from .db.database import db_writer
+    await asyncio.to_thread(db_writer.stop)
     logger.info("Arrêt de l'API Meeting Transcriber")
 
 # Cache pour les réponses des endpoints sans état
-response_cache = {}
 CACHE_TTL = 300  # 5 minutes en secondes
+response_cache = TTLCache("responses", maxsize=settings.RESPONSE_CACHE_SIZE, ttl=CACHE_TTL)
 
 # Création de l'application FastAPI
 app = FastAPI(
@@ -91,11 +112,13 @@ async def add_process_time_header(request: Request, call_next):
 async def global_exception_handler(request: Request, exc: Exception):
     logger.error(f"Exception non gérée: {exc}")
     
-    # Réinitialiser le pool de connexions en cas d'erreur de connexion à la base de données
-    if isinstance(exc, TimeoutError) and "connexion à la base de données" in str(exc):
-        from .db.database import reset_db_pool
-        reset_db_pool()
-        logger.warning("Pool de connexions réinitialisé suite à une erreur de connexion")
+    # Pool de connexions épuisé : la requête peut être réessayée
+    if isinstance(exc, PoolTimeoutError):
+        logger.warning(f"Pool de connexions saturé: {get_pool_stats()}")
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": str(exc)},
+        )
     
     return JSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -109,6 +132,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Routes de base
@@ -130,12 +154,14 @@ async def health_check():
 
 # Intégration des routes
 app.include_router(auth.router, prefix="")
+app.include_router(uploads.router, prefix="")
 app.include_router(meetings.router, prefix="")
 app.include_router(profile.router, prefix="")
 app.include_router(clients.router, prefix="")
 app.include_router(simple_meetings.router, prefix="")
 app.include_router(admin.router, prefix="")
 app.include_router(speakers.router, prefix="")
+app.include_router(webhooks.router, prefix="")
 
 # Montage des répertoires de fichiers statiques
 # Utiliser le disque persistant de Render si disponible
@@ -180,7 +206,7 @@ def custom_openapi():
     
     # Appliquer la sécurité sur toutes les routes qui en ont besoin
     for path in openapi_schema["paths"]:
-        if path not in ["/", "/health", "/auth/login", "/auth/register", "/docs", "/redoc", "/openapi.json"]:
+        if path not in ["/", "/health", "/auth/login", "/auth/register", "/docs", "/redoc", "/openapi.json", "/webhooks/assemblyai"]:
             if "get" in openapi_schema["paths"][path]:
                 openapi_schema["paths"][path]["get"]["security"] = [{"bearerAuth": []}]
             if "post" in openapi_schema["paths"][path]:
@@ -189,6 +215,8 @@ def custom_openapi():
                 openapi_schema["paths"][path]["put"]["security"] = [{"bearerAuth": []}]
             if "delete" in openapi_schema["paths"][path]:
                 openapi_schema["paths"][path]["delete"]["security"] = [{"bearerAuth": []}]
+            if "patch" in openapi_schema["paths"][path]:
+                openapi_schema["paths"][path]["patch"]["security"] = [{"bearerAuth": []}]
     
     app.openapi_schema = openapi_schema
     return app.openapi_schema
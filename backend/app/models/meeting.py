@@ -29,6 +29,10 @@ class Meeting(MeetingBase):
     speakers_count: Optional[int] = None
     summary_text: Optional[str] = None
     summary_status: Optional[str] = None
+    audio_format: Optional[str] = None
+    original_size_bytes: Optional[int] = None
+    stored_size_bytes: Optional[int] = None
+    conversion_ms: Optional[int] = None
 
     class Config:
         orm_mode = True
@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class UploadSessionCreate(BaseModel):
+    """Modèle pour l'initialisation d'un upload reprenable"""
+    filename: str
+    size: int
+    content_type: Optional[str] = None
+    title: Optional[str] = None
+    client_id: Optional[str] = None
+
+class UploadSession(BaseModel):
+    """Modèle d'état d'un upload reprenable"""
+    id: str
+    filename: str
+    content_type: Optional[str] = None
+    title: Optional[str] = None
+    client_id: Optional[str] = None
+    total_size: int
+    received_size: int
+    status: str
+    meeting_id: Optional[str] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+
+    class Config:
+        orm_mode = True
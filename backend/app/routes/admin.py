@@ -1,12 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import JSONResponse
 import logging
-import subprocess
-import sys
-import os
-from pathlib import Path
 
+from ..core.cache import get_cache_stats as get_memory_cache_stats
 from ..core.security import get_current_user
+from ..db.database import get_pool_stats, get_writer_stats
+from ..db.async_queries import run_db
+from ..db.cache_queries import get_cache_stats
+from ..db.job_queries import get_job_counts
+from ..db.lock_queries import get_locks
+from ..services.executors import get_executor_stats
+from ..services.queue_processor import requeue_stuck_summaries
 
 # Configuration du logging
 logger = logging.getLogger("meeting-transcriber")
@@ -16,56 +20,55 @@ router = APIRouter(prefix="/admin", tags=["Administration"])
 @router.post("/update-summaries", response_model=dict)
 async def update_stuck_summaries(current_user: dict = Depends(get_current_user)):
     """
-    Exécute le script de mise à jour des comptes rendus bloqués.
+    Remet dans la file de tâches les comptes rendus bloqués.
     
-    Cette route est temporaire et permet de débloquer les comptes rendus qui sont
-    restés en statut 'processing' trop longtemps.
+    Les comptes rendus restés en statut 'processing' sans tâche active sont
+    replanifiés dans le pool "summarize" ; ceux déjà en file ne sont pas dupliqués.
     """
     try:
         # Vérifier que l'utilisateur a les droits d'administration
         # Pour simplifier, on autorise tous les utilisateurs pour l'instant
         
-        logger.info(f"Exécution du script de mise à jour des comptes rendus par l'utilisateur {current_user['id']}")
-        
-        # Chemin du script
-        script_path = Path(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))) / "update_summary_status.py"
-        
-        if not os.path.exists(script_path):
-            logger.error(f"Script non trouvé: {script_path}")
-            return JSONResponse(
-                status_code=404,
-                content={"message": "Script de mise à jour non trouvé", "success": False}
-            )
-        
-        # Exécuter le script en arrière-plan
-        process = subprocess.Popen(
-            [sys.executable, str(script_path)],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-        
-        # Attendre un peu pour voir si le script démarre correctement
-        try:
-            stdout, stderr = process.communicate(timeout=2)
-            if process.returncode != 0:
-                logger.error(f"Erreur lors du démarrage du script: {stderr}")
-                return JSONResponse(
-                    status_code=500,
-                    content={"message": f"Erreur lors du démarrage du script: {stderr}", "success": False}
-                )
-        except subprocess.TimeoutExpired:
-            # C'est normal, le script continue de s'exécuter
-            logger.info("Script démarré en arrière-plan")
+        logger.info(f"Replanification des comptes rendus bloqués par l'utilisateur {current_user['id']}")
+        queued = await run_db(requeue_stuck_summaries)
         
         return {
-            "message": "Mise à jour des comptes rendus démarrée en arrière-plan",
+            "message": f"{queued} compte(s) rendu(s) remis dans la file de génération",
+            "queued": queued,
             "success": True
         }
         
     except Exception as e:
-        logger.error(f"Erreur lors de l'exécution du script de mise à jour: {str(e)}")
+        logger.error(f"Erreur lors de la replanification des comptes rendus: {str(e)}")
         return JSONResponse(
             status_code=500,
             content={"message": f"Une erreur s'est produite: {str(e)}", "success": False}
         )
+
+@router.get("/jobs", response_model=dict)
+async def get_jobs_status(current_user: dict = Depends(get_current_user)):
+    """
+    État du travail en arrière-plan : tâches de la file persistante par type et par
+    état, occupation des pools de workers de cette instance, baux des tâches
+    périodiques (instance qui les exécute) et cache des résultats.
+    """
+    return {
+        "jobs": await run_db(get_job_counts),
+        "executors": get_executor_stats(),
+        "leases": await run_db(get_locks),
+        "result_cache": await run_db(get_cache_stats)
+    }
+
+@router.get("/metrics", response_model=dict)
+async def get_metrics(current_user: dict = Depends(get_current_user)):
+    """
+    Métriques internes de cette instance : pool de connexions et écrivain de la
+    base, caches mémoire (taille, taux de succès, évictions) et pools de workers.
+    Réservé aux utilisateurs authentifiés ; /health reste une sonde publique minimale.
+    """
+    return {
+        "db_pool": get_pool_stats(),
+        "db_writer": get_writer_stats(),
+        "caches": get_memory_cache_stats(),
+        "executors": get_executor_stats()
+    }
@@ -2,9 +2,13 @@ from datetime import timedelta, datetime
 from fastapi import APIRouter, Depends, HTTPException, Body, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.responses import RedirectResponse
-from ..db.database import get_user_by_email_cached, create_user, get_password_hash, purge_old_entries_from_cache, get_user_by_oauth
+from ..db.database import purge_old_entries_from_cache
+from ..db.async_queries import get_user_by_email_cached_async, create_user_async, get_user_by_oauth_async
 from ..models.user import UserCreate, User, UserCreateOAuth
-from ..core.security import create_access_token, verify_password, get_current_user, purge_password_cache
+from ..core.security import (
+    create_access_token, verify_password_async, get_password_hash_async, rehash_password_if_needed,
+    get_current_user, purge_password_cache
+)
 from ..core.config import settings
 from ..services.oauth_state_manager import oauth_state_manager
 from pydantic import BaseModel
@@ -56,12 +60,12 @@ async def register(user_data: UserCreate = Body(..., description="Informations d
     """
     try:
         # Vérifier si l'email est déjà utilisé
-        existing_user = get_user_by_email_cached(user_data.email)
+        existing_user = await get_user_by_email_cached_async(user_data.email)
         if existing_user:
             raise HTTPException(status_code=400, detail="Email déjà utilisé")
             
         # Créer le nouvel utilisateur
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await get_password_hash_async(user_data.password)
         
         user_dict = {
             "email": user_data.email,
@@ -69,7 +73,7 @@ async def register(user_data: UserCreate = Body(..., description="Informations d
             "full_name": user_data.full_name
         }
         
-        new_user = create_user(user_dict)
+        new_user = await create_user_async(user_dict)
         
         return {
             "message": "Utilisateur créé avec succès",
@@ -106,13 +110,14 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     """
     try:
         # Recherche de l'utilisateur par email
-        user = get_user_by_email_cached(form_data.username)
+        user = await get_user_by_email_cached_async(form_data.username)
         if not user:
             raise HTTPException(status_code=401, detail="Email ou mot de passe incorrect")
             
         # Vérification du mot de passe
-        if not verify_password(form_data.password, user["hashed_password"]):
+        if not await verify_password_async(form_data.password, user["hashed_password"]):
             raise HTTPException(status_code=401, detail="Email ou mot de passe incorrect")
+        await rehash_password_if_needed(user, form_data.password)
             
         # Création du token JWT
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -164,13 +169,14 @@ async def login_json(login_data: LoginRequest):
     """
     try:
         # Recherche de l'utilisateur par email
-        user = get_user_by_email_cached(login_data.email)
+        user = await get_user_by_email_cached_async(login_data.email)
         if not user:
             raise HTTPException(status_code=401, detail="Email ou mot de passe incorrect")
             
         # Vérification du mot de passe
-        if not verify_password(login_data.password, user["hashed_password"]):
+        if not await verify_password_async(login_data.password, user["hashed_password"]):
             raise HTTPException(status_code=401, detail="Email ou mot de passe incorrect")
+        await rehash_password_if_needed(user, login_data.password)
             
         # Création du token JWT
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -358,7 +364,7 @@ async def google_callback(request: Request, code: Optional[str] = None, state: O
         logger.info(f"Informations utilisateur Google récupérées pour: {google_user.get('email', 'email_unknown')}")
         
         # Vérifier si l'utilisateur existe déjà par OAuth
-        existing_user = get_user_by_oauth("google", google_user["id"])
+        existing_user = await get_user_by_oauth_async("google", google_user["id"])
         
         if existing_user:
             # Utilisateur existant, créer un token JWT
@@ -366,7 +372,7 @@ async def google_callback(request: Request, code: Optional[str] = None, state: O
             logger.info(f"Utilisateur OAuth existant trouvé: {user.get('email', 'email_unknown')}")
         else:
             # Vérifier si un utilisateur avec cet email existe déjà (compte classique)
-            existing_email_user = get_user_by_email_cached(google_user["email"])
+            existing_email_user = await get_user_by_email_cached_async(google_user["email"])
             
             if existing_email_user and not existing_email_user.get("oauth_provider"):
                 logger.warning(f"Email déjà utilisé avec compte classique: {google_user['email']}")
@@ -385,7 +391,7 @@ async def google_callback(request: Request, code: Optional[str] = None, state: O
                 "oauth_id": google_user["id"]
             }
             
-            user = create_user(user_data)
+            user = await create_user_async(user_data)
             logger.info(f"Nouvel utilisateur OAuth créé: {user.get('email', 'email_unknown')}")
         
         # Créer le token JWT
@@ -1,20 +1,26 @@
-from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, Path, Query
+from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, Path, Query, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.logger import logger
 from ..core.security import get_current_user
 from ..models.user import User
 from ..models.meeting import Meeting, MeetingCreate, MeetingUpdate
 from ..db.firebase import upload_mp3
-from ..services.assemblyai import transcribe_meeting, convert_to_wav, check_transcription_status, process_transcription
-from ..services.mistral_summary import process_meeting_summary
-from ..db.queries import create_meeting, get_meeting, get_meetings_by_user, update_meeting, delete_meeting, get_meeting_speakers
+from ..services.assemblyai import process_completed_transcript, TranscriptObject
+from ..services.assemblyai_client import assemblyai_client
+from ..services.file_upload import save_upload_stream
+from ..services.audio_pipeline import ingest_audio_file, get_audio_upload_path
+from ..services.conversion import conversion_stage, ConversionQueueFullError
+from ..services.queue_processor import enqueue_summary, enqueue_transcription, summary_dedupe_key
+from ..db.database import get_db
+from ..db.job_queries import get_active_job
+from ..db.async_queries import (
+    run_db, get_meeting_async, list_meetings_page_async, update_meeting_async, delete_meeting_async
+)
 from datetime import datetime
 from typing import List, Optional
 import os
-import tempfile
 import traceback
-import subprocess
-import threading
-from ..services.transcription_checker import get_assemblyai_transcript_details, format_transcript_text
+from ..services.transcript_render import render_transcript_async
 
 router = APIRouter(prefix="/meetings", tags=["Réunions"])
 
@@ -28,15 +34,17 @@ async def upload_meeting(
     """
     Télécharge un fichier audio et crée une nouvelle réunion avec transcription.
     
-    - **file**: Fichier audio au format MP3 ou WAV
+    - **file**: Fichier audio (MP3, WAV, M4A, OGG, WEBM, FLAC)
     - **title**: Titre optionnel de la réunion (utilisera le nom du fichier par défaut)
     
     Le processus se déroule en plusieurs étapes:
-    1. Upload du fichier
-    2. Création d'une entrée dans la base de données
-    3. Démarrage synchrone de la transcription via AssemblyAI
+    1. Upload du fichier (écrit sur disque par blocs, taille limitée à MAX_UPLOAD_SIZE)
+    2. Création d'une entrée dans la base de données avec le statut `converting`
+    3. Conversion en arrière-plan, puis passage en `processing` et transcription via AssemblyAI
     
-    La transcription peut prendre du temps en fonction de la durée de l'audio.
+    La réponse est immédiate ; la conversion et la transcription peuvent prendre du temps
+    en fonction de la durée de l'audio. Si la file de conversion est pleine, l'upload
+    est refusé avec une erreur 503.
     
     Améliorations de sécurité:
     - Vérification de l'authentification avant de commencer le traitement
@@ -56,100 +64,74 @@ async def upload_meeting(
     if not title:
         title = file.filename
         
-    # Créer un dossier temporaire pour la conversion
-    with tempfile.TemporaryDirectory() as temp_dir:
-        try:
-            # Sauvegarder le fichier original
-            temp_input = os.path.join(temp_dir, "input" + os.path.splitext(file.filename)[1])
-            with open(temp_input, "wb") as f:
-                content = await file.read()
-                f.write(content)
-            
-            # Vérifier le format du fichier
-            file_info = subprocess.run(['file', temp_input], capture_output=True, text=True)
-            logger.info(f"Type de fichier détecté: {file_info.stdout}")
-            
-            # Toujours convertir en WAV pour s'assurer de la compatibilité
-            logger.info(f"Conversion du fichier {temp_input} en WAV...")
-            temp_output = convert_to_wav(temp_input)
-            
-            # Vérifier que le fichier converti est bien un WAV
-            file_info = subprocess.run(['file', temp_output], capture_output=True, text=True)
-            logger.info(f"Type de fichier après conversion: {file_info.stdout}")
-            
-            if "WAVE" not in file_info.stdout and "WAV" not in file_info.stdout:
-                raise Exception(f"Le fichier n'a pas été correctement converti en WAV: {file_info.stdout}")
-            
-            # Créer le dossier de destination s'il n'existe pas
-            user_upload_dir = os.path.join("uploads", str(current_user["id"]))
-            os.makedirs(user_upload_dir, exist_ok=True)
-            
-            # Générer un nom de fichier unique
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{timestamp}_tmp{next(tempfile._get_candidate_names())}.wav"
-            final_path = os.path.join(user_upload_dir, filename)
-            
-            # Copier le fichier WAV vers sa destination finale
-            with open(temp_output, "rb") as src, open(final_path, "wb") as dst:
-                dst.write(src.read())
-            
-            # Créer l'entrée dans la base de données avec le statut "processing" dès le début
-            file_url = f"/{final_path}"
-            meeting_data = {
-                "title": title,
-                "file_url": file_url,
-                "transcript_status": "processing"
+    # Refuser l'upload avant de recevoir le fichier si la conversion est saturée
+    if not await run_db(conversion_stage.has_capacity):
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "message": "Le service de conversion est saturé",
+                "type": "CONVERSION_QUEUE_FULL",
+                "action": "Veuillez réessayer dans quelques instants"
             }
-            
-            # Ajouter client_id si fourni
-            if client_id:
-                meeting_data["client_id"] = client_id
-            meeting = create_meeting(meeting_data, current_user["id"])
-            
-            # Lancer la transcription de manière asynchrone avec logs détaillés
-            logger.info(f"Lancement de la transcription pour la réunion {meeting['id']}")
-            try:
-                # Créer un thread et exécuter immédiatement la transcription avec le service unifié
-                transcription_thread = threading.Thread(
-                    target=process_transcription,
-                    args=(meeting["id"], file_url, current_user["id"])
-                )
-                transcription_thread.daemon = False  # Permet au thread de continuer même si le serveur s'arrête
-                transcription_thread.start()
-                
-                logger.info(f"Transcription lancée directement pour la réunion {meeting['id']}")
-            except Exception as e:
-                logger.error(f"Erreur lors du lancement de la transcription: {str(e)}")
-                logger.error(traceback.format_exc())
-                # Ne pas faire échouer la requête, juste logger l'erreur
-            
-            return meeting
-            
-        except Exception as e:
-            logger.error(f"Erreur lors de l'upload: {str(e)}")
-            logger.error(traceback.format_exc())
-            raise HTTPException(
-                status_code=500,
-                detail=f"Une erreur s'est produite lors de l'upload: {str(e)}"
-            )
+        )
+    
+    try:
+        # Sauvegarder le fichier original dans le dossier de l'utilisateur
+        # La copie se fait par blocs pour garder une empreinte mémoire constante
+        input_path = get_audio_upload_path(current_user["id"], file.filename)
+        await save_upload_stream(file, input_path)
+        
+        # Création de la réunion et mise en file de la conversion (retour immédiat)
+        meeting = await run_in_threadpool(ingest_audio_file, input_path, title, current_user["id"], client_id)
+        
+        return meeting
+        
+    except HTTPException:
+        raise
+    except ConversionQueueFullError as e:
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "message": str(e),
+                "type": "CONVERSION_QUEUE_FULL",
+                "action": "Veuillez réessayer dans quelques instants"
+            }
+        )
+    except Exception as e:
+        logger.error(f"Erreur lors de l'upload: {str(e)}")
+        logger.error(traceback.format_exc())
+        raise HTTPException(
+            status_code=500,
+            detail=f"Une erreur s'est produite lors de l'upload: {str(e)}"
+        )
 
 @router.get("/", response_model=List[dict])
 async def list_meetings(
+    response: Response,
     status: Optional[str] = Query(None, description="Filtrer par statut de transcription (pending, processing, completed, error)"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Nombre maximum de réunions par page"),
+    cursor: Optional[str] = Query(None, description="Curseur de la page suivante (en-tête X-Next-Cursor)"),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Liste toutes les réunions de l'utilisateur connecté.
     
     - **status**: Filtre optionnel pour afficher uniquement les réunions avec un statut spécifique
+    - **limit**: Taille de page optionnelle ; sans limite, toutes les réunions sont retournées
+    - **cursor**: Curseur retourné dans l'en-tête X-Next-Cursor de la page précédente
     
     Retourne une liste de réunions avec leurs métadonnées (sans le contenu complet des transcriptions).
     """
-    meetings = get_meetings_by_user(current_user["id"])
+    try:
+        meetings, next_cursor = await list_meetings_page_async(current_user["id"], status, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={"message": str(e), "type": "INVALID_CURSOR"}
+        )
     
-    # Filtrer par statut si spécifié
-    if status:
-        meetings = [m for m in meetings if m.get("transcript_status") == status]
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
         
     return meetings
 
@@ -170,7 +152,7 @@ async def get_meeting_route(
     # Log pour le debugging
     logger.info(f"Attempting to get meeting with ID: {meeting_id} for user: {current_user['id']}")
     
-    meeting = get_meeting(meeting_id, current_user["id"])
+    meeting = await get_meeting_async(meeting_id, current_user["id"])
     
     if not meeting:
         logger.warning(f"Meeting not found - ID: {meeting_id}, User ID: {current_user['id']}")
@@ -184,76 +166,12 @@ async def get_meeting_route(
             }
         )
     
-    # Si la transcription est terminée, appliquer automatiquement les noms personnalisés
-    if (meeting.get("transcript_status") == "completed" and 
-        meeting.get("transcript_text") and 
-        meeting.get("transcript_id")):
-        
-        logger.info(f"[DEBUG] Checking custom speaker names for meeting {meeting_id}")
-        try:
-            # Récupérer les noms personnalisés des locuteurs
-            speakers_data = get_meeting_speakers(meeting_id, current_user["id"])
-            logger.info(f"[DEBUG] Got speakers_data: {speakers_data}")
-            
-            if speakers_data:
-                # Construire le dictionnaire des noms personnalisés
-                speaker_names = {}
-                for speaker in speakers_data:
-                    speaker_names[speaker["speaker_id"]] = speaker["custom_name"]
-                
-                logger.info(f"[DEBUG] Speaker names mapping: {speaker_names}")
-                
-                # Si on a des noms personnalisés, vérifier si la transcription les utilise déjà
-                if speaker_names:
-                    transcript_text = meeting.get("transcript_text", "")
-                    needs_update = False
-                    
-                    # Vérifier si les noms personnalisés sont déjà appliqués
-                    for speaker_id, custom_name in speaker_names.items():
-                        logger.info(f"[DEBUG] Checking speaker {speaker_id} -> {custom_name}")
-                        logger.info(f"[DEBUG] Looking for '{speaker_id}:' in transcript")
-                        logger.info(f"[DEBUG] Looking for '{custom_name}' in transcript")
-                        
-                        speaker_in_transcript = f"{speaker_id}:" in transcript_text
-                        custom_name_in_transcript = custom_name in transcript_text
-                        
-                        logger.info(f"[DEBUG] '{speaker_id}:' found: {speaker_in_transcript}")
-                        logger.info(f"[DEBUG] '{custom_name}' found: {custom_name_in_transcript}")
-                        
-                        if speaker_in_transcript and not custom_name_in_transcript:
-                            needs_update = True
-                            logger.info(f"[DEBUG] Needs update for speaker {speaker_id}")
-                            break
-                    
-                    logger.info(f"[DEBUG] Final needs_update: {needs_update}")
-                    
-                    # Si la transcription a besoin d'être mise à jour
-                    if needs_update:
-                        logger.info(f"Applying custom speaker names to transcript for meeting {meeting_id}")
-                        
-                        # Récupérer les données complètes de la transcription depuis AssemblyAI
-                        transcript_data = get_assemblyai_transcript_details(meeting["transcript_id"])
-                        
-                        if transcript_data:
-                            # Formater la transcription avec les noms personnalisés
-                            updated_transcript = format_transcript_text(transcript_data, speaker_names)
-                            
-                            # Mettre à jour la transcription dans la réponse
-                            meeting["transcript_text"] = updated_transcript
-                            
-                            # Mettre à jour aussi en base de données pour la prochaine fois
-                            update_meeting(meeting_id, current_user["id"], {
-                                "transcript_text": updated_transcript
-                            })
-                            
-                            logger.info(f"Transcript updated with custom names: {list(speaker_names.values())}")
-                    else:
-                        logger.info(f"[DEBUG] No update needed - custom names already applied or no names to apply")
-        
-        except Exception as e:
-            # Log l'erreur mais ne pas faire échouer la requête
-            logger.error(f"Error applying custom speaker names: {str(e)}")
-            logger.error(f"[DEBUG] Exception details: {traceback.format_exc()}")
+    # Appliquer les noms personnalisés des locuteurs au rendu (le texte stocké reste canonique)
+    try:
+        meeting["transcript_text"] = await render_transcript_async(meeting, current_user["id"])
+    except Exception as e:
+        # Log l'erreur mais ne pas faire échouer la requête
+        logger.error(f"Error applying custom speaker names: {str(e)}")
     
     # Assurer que transcription_status est présent dans la réponse pour compatibilité frontend
     if 'transcript_status' in meeting and 'transcription_status' not in meeting:
@@ -282,13 +200,13 @@ async def update_meeting_route(
         raise HTTPException(status_code=400, detail="Aucune donnée à mettre à jour")
     
     # Mettre à jour les données
-    update_success = update_meeting(meeting_id, current_user["id"], update_data)
+    update_success = await update_meeting_async(meeting_id, current_user["id"], update_data)
     
     if not update_success:
         raise HTTPException(status_code=404, detail="Réunion non trouvée")
     
     # Récupérer la réunion mise à jour
-    updated_meeting = get_meeting(meeting_id, current_user["id"])
+    updated_meeting = await get_meeting_async(meeting_id, current_user["id"])
     
     if not updated_meeting:
         raise HTTPException(status_code=404, detail="Réunion non trouvée après mise à jour")
@@ -306,10 +224,12 @@ async def generate_meeting_summary_route(
     - **meeting_id**: Identifiant unique de la réunion
     
     Cette route déclenche la génération d'un compte rendu de réunion à partir
-    de la transcription existante. La génération s'effectue de manière asynchrone.
+    de la transcription existante. La génération s'effectue de manière asynchrone :
+    elle est ajoutée à la file de tâches et son avancement se suit avec
+    GET /meetings/{meeting_id}/summary/status.
     """
     # Vérifier que la réunion existe
-    meeting = get_meeting(meeting_id, current_user["id"])
+    meeting = await get_meeting_async(meeting_id, current_user["id"])
     
     if not meeting:
         raise HTTPException(
@@ -334,18 +254,13 @@ async def generate_meeting_summary_route(
             }
         )
     
-    # Lancer le processus de génération du compte rendu en mode synchrone
-    success = process_meeting_summary(meeting_id, current_user["id"])
-    
-    if success:
-        # Récupérer la réunion mise à jour
-        updated_meeting = get_meeting(meeting_id, current_user["id"])
-        
-        return {
-            "message": "Compte rendu généré avec succès",
-            "meeting": updated_meeting
-        }
-    else:
+    # Planifier la génération (pool "summarize") : la requête n'attend pas l'appel à Mistral
+    await update_meeting_async(meeting_id, current_user["id"], {"summary_status": "processing"})
+    try:
+        job = await run_in_threadpool(enqueue_summary, meeting_id, current_user["id"])
+    except Exception as e:
+        logger.error(f"Erreur lors de la planification du compte rendu: {str(e)}")
+        await update_meeting_async(meeting_id, current_user["id"], {"summary_status": "error"})
         raise HTTPException(
             status_code=500,
             detail={
@@ -353,6 +268,15 @@ async def generate_meeting_summary_route(
                 "type": "SUMMARY_GENERATION_ERROR"
             }
         )
+    
+    # Récupérer la réunion mise à jour
+    updated_meeting = await get_meeting_async(meeting_id, current_user["id"])
+    
+    return {
+        "message": "Génération du compte rendu lancée",
+        "meeting": updated_meeting,
+        "job_id": job["id"]
+    }
 
 @router.get("/{meeting_id}/summary", response_model=dict)
 async def get_meeting_summary(
@@ -367,7 +291,7 @@ async def get_meeting_summary(
     Retourne le compte rendu de la réunion et son statut.
     """
     # Vérifier que la réunion existe
-    meeting = get_meeting(meeting_id, current_user["id"])
+    meeting = await get_meeting_async(meeting_id, current_user["id"])
     
     if not meeting:
         raise HTTPException(
@@ -390,6 +314,47 @@ async def get_meeting_summary(
         "summary_status": summary_status
     }
 
+@router.get("/{meeting_id}/summary/status", response_model=dict)
+async def get_meeting_summary_status(
+    meeting_id: str = Path(..., description="ID unique de la réunion"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Récupère l'état de la génération du compte rendu d'une réunion.
+    
+    - **meeting_id**: Identifiant unique de la réunion
+    
+    Retourne le statut du compte rendu et, si une génération est en file ou en
+    cours, l'état de la tâche (tentatives, prochaine tentative, dernière erreur).
+    """
+    meeting = await get_meeting_async(meeting_id, current_user["id"])
+    
+    if not meeting:
+        raise HTTPException(
+            status_code=404, 
+            detail={
+                "message": "Réunion non trouvée",
+                "meeting_id": meeting_id,
+                "reason": "Cette réunion a peut-être été supprimée",
+                "type": "MEETING_NOT_FOUND"
+            }
+        )
+    
+    job = await run_db(get_active_job, summary_dedupe_key(meeting_id))
+    
+    return {
+        "meeting_id": meeting_id,
+        "summary_status": meeting.get("summary_status"),
+        "job": {
+            "id": job["id"],
+            "state": job["state"],
+            "attempts": job["attempts"],
+            "max_attempts": job["max_attempts"],
+            "next_run_at": datetime.utcfromtimestamp(job["next_run_at"]).isoformat(),
+            "last_error": job["last_error"]
+        } if job else None
+    }
+
 @router.delete("/{meeting_id}", response_model=dict)
 async def delete_meeting_route(
     meeting_id: str = Path(..., description="ID unique de la réunion"),
@@ -404,7 +369,7 @@ async def delete_meeting_route(
     de données et le fichier audio associé s'il est stocké localement.
     """
     # Supprimer la réunion et récupérer l'URL du fichier
-    file_url = delete_meeting(meeting_id, current_user["id"])
+    file_url = await delete_meeting_async(meeting_id, current_user["id"])
     
     if not file_url:
         raise HTTPException(status_code=404, detail="Réunion non trouvée")
@@ -438,7 +403,7 @@ async def transcribe_meeting_route(
     selon la durée de l'audio.
     """
     # Vérifier que la réunion existe et appartient à l'utilisateur
-    meeting = get_meeting(meeting_id, current_user["id"])
+    meeting = await get_meeting_async(meeting_id, current_user["id"])
     
     if not meeting:
         raise HTTPException(status_code=404, detail="Réunion non trouvée")
@@ -453,18 +418,14 @@ async def transcribe_meeting_route(
         
         # Vérifier le statut actuel sur AssemblyAI
         try:
-            status, text, duration, speakers_count = await check_transcription_status(transcript_id)
+            transcript_data = await assemblyai_client.get_transcript(transcript_id)
             
-            if status == "completed" and text:
+            if transcript_data.get("status") == "completed" and transcript_data.get("text"):
                 # Mettre à jour la base de données avec le texte de transcription
-                update_data = {
-                    "transcript_text": text,
-                    "transcript_status": "completed",
-                    "duration_seconds": duration,
-                    "speakers_count": speakers_count
-                }
-                updated_meeting = update_meeting(meeting_id, current_user["id"], update_data)
-                return updated_meeting
+                await run_in_threadpool(
+                    process_completed_transcript, meeting_id, current_user["id"], TranscriptObject(transcript_data)
+                )
+                return await get_meeting_async(meeting_id, current_user["id"])
         except Exception as e:
             logger.error(f"Erreur lors de la vérification du statut: {str(e)}")
             # Continuer pour relancer la transcription
@@ -478,14 +439,15 @@ async def transcribe_meeting_route(
             detail="URL du fichier manquante"
         )
     
-    # Mettre à jour le statut
-    update_meeting(meeting_id, current_user["id"], {"transcript_status": "processing"})
+    # Mettre à jour le statut ; l'ancien ID de transcription est oublié pour que la
+    # tâche soumette à nouveau l'audio
+    await update_meeting_async(meeting_id, current_user["id"], {"transcript_status": "processing", "transcript_id": None})
     
-    # Lancer la transcription en arrière-plan
-    transcribe_meeting(meeting_id, file_url, current_user["id"])
+    # Lancer la transcription en arrière-plan (file de tâches persistante)
+    await run_in_threadpool(enqueue_transcription, meeting_id, file_url, current_user["id"])
     
     # Obtenir la réunion mise à jour
-    updated_meeting = get_meeting(meeting_id, current_user["id"])
+    updated_meeting = await get_meeting_async(meeting_id, current_user["id"])
     
     return updated_meeting
 
@@ -502,7 +464,7 @@ async def get_transcript(
     Cette route est optimisée pour récupérer uniquement le texte de transcription
     et son statut, sans les autres métadonnées de la réunion.
     """
-    meeting = get_meeting(meeting_id, current_user["id"])
+    meeting = await get_meeting_async(meeting_id, current_user["id"])
     
     if not meeting:
         raise HTTPException(status_code=404, detail="Réunion non trouvée")
@@ -510,7 +472,7 @@ async def get_transcript(
     # Si la transcription est en cours ou terminée, retourner les informations
     # Note: get_meeting() applique déjà normalize_transcript_format
     return {
-        "transcript_text": meeting.get("transcript_text", ""),
+        "transcript_text": await render_transcript_async(meeting, current_user["id"]) or "",
         "transcript_status": meeting.get("transcript_status", "pending"),
         "duration_seconds": meeting.get("duration_seconds"),
         "speakers_count": meeting.get("speakers_count")
@@ -519,7 +481,8 @@ async def get_transcript(
 @router.post("/validate-ids", response_model=dict)
 async def validate_meeting_ids(
     meeting_ids: List[str],
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    conn = Depends(get_db)
 ):
     """
     Valide une liste d'identifiants de réunions et retourne les IDs qui existent encore.
@@ -528,27 +491,25 @@ async def validate_meeting_ids(
     
     Utile pour nettoyer le cache côté frontend après suppression de meetings.
     """
-    from ..db.database import get_db_connection
-    
     logger.info(f"Validating {len(meeting_ids)} meeting IDs for user: {current_user['id']}")
     
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
     # Préparer la requête SQL pour vérifier plusieurs IDs à la fois
     placeholders = ','.join(['?'] * len(meeting_ids))
     
     # Ajouter l'ID de l'utilisateur à la liste des paramètres
     params = meeting_ids + [current_user["id"]]
     
-    cursor.execute(
-        f"SELECT id FROM meetings WHERE id IN ({placeholders}) AND user_id = ?", 
-        params
-    )
-    
-    existing_ids = [row["id"] for row in cursor.fetchall()]
+    def select_existing_ids():
+        if not meeting_ids:
+            return []
+        cursor = conn.execute(
+            f"SELECT id FROM meetings WHERE id IN ({placeholders}) AND user_id = ?", 
+            params
+        )
+        return [row["id"] for row in cursor.fetchall()]
     
-    conn.close()
+    # Exécuter la requête hors de la boucle d'événements
+    existing_ids = await run_db(select_existing_ids)
     
     # Calculer les IDs supprimés
     deleted_ids = [id for id in meeting_ids if id not in existing_ids]
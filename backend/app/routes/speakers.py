@@ -1,16 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, Path, Body
-from fastapi.logger import logger
 from ..core.security import get_current_user
 from ..models.user import User
 from ..models.speaker import Speaker, SpeakerCreate, SpeakersList
-from ..db.queries import (
-    get_meeting, get_meeting_speakers, set_meeting_speaker,
-    delete_meeting_speaker, get_custom_speaker_name
+from ..db.async_queries import (
+    get_meeting_async, get_meeting_speakers_async, set_meeting_speaker_async,
+    delete_meeting_speaker_async
 )
-from ..services.transcription_checker import get_assemblyai_transcript_details, format_transcript_text
+from ..services.transcript_render import render_transcript_async
 from typing import List, Dict, Any, Optional
 import uuid
-from datetime import datetime
 
 router = APIRouter(prefix="/meetings/{meeting_id}/speakers", tags=["Locuteurs"])
 
@@ -27,7 +25,7 @@ async def list_meeting_speakers(
     Retourne la liste des mappages entre identifiants de locuteurs et noms personnalisés.
     """
     # Vérifier que la réunion existe et appartient à l'utilisateur courant
-    meeting = get_meeting(meeting_id, current_user["id"])
+    meeting = await get_meeting_async(meeting_id, current_user["id"])
     if not meeting:
         raise HTTPException(
             status_code=404,
@@ -35,7 +33,7 @@ async def list_meeting_speakers(
         )
     
     # Récupérer les noms personnalisés des locuteurs
-    speakers = get_meeting_speakers(meeting_id, current_user["id"])
+    speakers = await get_meeting_speakers_async(meeting_id, current_user["id"])
     if speakers is None:  # Erreur lors de la récupération
         raise HTTPException(
             status_code=500,
@@ -61,7 +59,7 @@ async def create_or_update_speaker(
     Sinon, un nouveau mapping est créé.
     """
     # Vérifier que la réunion existe et appartient à l'utilisateur courant
-    meeting = get_meeting(meeting_id, current_user["id"])
+    meeting = await get_meeting_async(meeting_id, current_user["id"])
     if not meeting:
         raise HTTPException(
             status_code=404,
@@ -69,7 +67,7 @@ async def create_or_update_speaker(
         )
     
     # Créer ou mettre à jour le nom personnalisé
-    success = set_meeting_speaker(
+    success = await set_meeting_speaker_async(
         meeting_id, current_user["id"],
         speaker_data.speaker_id, speaker_data.custom_name
     )
@@ -81,7 +79,7 @@ async def create_or_update_speaker(
         )
     
     # Récupérer les données mises à jour
-    speakers = get_meeting_speakers(meeting_id, current_user["id"])
+    speakers = await get_meeting_speakers_async(meeting_id, current_user["id"])
     if not speakers:
         raise HTTPException(
             status_code=500,
@@ -102,34 +100,8 @@ async def create_or_update_speaker(
             detail={"message": "Erreur lors de la création du locuteur", "type": "SERVER_ERROR"}
         )
         
-    # Mettre à jour automatiquement la transcription avec le nouveau nom de locuteur
-    try:
-        # Vérifier que la transcription est terminée
-        if meeting.get("transcript_status") == "completed" and meeting.get("transcript_id"):
-            transcript_id = meeting.get("transcript_id")
-            transcript_data = get_assemblyai_transcript_details(transcript_id)
-            
-            if transcript_data:
-                # Récupérer tous les noms personnalisés des locuteurs
-                speaker_names = {s["speaker_id"]: s["custom_name"] for s in speakers if s.get("custom_name")}
-                
-                # Formater la transcription avec les noms personnalisés
-                updated_transcript = format_transcript_text(transcript_data, speaker_names)
-                
-                # Mettre à jour le texte de transcription dans la base de données
-                from ..db.queries import update_meeting
-                logger.info(f"Mise à jour automatique de la transcription après renommage de {speaker_data.speaker_id} en {speaker_data.custom_name}")
-                
-                update_result = update_meeting(meeting_id, current_user["id"], {
-                    "transcript_text": updated_transcript,
-                    "updated_at": datetime.utcnow().isoformat()  # Force une mise à jour du timestamp
-                })
-                
-                logger.info(f"Transcription mise à jour automatiquement: {update_result}")
-    except Exception as e:
-        # Log l'erreur mais ne pas faire échouer la création du speaker
-        logger.error(f"Erreur lors de la mise à jour automatique de la transcription: {str(e)}")
-    
+    # La transcription n'est pas réécrite : les noms sont appliqués au rendu
+    # (set_meeting_speaker a incrémenté speakers_version)
     return created_speaker
 
 
@@ -148,7 +120,7 @@ async def delete_speaker(
     Retourne un statut de succès ou d'échec.
     """
     # Vérifier que la réunion existe et appartient à l'utilisateur courant
-    meeting = get_meeting(meeting_id, current_user["id"])
+    meeting = await get_meeting_async(meeting_id, current_user["id"])
     if not meeting:
         raise HTTPException(
             status_code=404,
@@ -156,7 +128,7 @@ async def delete_speaker(
         )
     
     # Supprimer le nom personnalisé
-    success = delete_meeting_speaker(meeting_id, current_user["id"], speaker_id)
+    success = await delete_meeting_speaker_async(meeting_id, current_user["id"], speaker_id)
     
     if not success:
         raise HTTPException(
@@ -180,7 +152,7 @@ async def get_updated_transcript(
     Retourne la transcription mise à jour avec les noms personnalisés.
     """
     # Vérifier que la réunion existe et appartient à l'utilisateur courant
-    meeting = get_meeting(meeting_id, current_user["id"])
+    meeting = await get_meeting_async(meeting_id, current_user["id"])
     if not meeting:
         raise HTTPException(
             status_code=404,
@@ -198,50 +170,8 @@ async def get_updated_transcript(
             }
         )
     
-    # Récupérer l'ID de la transcription
-    transcript_id = meeting.get("transcript_id")
-    if not transcript_id:
-        raise HTTPException(
-            status_code=400,
-            detail={"message": "Pas d'ID de transcription disponible", "type": "MISSING_DATA"}
-        )
-    
-    # Récupérer les détails de la transcription
-    transcript_data = get_assemblyai_transcript_details(transcript_id)
-    if not transcript_data:
-        raise HTTPException(
-            status_code=500,
-            detail={"message": "Impossible de récupérer les détails de la transcription", "type": "API_ERROR"}
-        )
-    
-    # Récupérer les noms personnalisés des locuteurs
-    speakers_data = get_meeting_speakers(meeting_id, current_user["id"])
-    speaker_names = {}
-    
-    if speakers_data:
-        for speaker in speakers_data:
-            speaker_names[speaker["speaker_id"]] = speaker["custom_name"]
-    
-    # Formater la transcription avec les noms personnalisés
-    updated_transcript = format_transcript_text(transcript_data, speaker_names)
-    
-    # Mettre à jour le texte de transcription dans la base de données
-    from ..db.queries import update_meeting
-    logger.info(f"Mise à jour de la transcription pour {meeting_id} avec {len(speaker_names)} noms personnalisés")
-    for speaker_id, name in speaker_names.items():
-        logger.info(f"Remplacement du locuteur {speaker_id} par {name}")
-        
-    update_result = update_meeting(meeting_id, current_user["id"], {
-        "transcript_text": updated_transcript,
-        "updated_at": datetime.utcnow().isoformat()  # Force une mise à jour du timestamp
-    })
-    
-    # Vérification que la mise à jour a bien été prise en compte
-    updated_meeting = get_meeting(meeting_id, current_user["id"])
-    if updated_meeting and updated_meeting.get("transcript_text") == updated_transcript:
-        logger.info("Vérification OK: La transcription a été correctement mise à jour")
-    else:
-        logger.warning("ATTENTION: La transcription ne semble pas avoir été mise à jour correctement")
+    # Appliquer les noms personnalisés au rendu (aucune écriture en base)
+    updated_transcript = await render_transcript_async(meeting, current_user["id"])
     
     return {
         "success": True,
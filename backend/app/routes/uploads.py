@@ -0,0 +1,309 @@
+"""
+Routes d'upload reprenable (inspiré du protocole tus) pour les longs enregistrements.
+
+Le client initialise un upload, envoie le fichier par morceaux avec l'offset
+attendu, peut reprendre après une coupure en interrogeant l'offset courant,
+puis finalise l'upload pour créer la réunion et lancer la transcription.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.logger import logger
+from starlette.requests import ClientDisconnect
+import time
+import traceback
+
+from ..core.config import settings
+from ..core.security import get_current_user
+from ..models.upload import UploadSessionCreate, UploadSession
+from ..db.firebase import get_partial_upload_path, delete_partial_upload
+from ..db.async_queries import (
+    create_upload_session_async, get_upload_session_async, update_upload_session_async,
+    delete_upload_session_async, get_meeting_async,
+    claim_upload_write_async, renew_upload_write_async, release_upload_write_async,
+    start_upload_finalization_async
+)
+from ..services.file_upload import validate_audio_type
+from ..services.audio_pipeline import ingest_audio_file
+from ..services.conversion import ConversionQueueFullError
+
+router = APIRouter(prefix="/meetings/uploads", tags=["Uploads reprenables"])
+
+async def _get_session_or_404(upload_id: str, user_id: str) -> dict:
+    """Récupère la session d'upload ou lève une erreur 404"""
+    session = await get_upload_session_async(upload_id, user_id)
+    if not session:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "message": "Session d'upload non trouvée",
+                "upload_id": upload_id,
+                "type": "UPLOAD_NOT_FOUND"
+            }
+        )
+    return session
+
+def _offset_headers(session: dict) -> dict:
+    """En-têtes décrivant l'état de l'upload"""
+    return {
+        "Upload-Offset": str(session["received_size"]),
+        "Upload-Length": str(session["total_size"]),
+        "Cache-Control": "no-store"
+    }
+
+@router.post("", response_model=UploadSession, status_code=201)
+async def create_upload(
+    upload_data: UploadSessionCreate,
+    response: Response,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Initialise un upload reprenable.
+
+    - **filename**: Nom du fichier audio
+    - **size**: Taille totale du fichier en octets
+    - **content_type**: Type MIME du fichier (optionnel)
+    - **title**: Titre de la réunion (optionnel, nom du fichier par défaut)
+    - **client_id**: Client associé (optionnel)
+
+    Retourne l'identifiant de l'upload et l'offset courant (0).
+    """
+    validate_audio_type(upload_data.content_type, upload_data.filename)
+
+    if upload_data.size <= 0 or upload_data.size > settings.MAX_UPLOAD_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail={
+                "message": f"Taille de fichier invalide (maximum {settings.MAX_UPLOAD_SIZE} octets)",
+                "type": "FILE_TOO_LARGE"
+            }
+        )
+
+    session = await create_upload_session_async({
+        "filename": upload_data.filename,
+        "content_type": upload_data.content_type,
+        "title": upload_data.title or upload_data.filename,
+        "client_id": upload_data.client_id,
+        "total_size": upload_data.size
+    }, current_user["id"])
+
+    if not session:
+        raise HTTPException(status_code=500, detail="Erreur lors de la création de la session d'upload")
+
+    # Créer le fichier partiel vide
+    open(get_partial_upload_path(session["id"]), "wb").close()
+
+    response.headers.update(_offset_headers(session))
+    response.headers["Location"] = f"/meetings/uploads/{session['id']}"
+    return session
+
+@router.head("/{upload_id}")
+async def get_upload_offset(
+    upload_id: str = Path(..., description="ID de l'upload"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Retourne l'offset courant de l'upload dans l'en-tête Upload-Offset.
+
+    Utilisé par le client pour reprendre un upload interrompu.
+    """
+    session = await _get_session_or_404(upload_id, current_user["id"])
+    return Response(status_code=200, headers=_offset_headers(session))
+
+@router.get("/{upload_id}", response_model=UploadSession)
+async def get_upload(
+    upload_id: str = Path(..., description="ID de l'upload"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Retourne l'état complet d'un upload reprenable.
+    """
+    return await _get_session_or_404(upload_id, current_user["id"])
+
+@router.patch("/{upload_id}", status_code=204)
+async def upload_chunk(
+    request: Request,
+    upload_id: str = Path(..., description="ID de l'upload"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Ajoute un morceau au fichier en cours d'upload.
+
+    L'en-tête **Upload-Offset** doit correspondre à l'offset courant de l'upload,
+    sinon la requête est refusée (409) et le client doit relire l'offset via HEAD.
+    Un seul envoi à la fois par upload : la session est réservée pendant
+    l'écriture, un envoi concurrent reçoit 409.
+    Les octets reçus avant une éventuelle coupure réseau sont conservés.
+    """
+    session = await _get_session_or_404(upload_id, current_user["id"])
+
+    if session["status"] not in ("uploading", "writing"):
+        raise HTTPException(
+            status_code=409,
+            detail={"message": f"L'upload est déjà à l'état {session['status']}", "type": "INVALID_STATE"}
+        )
+
+    try:
+        offset = int(request.headers.get("Upload-Offset", ""))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="En-tête Upload-Offset manquant ou invalide")
+
+    # Réservation atomique de la session à cet offset : deux envois concurrents ne
+    # peuvent pas écrire dans le fichier partiel en même temps
+    token = await claim_upload_write_async(
+        upload_id, current_user["id"], offset, settings.UPLOAD_WRITE_STALE_SECONDS
+    )
+    if token is None:
+        session = await _get_session_or_404(upload_id, current_user["id"])
+        if session["status"] == "writing":
+            detail = {"message": "Un autre envoi est en cours pour cet upload", "type": "UPLOAD_IN_PROGRESS"}
+        elif session["status"] != "uploading":
+            detail = {"message": f"L'upload est déjà à l'état {session['status']}", "type": "INVALID_STATE"}
+        else:
+            detail = {
+                "message": "L'offset ne correspond pas à l'état de l'upload",
+                "expected_offset": session["received_size"],
+                "type": "OFFSET_MISMATCH"
+            }
+        raise HTTPException(status_code=409, detail=detail, headers=_offset_headers(session))
+
+    partial_path = get_partial_upload_path(upload_id)
+
+    # Ramener le fichier partiel à l'offset enregistré (écriture interrompue précédemment)
+    with open(partial_path, "ab") as f:
+        if f.tell() != offset:
+            f.truncate(offset)
+
+    received = offset
+    renewed_at = time.monotonic()
+    try:
+        with open(partial_path, "ab") as f:
+            async for chunk in request.stream():
+                if received + len(chunk) > session["total_size"]:
+                    raise HTTPException(
+                        status_code=413,
+                        detail={"message": "Les données dépassent la taille annoncée", "type": "FILE_TOO_LARGE"}
+                    )
+                # Envoi long : prolonger la réservation, et s'arrêter si elle a été reprise
+                if time.monotonic() - renewed_at > settings.UPLOAD_WRITE_STALE_SECONDS / 4:
+                    token = await renew_upload_write_async(upload_id, token)
+                    if token is None:
+                        raise HTTPException(
+                            status_code=409,
+                            detail={"message": "L'envoi a été repris par une autre requête", "type": "UPLOAD_IN_PROGRESS"}
+                        )
+                    renewed_at = time.monotonic()
+                f.write(chunk)
+                received += len(chunk)
+    except ClientDisconnect:
+        logger.warning(f"Connexion interrompue pendant l'upload {upload_id} à l'offset {received}")
+    finally:
+        # Conserver les octets reçus pour permettre la reprise, et libérer la session
+        if token is not None:
+            await release_upload_write_async(upload_id, token, received)
+
+    session["received_size"] = received
+    return Response(status_code=204, headers=_offset_headers(session))
+
+@router.post("/{upload_id}/finalize", response_model=dict)
+async def finalize_upload(
+    upload_id: str = Path(..., description="ID de l'upload"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Finalise un upload complet : crée la réunion et planifie sa conversion,
+    qui sera suivie de la transcription.
+
+    Retourne la réunion créée.
+    """
+    session = await _get_session_or_404(upload_id, current_user["id"])
+
+    # Finalisation idempotente: renvoyer la réunion déjà créée
+    if session["status"] == "completed" and session.get("meeting_id"):
+        meeting = await get_meeting_async(session["meeting_id"], current_user["id"])
+        if meeting:
+            return meeting
+
+    if session["status"] not in ("uploading", "error"):
+        raise HTTPException(
+            status_code=409,
+            detail={"message": f"L'upload est déjà à l'état {session['status']}", "type": "INVALID_STATE"}
+        )
+    
+    if session["received_size"] != session["total_size"]:
+        raise HTTPException(
+            status_code=409,
+            detail={
+                "message": "L'upload n'est pas complet",
+                "received_size": session["received_size"],
+                "total_size": session["total_size"],
+                "type": "UPLOAD_INCOMPLETE"
+            }
+        )
+
+    # Transition conditionnelle : deux finalisations concurrentes ne créent qu'une réunion
+    if not await start_upload_finalization_async(upload_id, current_user["id"]):
+        session = await _get_session_or_404(upload_id, current_user["id"])
+        raise HTTPException(
+            status_code=409,
+            detail={"message": f"L'upload est déjà à l'état {session['status']}", "type": "INVALID_STATE"}
+        )
+
+    try:
+        meeting = await run_in_threadpool(
+            ingest_audio_file,
+            str(get_partial_upload_path(upload_id)),
+            session["title"] or session["filename"],
+            current_user["id"],
+            session.get("client_id"),
+            original_filename=session["filename"]
+        )
+    except ConversionQueueFullError as e:
+        # Le fichier partiel est conservé : la finalisation pourra être relancée
+        await update_upload_session_async(upload_id, current_user["id"], {"status": "uploading"})
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "message": str(e),
+                "type": "CONVERSION_QUEUE_FULL",
+                "action": "Veuillez relancer la finalisation dans quelques instants"
+            }
+        )
+    except Exception as e:
+        logger.error(f"Erreur lors de la finalisation de l'upload {upload_id}: {str(e)}")
+        logger.error(traceback.format_exc())
+        await update_upload_session_async(upload_id, current_user["id"], {"status": "error"})
+        raise HTTPException(
+            status_code=500,
+            detail=f"Une erreur s'est produite lors de la finalisation de l'upload: {str(e)}"
+        )
+
+    await update_upload_session_async(upload_id, current_user["id"], {
+        "status": "completed",
+        "meeting_id": meeting["id"]
+    })
+    delete_partial_upload(upload_id)
+
+    return meeting
+
+@router.delete("/{upload_id}", response_model=dict)
+async def cancel_upload(
+    upload_id: str = Path(..., description="ID de l'upload"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Annule un upload reprenable et supprime les données déjà reçues.
+
+    Refusé (409) pendant l'envoi d'un morceau ou la finalisation de l'upload.
+    """
+    await _get_session_or_404(upload_id, current_user["id"])
+    if not await delete_upload_session_async(
+        upload_id, current_user["id"], settings.UPLOAD_WRITE_STALE_SECONDS
+    ):
+        session = await _get_session_or_404(upload_id, current_user["id"])
+        raise HTTPException(
+            status_code=409,
+            detail={"message": f"L'upload ne peut pas être annulé à l'état {session['status']}", "type": "INVALID_STATE"}
+        )
+    delete_partial_upload(upload_id)
+    return {"message": "Upload annulé", "upload_id": upload_id}
@@ -0,0 +1,58 @@
+"""
+Webhooks entrants des fournisseurs externes.
+
+AssemblyAI appelle /webhooks/assemblyai à la fin de chaque transcription
+(paramètre webhook_url transmis dans start_transcription). La requête est
+authentifiée par un en-tête secret partagé ; le traitement de la transcription
+s'exécute ensuite en tâche de fond pour répondre immédiatement au fournisseur.
+"""
+
+import hmac
+
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Request
+from fastapi.logger import logger
+from pydantic import BaseModel
+from typing import Optional
+
+from ..core.config import settings
+from ..services.assemblyai import handle_transcript_webhook
+
+router = APIRouter(prefix="/webhooks", tags=["Webhooks"])
+
+class AssemblyAIWebhook(BaseModel):
+    """Corps de la notification envoyée par AssemblyAI"""
+    transcript_id: str
+    status: Optional[str] = None
+
+def _verify_webhook_secret(request: Request):
+    """Vérifie l'en-tête secret configuré lors du démarrage de la transcription"""
+    expected = settings.ASSEMBLYAI_WEBHOOK_SECRET
+    received = request.headers.get(settings.ASSEMBLYAI_WEBHOOK_HEADER, "")
+
+    if not expected or not hmac.compare_digest(received.encode(), expected.encode()):
+        logger.warning(f"Webhook AssemblyAI refusé depuis {request.client.host if request.client else 'inconnu'}")
+        raise HTTPException(
+            status_code=401,
+            detail={"message": "Signature du webhook invalide", "type": "INVALID_WEBHOOK_SECRET"}
+        )
+
+@router.post("/assemblyai", response_model=dict)
+async def assemblyai_webhook(
+    payload: AssemblyAIWebhook,
+    request: Request,
+    background_tasks: BackgroundTasks
+):
+    """
+    Reçoit la notification de fin de transcription d'AssemblyAI.
+
+    - **transcript_id**: ID de la transcription terminée
+    - **status**: 'completed' ou 'error'
+
+    La réunion correspondante est mise à jour en arrière-plan.
+    """
+    _verify_webhook_secret(request)
+
+    logger.info(f"Webhook AssemblyAI reçu: {payload.transcript_id} ({payload.status})")
+    background_tasks.add_task(handle_transcript_webhook, payload.transcript_id, payload.status)
+
+    return {"received": True, "transcript_id": payload.transcript_id}
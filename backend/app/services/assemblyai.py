@@ -3,7 +3,6 @@ import json
 import traceback
 import logging
 import time
-import requests
 from typing import Optional, Dict, Any, Tuple, List
 from datetime import datetime
 from pathlib import Path
@@ -12,17 +11,41 @@ import subprocess
 import threading
 
 from ..core.config import settings
-from ..db.queries import update_meeting, get_meeting, normalize_transcript_format, get_meeting_speakers
+from ..db.queries import update_meeting, get_meeting
+from .assemblyai_client import assemblyai_client
+from .job_context import JobCancelled, raise_if_job_cancelled
+from .result_cache import TRANSCRIPT_RESULT, file_sha256, get_result, result_key, store_result
 
-# Configuration pour AssemblyAI
-# Utiliser directement la clé API fournie au lieu de passer par settings
-ASSEMBLY_AI_API_KEY = "3419005ee6924e08a14235043cabcd4e"
 # URL de base de l'API AssemblyAI
-ASSEMBLY_AI_BASE_URL = "https://api.assemblyai.com/v2"
+ASSEMBLY_AI_BASE_URL = settings.ASSEMBLYAI_BASE_URL
 
 # Configuration du logging
 logger = logging.getLogger("meeting-transcriber")
 
+
+class UtteranceObject:
+    """Segment de parole d'une transcription AssemblyAI"""
+    def __init__(self, data):
+        self.speaker = data.get('speaker')
+        self.text = data.get('text')
+
+
+class TranscriptObject:
+    """Objet compatible avec process_completed_transcript construit depuis la réponse JSON de l'API"""
+    def __init__(self, data):
+        self.data = data
+        self.id = data.get('id')
+        self.status = data.get('status')
+        self.text = data.get('text')
+        self.audio_duration = data.get('audio_duration')
+        self.utterances = []
+        
+        # Traiter les utterances si disponibles
+        utterances_data = data.get('utterances', [])
+        if utterances_data and isinstance(utterances_data, list):
+            for utterance in utterances_data:
+                self.utterances.append(UtteranceObject(utterance))
+
 def convert_to_wav(input_path: str) -> str:
     """Convertit un fichier audio en WAV en utilisant ffmpeg avec des paramètres optimisés pour réduire la taille"""
     try:
@@ -101,6 +124,11 @@ def transcribe_meeting(meeting_id: str, file_url: str, user_id: str) -> Optional
         update_meeting(meeting_id, user_id, {"transcript_status": "processing"})
         logger.info(f"Statut de la réunion {meeting_id} mis à jour à 'processing'")
         
+        # Même audio déjà transcrit : transcription terminée sans appel à AssemblyAI
+        cached_transcript_id, audio_sha256 = transcribe_from_cache(meeting_id, user_id, file_path)
+        if cached_transcript_id:
+            return cached_transcript_id
+        
         # Uploader le fichier vers AssemblyAI
         upload_url = upload_file_to_assemblyai(file_path)
         logger.info(f"Fichier {file_path} uploadé avec succès vers AssemblyAI: {upload_url}")
@@ -110,7 +138,7 @@ def transcribe_meeting(meeting_id: str, file_url: str, user_id: str) -> Optional
         logger.info(f"Transcription démarrée avec l'ID: {transcript_id}")
         
         # Mettre à jour l'ID de transcription dans la base de données
-        update_meeting(meeting_id, user_id, {"transcript_id": transcript_id})
+        update_meeting(meeting_id, user_id, {"transcript_id": transcript_id, "audio_sha256": audio_sha256})
         
         return transcript_id
         
@@ -179,13 +207,21 @@ def process_transcription(meeting_id: str, file_url: str, user_id: str):
         logger.info(f"Soumission de la transcription via API REST pour: {audio_source}")
         
         # Uploader le fichier vers AssemblyAI (si c'est un fichier local)
+        audio_sha256 = None
         if audio_source.startswith("/") and os.path.exists(audio_source):
+            # Même audio déjà transcrit : transcription terminée sans appel à AssemblyAI
+            cached_transcript_id, audio_sha256 = transcribe_from_cache(meeting_id, user_id, audio_source)
+            if cached_transcript_id:
+                return
+            
+            raise_if_job_cancelled()
             logger.info(f"Upload du fichier local vers AssemblyAI: {audio_source}")
             audio_url = upload_file_to_assemblyai(audio_source)
         else:
             audio_url = audio_source
         
-        # Démarrer la transcription
+        # Démarrer la transcription (sauf si la tâche a été reprise par une autre instance pendant l'upload)
+        raise_if_job_cancelled()
         logger.info(f"Démarrage de la transcription pour: {audio_url}")
         transcript_id = start_transcription(audio_url)
         
@@ -193,7 +229,8 @@ def process_transcription(meeting_id: str, file_url: str, user_id: str):
         update_meeting(meeting_id, user_id, {
             "transcript_id": transcript_id,
             "transcript_status": "processing",
-            "transcript_text": f"Transcription en cours avec ID: {transcript_id}"
+            "transcript_text": f"Transcription en cours avec ID: {transcript_id}",
+            "audio_sha256": audio_sha256
         })
         
         logger.info(f"Transcription démarrée avec succès pour {meeting_id}, ID: {transcript_id}")
@@ -216,6 +253,9 @@ def process_transcription(meeting_id: str, file_url: str, user_id: str):
         except Exception as status_error:
             logger.warning(f"Impossible de vérifier le statut initial, mais la transcription continue: {str(status_error)}")
             
+    except JobCancelled:
+        # La réunion appartient désormais à la tâche reprise par une autre instance
+        raise
     except Exception as e:
         # Gestion générale des erreurs
         logger.error(f"Erreur lors du traitement de la transcription: {str(e)}")
@@ -247,6 +287,34 @@ def process_transcription(meeting_id: str, file_url: str, user_id: str):
         except Exception as db_error:
             logger.error(f"Erreur lors de la mise à jour de la base de données: {str(db_error)}")
 
+def transcript_cache_key(audio_sha256: str, speakers_expected: Optional[int] = None) -> str:
+    """
+    Clé d'une transcription dans le cache des résultats : empreinte du fichier audio
+    et paramètres de transcription envoyés à AssemblyAI (hors URL et webhook).
+    """
+    params = assemblyai_client._transcript_payload(None, speakers_expected)
+    params.pop("audio_url")
+    return result_key(audio_sha256, params)
+
+def transcribe_from_cache(meeting_id: str, user_id: str, file_path: str) -> Tuple[Optional[str], str]:
+    """
+    Termine la transcription d'une réunion depuis le cache des résultats si le même
+    fichier audio a déjà été transcrit avec les mêmes paramètres.
+    
+    Returns:
+        Tuple[Optional[str], str]: ID de la transcription servie depuis le cache (None
+        si elle n'y est pas) et empreinte SHA-256 du fichier
+    """
+    audio_sha256 = file_sha256(file_path)
+    cached = get_result(TRANSCRIPT_RESULT, transcript_cache_key(audio_sha256))
+    if not cached:
+        return None, audio_sha256
+    
+    logger.info(f"Transcription de la réunion {meeting_id} servie depuis le cache (audio {audio_sha256[:12]})")
+    update_meeting(meeting_id, user_id, {"transcript_id": cached["id"], "audio_sha256": audio_sha256})
+    process_completed_transcript(meeting_id, user_id, TranscriptObject(cached), cache_result=False)
+    return cached["id"], audio_sha256
+
 def upload_file_to_assemblyai(file_path: str) -> str:
     """
     Upload un fichier vers AssemblyAI en utilisant l'API REST directement.
@@ -259,30 +327,28 @@ def upload_file_to_assemblyai(file_path: str) -> str:
     """
     logger.info(f"Upload du fichier {file_path} vers AssemblyAI")
     
-    headers = {
-        "authorization": ASSEMBLY_AI_API_KEY
-    }
-    
     try:
-        with open(file_path, "rb") as f:
-            response = requests.post(
-                "https://api.assemblyai.com/v2/upload",
-                headers=headers,
-                data=f
-            )
-        
-        if response.status_code == 200:
-            upload_url = response.json()["upload_url"]
-            logger.info(f"Fichier uploadé avec succès, URL: {upload_url}")
-            return upload_url
-        else:
-            error_msg = f"Erreur lors de l'upload: {response.status_code} - {response.text}"
-            logger.error(error_msg)
-            raise Exception(error_msg)
+        upload_url = assemblyai_client.upload_file_sync(file_path)
+        logger.info(f"Fichier uploadé avec succès, URL: {upload_url}")
+        return upload_url
     except Exception as e:
         logger.error(f"Erreur lors de l'upload vers AssemblyAI: {str(e)}")
         raise Exception(f"Erreur lors de l'upload vers AssemblyAI: {str(e)}")
 
+def webhooks_enabled() -> bool:
+    """Indique si AssemblyAI doit notifier la fin des transcriptions par webhook"""
+    return bool(settings.WEBHOOK_BASE_URL and settings.ASSEMBLYAI_WEBHOOK_SECRET)
+
+def get_webhook_options() -> Dict[str, str]:
+    """Paramètres webhook transmis à AssemblyAI au démarrage d'une transcription"""
+    if not webhooks_enabled():
+        return {}
+    return {
+        "webhook_url": f"{settings.WEBHOOK_BASE_URL.rstrip('/')}/webhooks/assemblyai",
+        "webhook_auth_header_name": settings.ASSEMBLYAI_WEBHOOK_HEADER,
+        "webhook_auth_header_value": settings.ASSEMBLYAI_WEBHOOK_SECRET
+    }
+
 def start_transcription(audio_url: str, speakers_expected: Optional[int] = None, format_text: bool = False) -> str:
     """
     Démarre une transcription sur AssemblyAI en utilisant l'API REST directement.
@@ -297,36 +363,12 @@ def start_transcription(audio_url: str, speakers_expected: Optional[int] = None,
     """
     logger.info(f"Démarrage de la transcription pour l'URL: {audio_url}")
     
-    headers = {
-        "authorization": ASSEMBLY_AI_API_KEY,
-        "content-type": "application/json"
-    }
-    
-    json_data = {
-        "audio_url": audio_url,
-        "speaker_labels": True,
-        "language_code": "fr"
-    }
-    
-    # Optionnel: si nous avons une estimation du nombre de locuteurs
-    if speakers_expected is not None and speakers_expected > 1:
-        json_data["speakers_expected"] = speakers_expected
-    
     try:
-        response = requests.post(
-            "https://api.assemblyai.com/v2/transcript",
-            headers=headers,
-            json=json_data
+        transcript_id = assemblyai_client.start_transcription_sync(
+            audio_url, speakers_expected, **get_webhook_options()
         )
-        
-        if response.status_code == 200:
-            transcript_id = response.json()["id"]
-            logger.info(f"Transcription démarrée avec succès, ID: {transcript_id}")
-            return transcript_id
-        else:
-            error_msg = f"Erreur lors du démarrage de la transcription: {response.status_code} - {response.text}"
-            logger.error(error_msg)
-            raise Exception(error_msg)
+        logger.info(f"Transcription démarrée avec succès, ID: {transcript_id}")
+        return transcript_id
     except Exception as e:
         logger.error(f"Erreur lors du démarrage de la transcription: {str(e)}")
         raise Exception(f"Erreur lors du démarrage de la transcription: {str(e)}")
@@ -343,25 +385,11 @@ def check_transcription_status(transcript_id: str) -> Dict:
     """
     logger.info(f"Vérification du statut de la transcription {transcript_id}")
     
-    headers = {
-        "authorization": ASSEMBLY_AI_API_KEY
-    }
-    
     try:
-        response = requests.get(
-            f"https://api.assemblyai.com/v2/transcript/{transcript_id}",
-            headers=headers
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            status = result["status"]
-            logger.info(f"Statut de la transcription {transcript_id}: {status}")
-            return result
-        else:
-            error_msg = f"Erreur lors de la vérification du statut: {response.status_code} - {response.text}"
-            logger.error(error_msg)
-            raise Exception(error_msg)
+        result = assemblyai_client.get_transcript_sync(transcript_id)
+        status = result["status"]
+        logger.info(f"Statut de la transcription {transcript_id}: {status}")
+        return result
     except Exception as e:
         logger.error(f"Erreur lors de la vérification du statut: {str(e)}")
         raise Exception(f"Erreur lors de la vérification du statut: {str(e)}")
@@ -384,7 +412,61 @@ def get_transcript_status(transcript_id: str) -> Tuple[str, Optional[Dict]]:
         logger.error(f"Erreur lors de la récupération du statut de la transcription {transcript_id}: {str(e)}")
         return "error", {"error": str(e)}
 
-def process_completed_transcript(meeting_id, user_id, transcript):
+def handle_transcript_webhook(transcript_id: str, status: str, defer_unknown: bool = True):
+    """
+    Traite une notification de fin de transcription envoyée par AssemblyAI.
+    
+    Une notification peut arriver avant que l'ID de transcription soit enregistré
+    dans la réunion (transcription courte) : elle est alors replanifiée dans la
+    file de tâches plutôt qu'ignorée, AssemblyAI ne la renvoyant pas.
+    
+    Args:
+        transcript_id: ID de la transcription AssemblyAI
+        status: Statut annoncé par le webhook ('completed' ou 'error')
+        defer_unknown: Replanifier la notification si aucune réunion ne porte cet ID ;
+            sinon (tâche déjà replanifiée) lever LookupError pour qu'elle soit retentée
+    """
+    from ..db.queries import get_meeting_by_transcript_id
+    
+    meeting = get_meeting_by_transcript_id(transcript_id)
+    if not meeting:
+        if not defer_unknown:
+            raise LookupError(f"Aucune réunion pour la transcription {transcript_id}")
+        logger.warning(f"Webhook reçu pour une transcription encore inconnue: {transcript_id}, nouvel essai planifié")
+        from .queue_processor import enqueue_transcript_webhook
+        enqueue_transcript_webhook(transcript_id, status)
+        return
+    
+    meeting_id = meeting['id']
+    user_id = meeting['user_id']
+    
+    # Les notifications peuvent être renvoyées : ne traiter qu'une seule fois
+    if meeting.get('transcript_status') in ('completed', 'error'):
+        logger.info(f"Webhook ignoré pour la réunion {meeting_id} (statut: {meeting.get('transcript_status')})")
+        return
+    
+    try:
+        transcript_data = assemblyai_client.get_transcript_sync(transcript_id)
+    except Exception as e:
+        # La réunion reste en 'processing' : le balayage de réconciliation prendra le relais
+        logger.error(f"Impossible de récupérer la transcription {transcript_id} après webhook: {str(e)}")
+        return
+    
+    status = transcript_data.get('status', status)
+    if status == 'completed':
+        logger.info(f"Webhook: transcription {transcript_id} terminée pour la réunion {meeting_id}")
+        process_completed_transcript(meeting_id, user_id, TranscriptObject(transcript_data))
+    elif status == 'error':
+        error_message = transcript_data.get('error', 'Unknown error')
+        logger.error(f"Webhook: erreur de transcription pour {meeting_id}: {error_message}")
+        update_meeting(meeting_id, user_id, {
+            "transcript_status": "error",
+            "transcript_text": f"Erreur lors de la transcription: {error_message}"
+        })
+    else:
+        logger.info(f"Webhook: transcription {transcript_id} toujours en cours ({status})")
+
+def process_completed_transcript(meeting_id, user_id, transcript, cache_result: bool = True):
     """
     Traite une transcription terminée et met à jour la base de données.
     
@@ -392,24 +474,14 @@ def process_completed_transcript(meeting_id, user_id, transcript):
         meeting_id: ID de la réunion
         user_id: ID de l'utilisateur
         transcript: Objet Transcript du SDK AssemblyAI
+        cache_result: Conserver la transcription dans le cache des résultats, par
+            empreinte de l'audio de la réunion (False si elle en provient)
     """
     try:
         # Extraction des données importantes
         audio_duration = transcript.audio_duration or 0
         logger.info(f"Durée audio: {audio_duration} secondes")
         
-        # Récupérer les noms personnalisés des locuteurs s'ils existent
-        speaker_names = {}
-        try:
-            speakers_data = get_meeting_speakers(meeting_id, user_id)
-            if speakers_data:
-                for speaker in speakers_data:
-                    speaker_names[speaker['speaker_id']] = speaker['custom_name']
-                logger.info(f"Noms personnalisés récupérés: {speaker_names}")
-        except Exception as e:
-            logger.warning(f"Impossible de récupérer les noms personnalisés: {str(e)}")
-            speaker_names = {}
-        
         # Extraction et comptage des locuteurs
         speaker_count = 0
         unique_speakers = set()
@@ -431,27 +503,10 @@ def process_completed_transcript(meeting_id, user_id, transcript):
                     if speaker:
                         unique_speakers.add(speaker)
                         
-                        # Utiliser le nom personnalisé s'il existe, sinon utiliser le format par défaut
-                        speaker_name = None
-                        
-                        # 1. Essayer d'abord avec l'ID simple (ex: "A", "B", "C", "D")
-                        if speaker in speaker_names:
-                            speaker_name = speaker_names[speaker]
-                            logger.debug(f"Found custom name for simple ID '{speaker}': {speaker_name}")
-                        
-                        # 2. Essayer avec le format "Speaker X" (ex: "Speaker A", "Speaker B")
-                        full_speaker_id = f"Speaker {speaker}"
-                        if speaker_name is None and full_speaker_id in speaker_names:
-                            speaker_name = speaker_names[full_speaker_id]
-                            logger.debug(f"Found custom name for full ID '{full_speaker_id}': {speaker_name}")
-                        
-                        # 3. Si aucun nom personnalisé trouvé, utiliser le format par défaut
-                        if speaker_name is None:
-                            speaker_name = full_speaker_id
-                            logger.debug(f"No custom name found for speaker '{speaker}', using default: {speaker_name}")
-                        
+                        # Le texte stocké utilise les identifiants canoniques (Speaker A, ...) :
+                        # les noms personnalisés sont appliqués au rendu (services/transcript_render.py)
                         # IMPORTANT: Toujours ajouter la ligne, même si le texte est vide
-                        utterance_formatted = f"{speaker_name}: {text}"
+                        utterance_formatted = f"Speaker {speaker}: {text}"
                         utterances_text.append(utterance_formatted)
                         utterances_data.append({"speaker": speaker, "text": text})
                 
@@ -474,6 +529,22 @@ def process_completed_transcript(meeting_id, user_id, transcript):
         # Normaliser le format du texte avant l'update
         formatted_text = normalize_transcript_format(formatted_text)
         
+        # Conserver la transcription structurée pour les rendus ultérieurs (renommage des locuteurs)
+        if getattr(transcript, 'data', None):
+            try:
+                from ..db.transcript_queries import save_transcript_data
+                save_transcript_data(meeting_id, transcript.id, transcript.data)
+            except Exception as e:
+                logger.warning(f"Impossible d'enregistrer la transcription structurée: {str(e)}")
+            
+            # Réimporter le même audio resservira cette transcription sans nouvel appel
+            if cache_result:
+                from ..db.transcript_queries import compact_transcript
+                meeting = get_meeting(meeting_id, user_id)
+                if meeting and meeting.get("audio_sha256"):
+                    store_result(TRANSCRIPT_RESULT, transcript_cache_key(meeting["audio_sha256"]),
+                                 compact_transcript(transcript.data))
+        
         # Mise à jour de la base de données
         update_data = {
             "transcript_text": formatted_text,
@@ -490,9 +561,8 @@ def process_completed_transcript(meeting_id, user_id, transcript):
         try:
             from .mistral_summary import process_meeting_summary
             logger.info(f"Lancement de la génération du résumé pour la réunion {meeting_id}")
-            # Utiliser le mode asynchrone pour éviter les problèmes de threads sur Render
+            # Génération ajoutée à la file de tâches (pool "summarize"), avec reprises
             process_meeting_summary(meeting_id, user_id, async_mode=True)
-            logger.info(f"Génération du résumé lancée en mode asynchrone pour la réunion {meeting_id}")
         except Exception as summary_error:
             logger.error(f"Erreur lors du lancement de la génération du résumé: {str(summary_error)}")
     except Exception as e:
@@ -525,294 +595,11 @@ def normalize_transcript_format(text):
 
 def process_pending_transcriptions():
     """
-    Vérifie et met à jour les statuts des transcriptions en attente ou bloquées en état 'processing'.
-    À exécuter au démarrage de l'application et périodiquement.
+    Vérifie et met à jour les statuts des transcriptions bloquées en état 'processing'.
+    À exécuter en arrière-plan au démarrage de l'application et périodiquement.
     
-    Cette fonction utilise l'API REST d'AssemblyAI pour être plus fiable.
+    Voir services/reconciliation.py : la liste des transcriptions AssemblyAI est
+    parcourue une seule fois et seules les transcriptions correspondantes sont récupérées.
     """
-    import requests
-    from ..db.queries import get_pending_transcriptions, get_meetings_by_status, get_meeting
-    from ..core.config import settings
-    
-    # Utiliser directement la clé API AssemblyAI définie en haut du fichier
-    api_key = ASSEMBLY_AI_API_KEY
-    if not api_key:
-        logger.error("La clé API AssemblyAI n'est pas définie")
-        return
-    
-    # Configuration de l'API AssemblyAI
-    headers = {
-        "authorization": api_key,
-        "content-type": "application/json"
-    }
-    
-    # Récupérer toutes les transcriptions en attente
-    pending_meetings = get_pending_transcriptions()
-    logger.info(f"Transcriptions en attente: {len(pending_meetings)}")
-    
-    # Récupérer également les transcriptions bloquées en état 'processing'
-    processing_meetings = get_meetings_by_status('processing')
-    logger.info(f"Transcriptions bloquées en état 'processing': {len(processing_meetings)}")
-    
-    # Fusionner les deux listes
-    all_meetings_to_process = pending_meetings + processing_meetings
-    
-    if not all_meetings_to_process:
-        logger.info("Aucune transcription en attente ou bloquée trouvée")
-        return
-    
-    logger.info(f"Traitement de {len(all_meetings_to_process)} transcription(s) en attente ou bloquées")
-    
-    # Récupérer les transcriptions récentes d'AssemblyAI
-    recent_transcripts = []
-    try:
-        url = "https://api.assemblyai.com/v2/transcript"
-        response = requests.get(url, headers=headers)
-        
-        if response.status_code == 200:
-            recent_transcripts = response.json().get('transcripts', [])
-            logger.info(f"Récupération de {len(recent_transcripts)} transcriptions récentes d'AssemblyAI")
-        else:
-            logger.error(f"Erreur lors de la récupération des transcriptions: {response.status_code} - {response.text}")
-    except Exception as e:
-        logger.error(f"Erreur lors de la récupération des transcriptions récentes: {str(e)}")
-    
-    # Traiter chaque transcription
-    for meeting in all_meetings_to_process:
-        try:
-            meeting_id = meeting['id']
-            user_id = meeting['user_id']
-            file_url = meeting.get('file_url', '')
-            file_name = os.path.basename(file_url) if file_url else ''
-            
-            # Vérifier si la réunion est en état 'processing'
-            if meeting['transcript_status'] == 'processing':
-                logger.info(f"Vérification de la réunion {meeting_id} en état 'processing'")
-                
-                # Essayer d'extraire l'ID de transcription AssemblyAI du texte
-                transcript_id = None
-                transcript_text = meeting.get('transcript_text', '')
-                
-                if transcript_text and 'ID:' in transcript_text:
-                    try:
-                        # Extraire l'ID de transcription du texte (format: 'Transcription en cours, ID: xyz')
-                        transcript_id = transcript_text.split('ID:')[-1].strip()
-                        logger.info(f"ID de transcription AssemblyAI extrait: {transcript_id}")
-                        
-                        # Vérifier le statut de la transcription via l'API REST
-                        url = f"https://api.assemblyai.com/v2/transcript/{transcript_id}"
-                        response = requests.get(url, headers=headers)
-                        
-                        if response.status_code == 200:
-                            transcript_data = response.json()
-                            status = transcript_data.get('status')
-                            logger.info(f"Statut de la transcription {transcript_id}: {status}")
-                            
-                            if status == 'completed':
-                                # Créer un objet compatible avec process_completed_transcript
-                                class TranscriptObject:
-                                    def __init__(self, data):
-                                        self.id = data.get('id')
-                                        self.status = data.get('status')
-                                        self.text = data.get('text')
-                                        self.audio_duration = data.get('audio_duration')
-                                        self.utterances = []
-                                        
-                                        # Traiter les utterances si disponibles
-                                        utterances_data = data.get('utterances', [])
-                                        if utterances_data and isinstance(utterances_data, list):
-                                            for utterance in utterances_data:
-                                                self.utterances.append(UtteranceObject(utterance))
-                                
-                                class UtteranceObject:
-                                    def __init__(self, data):
-                                        self.speaker = data.get('speaker')
-                                        self.text = data.get('text')
-                                
-                                # Créer l'objet transcript
-                                transcript = TranscriptObject(transcript_data)
-                                
-                                # Traiter la transcription terminée
-                                logger.info(f"Transcription {transcript_id} terminée, mise à jour de la base de données")
-                                process_completed_transcript(meeting_id, user_id, transcript)
-                                continue
-                            elif status == 'error':
-                                # Gérer l'erreur
-                                error_message = transcript_data.get('error', 'Unknown error')
-                                logger.error(f"Erreur de transcription pour {meeting_id}: {error_message}")
-                                update_meeting(meeting_id, user_id, {
-                                    "transcript_status": "error",
-                                    "transcript_text": f"Erreur lors de la transcription: {error_message}"
-                                })
-                                continue
-                            else:
-                                # Toujours en cours, ne rien faire
-                                logger.info(f"Transcription {transcript_id} toujours en cours ({status})")
-                                continue
-                        else:
-                            logger.error(f"Erreur lors de la vérification de la transcription {transcript_id}: {response.status_code} - {response.text}")
-                    except Exception as e:
-                        logger.error(f"Erreur lors de la vérification de la transcription {transcript_id}: {str(e)}")
-                        # Continuer avec la recherche dans les transcriptions récentes
-                
-                # Si on n'a pas pu extraire l'ID ou vérifier le statut, essayer de trouver la transcription par le nom de fichier
-                if file_name:
-                    logger.info(f"Recherche de transcription pour le fichier: {file_name}")
-                    
-                    for transcript in recent_transcripts:
-                        if transcript.get('status') == 'completed':
-                            # Récupérer les détails complets de la transcription
-                            transcript_id = transcript.get('id')
-                            url = f"https://api.assemblyai.com/v2/transcript/{transcript_id}"
-                            response = requests.get(url, headers=headers)
-                            
-                            if response.status_code == 200:
-                                transcript_data = response.json()
-                                audio_url = transcript_data.get('audio_url', '')
-                                audio_filename = os.path.basename(audio_url) if audio_url else ''
-                                
-                                # Si le nom de fichier correspond
-                                if file_name in audio_filename or audio_filename in file_name:
-                                    logger.info(f"Transcription trouvée pour {file_name}: {transcript_id}")
-                                    
-                                    # Créer un objet compatible avec process_completed_transcript
-                                    class TranscriptObject:
-                                        def __init__(self, data):
-                                            self.id = data.get('id')
-                                            self.status = data.get('status')
-                                            self.text = data.get('text')
-                                            self.audio_duration = data.get('audio_duration')
-                                            self.utterances = []
-                                            
-                                            # Traiter les utterances si disponibles
-                                            utterances_data = data.get('utterances', [])
-                                            if utterances_data and isinstance(utterances_data, list):
-                                                for utterance in utterances_data:
-                                                    self.utterances.append(UtteranceObject(utterance))
-                                    
-                                    class UtteranceObject:
-                                        def __init__(self, data):
-                                            self.speaker = data.get('speaker')
-                                            self.text = data.get('text')
-                                    
-                                    # Créer l'objet transcript
-                                    transcript = TranscriptObject(transcript_data)
-                                    
-                                    # Traiter la transcription terminée
-                                    logger.info(f"Transcription {transcript_id} terminée, mise à jour de la base de données")
-                                    process_completed_transcript(meeting_id, user_id, transcript)
-                                    break
-                    else:
-                        logger.warning(f"Aucune transcription trouvée pour le fichier {file_name}")
-            
-            # Si on arrive ici et que la réunion est toujours en état 'processing',
-            # vérifier directement auprès d'AssemblyAI si la transcription est terminée
-            meeting = get_meeting(meeting_id, user_id)  # Récupérer l'état actuel
-            if meeting and meeting.get('transcript_status') == 'processing' and meeting.get('transcript_id'):
-                transcript_id = meeting.get('transcript_id')
-                logger.info(f"Vérification du statut de la transcription {transcript_id} pour la réunion {meeting_id}")
-                
-                # Vérifier le statut auprès d'AssemblyAI
-                try:
-                    response = requests.get(
-                        f"https://api.assemblyai.com/v2/transcript/{transcript_id}",
-                        headers=headers
-                    )
-                    
-                    if response.status_code == 200:
-                        transcript_data = response.json()
-                        status = transcript_data.get('status')
-                        logger.info(f"Statut de la transcription {transcript_id}: {status}")
-                        
-                        if status == 'completed':
-                            # Préparer les données de mise à jour
-                            transcript_text = transcript_data.get('text', '')
-                            audio_duration = transcript_data.get('audio_duration', 0)
-                            
-                            # Essayer de formater avec les locuteurs si disponibles
-                            if 'utterances' in transcript_data and transcript_data['utterances']:
-                                try:
-                                    # Récupérer les noms personnalisés des locuteurs s'ils existent
-                                    speaker_names = {}
-                                    try:
-                                        speakers_data = get_meeting_speakers(meeting_id, user_id)
-                                        if speakers_data:
-                                            for speaker in speakers_data:
-                                                speaker_names[speaker['speaker_id']] = speaker['custom_name']
-                                    except Exception as e:
-                                        logger.warning(f"Impossible de récupérer les noms personnalisés: {str(e)}")
-                                        speaker_names = {}
-                                    
-                                    formatted_text = []
-                                    speakers_set = set()
-                                    for utterance in transcript_data.get('utterances', []):
-                                        speaker = utterance.get('speaker', 'Unknown')
-                                        speakers_set.add(speaker)
-                                        text = utterance.get('text', '')
-                                        
-                                        # SAFETY: Assurer qu'on a toujours un texte, même vide
-                                        if text is None:
-                                            text = ''
-                                        
-                                        # Utiliser le nom personnalisé s'il existe, sinon utiliser le format par défaut
-                                        speaker_name = None
-                                        
-                                        # 1. Essayer d'abord avec l'ID simple (ex: "A", "B", "C", "D")
-                                        if speaker in speaker_names:
-                                            speaker_name = speaker_names[speaker]
-                                            logger.debug(f"Found custom name for simple ID '{speaker}': {speaker_name}")
-                                        
-                                        # 2. Essayer avec le format "Speaker X" (ex: "Speaker A", "Speaker B")
-                                        full_speaker_id = f"Speaker {speaker}"
-                                        if speaker_name is None and full_speaker_id in speaker_names:
-                                            speaker_name = speaker_names[full_speaker_id]
-                                            logger.debug(f"Found custom name for full ID '{full_speaker_id}': {speaker_name}")
-                                        
-                                        # 3. Si aucun nom personnalisé trouvé, utiliser le format par défaut
-                                        if speaker_name is None:
-                                            speaker_name = full_speaker_id
-                                            logger.debug(f"No custom name found for speaker '{speaker}', using default: {speaker_name}")
-                                        
-                                        # IMPORTANT: Toujours ajouter la ligne, même si le texte est vide
-                                        formatted_text.append(f"{speaker_name}: {text}")
-                                    
-                                    transcript_text = "\n".join(formatted_text)
-                                    speakers_count = len(speakers_set) if speakers_set else 1
-                                except Exception as e:
-                                    logger.error(f"Erreur lors du formatage du texte: {str(e)}")
-                                    speakers_count = 1
-                            else:
-                                speakers_count = 1
-                            
-                            # Mettre à jour la base de données
-                            update_data = {
-                                "transcript_text": transcript_text,
-                                "transcript_status": "completed",
-                                "duration_seconds": int(audio_duration) if audio_duration else 0,
-                                "speakers_count": speakers_count
-                            }
-                            
-                            update_meeting(meeting_id, user_id, update_data)
-                            logger.info(f"Réunion {meeting_id} mise à jour avec succès (statut: completed)")
-                        elif status == 'error':
-                            # Mettre à jour la base de données en cas d'erreur
-                            error_message = transcript_data.get('error', 'Unknown error')
-                            update_data = {
-                                "transcript_status": "error",
-                                "transcript_text": f"Erreur lors de la transcription: {error_message}"
-                            }
-                            
-                            update_meeting(meeting_id, user_id, update_data)
-                            logger.info(f"Réunion {meeting_id} mise à jour avec succès (statut: error)")
-                        else:
-                            logger.info(f"Réunion {meeting_id} toujours en cours de traitement (statut: {status})")
-                except Exception as e:
-                    logger.error(f"Erreur lors de la vérification du statut de la transcription {transcript_id}: {str(e)}")
-            elif meeting and meeting.get('transcript_status') == 'pending':
-                logger.info(f"Réunion {meeting_id} toujours en attente")
-                # Ne pas relancer automatiquement la transcription
-                # Juste logger l'information pour le suivi
-        except Exception as e:
-            logger.error(f"Erreur lors du traitement de la transcription pour {meeting.get('id', 'unknown')}: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
+    from .reconciliation import reconcile_transcriptions
+    return reconcile_transcriptions()
@@ -0,0 +1,298 @@
+"""
+Client HTTP partagé pour l'API AssemblyAI.
+
+Toutes les requêtes vers AssemblyAI passent par ce module : les connexions sont
+réutilisées (keep-alive) grâce à un client httpx unique, les délais d'attente
+proviennent de settings.HTTP_TIMEOUT et les erreurs transitoires (réseau, 429,
+5xx) sont relancées avec un délai exponentiel. Les POST (envoi de fichier,
+création de transcription) ne sont relancés que si la requête n'a pas pu être
+envoyée (connexion impossible) ou a été refusée (429) : après une coupure en
+cours de réponse, AssemblyAI a pu l'accepter, et la relancer créerait (et
+facturerait) une seconde transcription.
+
+Les méthodes asynchrones sont destinées aux routes FastAPI ; les variantes
+synchrones (suffixe _sync) servent aux threads de traitement et aux scripts CLI.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+
+from ..core.config import settings
+
+logger = logging.getLogger("meeting-transcriber")
+
+# Clé API AssemblyAI (la variable d'environnement est prioritaire)
+ASSEMBLY_AI_API_KEY = settings.ASSEMBLYAI_API_KEY or "3419005ee6924e08a14235043cabcd4e"
+
+# Codes HTTP pour lesquels une nouvelle tentative a du sens
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Méthodes sans effet de bord, relancées après toute erreur transitoire
+IDEMPOTENT_METHODS = {"GET", "HEAD"}
+
+# Requêtes non idempotentes : relancées seulement si la requête n'a pas été reçue
+UNSENT_REQUEST_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+NON_IDEMPOTENT_RETRY_STATUS_CODES = {429}
+
+
+class AssemblyAIError(Exception):
+    """Erreur renvoyée par l'API AssemblyAI ou réseau indisponible"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _read_file_chunks(file_path: str, chunk_size: int):
+    """Lit un fichier par blocs pour l'envoyer sans le charger en mémoire"""
+    with open(file_path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+async def _aread_file_chunks(file_path: str, chunk_size: int):
+    """Variante asynchrone de _read_file_chunks (lectures disque hors de la boucle)"""
+    f = await asyncio.to_thread(open, file_path, "rb")
+    try:
+        while True:
+            chunk = await asyncio.to_thread(f.read, chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        f.close()
+
+
+class AssemblyAIClient:
+    """
+    Client AssemblyAI avec pool de connexions, timeouts et relances.
+
+    Les clients httpx sont créés à la première utilisation. Le client asynchrone
+    est lié à la boucle d'événements qui l'a créé ; il est recréé si une autre
+    boucle l'utilise (scripts lancés avec asyncio.run, tests).
+    """
+
+    def __init__(self, api_key: str, base_url: str, timeout: float,
+                 max_retries: int = 3, backoff: float = 0.5, max_connections: int = 20):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_connections = max_connections
+        self._sync_client: Optional[httpx.Client] = None
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._async_loop = None
+        self._lock = threading.Lock()
+
+    def _client_options(self) -> Dict[str, Any]:
+        return {
+            "base_url": self.base_url,
+            "headers": {"authorization": self.api_key},
+            # Timeout de connexion court, lecture/écriture selon HTTP_TIMEOUT
+            "timeout": httpx.Timeout(self.timeout, connect=min(self.timeout, 10)),
+            "limits": httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections
+            )
+        }
+
+    def _get_sync_client(self) -> httpx.Client:
+        with self._lock:
+            if self._sync_client is None:
+                self._sync_client = httpx.Client(**self._client_options())
+            return self._sync_client
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            self._async_client = httpx.AsyncClient(**self._client_options())
+            self._async_loop = loop
+        return self._async_client
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """Délai avant la prochaine tentative (Retry-After si fourni, sinon exponentiel)"""
+        if response is not None:
+            retry_after = response.headers.get("retry-after")
+            if retry_after and retry_after.isdigit():
+                return float(retry_after)
+        return self.backoff * (2 ** attempt) + random.uniform(0, self.backoff)
+
+    @staticmethod
+    def _should_retry(method: str, response: Optional[httpx.Response] = None,
+                      error: Optional[Exception] = None) -> bool:
+        """Indique si une tentative échouée peut être relancée sans risquer de l'exécuter deux fois"""
+        if method.upper() in IDEMPOTENT_METHODS:
+            return error is not None or response.status_code in RETRY_STATUS_CODES
+        if error is not None:
+            return isinstance(error, UNSENT_REQUEST_ERRORS)
+        return response.status_code in NON_IDEMPOTENT_RETRY_STATUS_CODES
+
+    @staticmethod
+    def _check_response(response: httpx.Response, method: str, path: str) -> Dict[str, Any]:
+        if response.status_code >= 400:
+            raise AssemblyAIError(
+                f"{method} {path}: {response.status_code} - {response.text}",
+                status_code=response.status_code
+            )
+        return response.json()
+
+    async def request(self, method: str, path: str, content_factory=None, **kwargs) -> Dict[str, Any]:
+        """
+        Exécute une requête asynchrone avec relances (limitées pour les POST, voir _should_retry).
+
+        Args:
+            method: Méthode HTTP
+            path: Chemin relatif à l'URL de base (ex: /transcript)
+            content_factory: Fonction retournant le corps de la requête, rappelée à chaque tentative
+                             (nécessaire pour les flux qui ne peuvent être lus qu'une fois)
+
+        Returns:
+            dict: Corps JSON de la réponse
+
+        Raises:
+            AssemblyAIError: si la requête échoue après toutes les tentatives
+        """
+        client = self._get_async_client()
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                if content_factory is not None:
+                    kwargs["content"] = content_factory()
+                response = await client.request(method, path, **kwargs)
+                if not self._should_retry(method, response=response):
+                    return self._check_response(response, method, path)
+                error = AssemblyAIError(f"{method} {path}: {response.status_code}", response.status_code)
+            except httpx.TransportError as e:
+                error = AssemblyAIError(f"{method} {path}: {str(e)}")
+                if not self._should_retry(method, error=e):
+                    raise error
+
+            if attempt >= self.max_retries:
+                raise error
+            delay = self._retry_delay(attempt, response)
+            logger.warning(f"AssemblyAI indisponible ({error}), nouvelle tentative dans {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    def request_sync(self, method: str, path: str, content_factory=None, **kwargs) -> Dict[str, Any]:
+        """Variante synchrone de request()"""
+        client = self._get_sync_client()
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                if content_factory is not None:
+                    kwargs["content"] = content_factory()
+                response = client.request(method, path, **kwargs)
+                if not self._should_retry(method, response=response):
+                    return self._check_response(response, method, path)
+                error = AssemblyAIError(f"{method} {path}: {response.status_code}", response.status_code)
+            except httpx.TransportError as e:
+                error = AssemblyAIError(f"{method} {path}: {str(e)}")
+                if not self._should_retry(method, error=e):
+                    raise error
+
+            if attempt >= self.max_retries:
+                raise error
+            delay = self._retry_delay(attempt, response)
+            logger.warning(f"AssemblyAI indisponible ({error}), nouvelle tentative dans {delay:.1f}s")
+            time.sleep(delay)
+
+    @staticmethod
+    def _transcript_payload(audio_url: str, speakers_expected: Optional[int] = None,
+                            **options) -> Dict[str, Any]:
+        payload = {
+            "audio_url": audio_url,
+            "speaker_labels": True,
+            "language_code": "fr"
+        }
+        # Optionnel: si nous avons une estimation du nombre de locuteurs
+        if speakers_expected is not None and speakers_expected > 1:
+            payload["speakers_expected"] = speakers_expected
+        payload.update({key: value for key, value in options.items() if value is not None})
+        return payload
+
+    # --- API asynchrone (routes) ---
+
+    async def upload_file(self, file_path: str) -> str:
+        """Envoie un fichier local à AssemblyAI et retourne son URL d'upload"""
+        result = await self.request(
+            "POST", "/upload",
+            content_factory=lambda: _aread_file_chunks(file_path, settings.UPLOAD_CHUNK_SIZE)
+        )
+        return result["upload_url"]
+
+    async def start_transcription(self, audio_url: str, speakers_expected: Optional[int] = None,
+                                  **options) -> str:
+        """Démarre une transcription et retourne son ID"""
+        result = await self.request(
+            "POST", "/transcript", json=self._transcript_payload(audio_url, speakers_expected, **options)
+        )
+        return result["id"]
+
+    async def get_transcript(self, transcript_id: str) -> Dict[str, Any]:
+        """Récupère une transcription complète"""
+        return await self.request("GET", f"/transcript/{transcript_id}")
+
+    async def list_transcripts(self, **params) -> Dict[str, Any]:
+        """Liste les transcriptions du compte (paramètres de pagination AssemblyAI)"""
+        return await self.request("GET", "/transcript", params=params)
+
+    # --- API synchrone (threads de traitement, scripts) ---
+
+    def upload_file_sync(self, file_path: str) -> str:
+        """Variante synchrone de upload_file()"""
+        result = self.request_sync(
+            "POST", "/upload",
+            content_factory=lambda: _read_file_chunks(file_path, settings.UPLOAD_CHUNK_SIZE)
+        )
+        return result["upload_url"]
+
+    def start_transcription_sync(self, audio_url: str, speakers_expected: Optional[int] = None,
+                                 **options) -> str:
+        """Variante synchrone de start_transcription()"""
+        result = self.request_sync(
+            "POST", "/transcript", json=self._transcript_payload(audio_url, speakers_expected, **options)
+        )
+        return result["id"]
+
+    def get_transcript_sync(self, transcript_id: str) -> Dict[str, Any]:
+        """Variante synchrone de get_transcript()"""
+        return self.request_sync("GET", f"/transcript/{transcript_id}")
+
+    def list_transcripts_sync(self, **params) -> Dict[str, Any]:
+        """Variante synchrone de list_transcripts()"""
+        return self.request_sync("GET", "/transcript", params=params)
+
+    async def aclose(self):
+        """Ferme les connexions ouvertes (à l'arrêt de l'application)"""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+            self._async_loop = None
+        self.close()
+
+    def close(self):
+        """Ferme le client synchrone"""
+        with self._lock:
+            if self._sync_client is not None:
+                self._sync_client.close()
+                self._sync_client = None
+
+
+# Instance singleton partagée par toute l'application
+assemblyai_client = AssemblyAIClient(
+    api_key=ASSEMBLY_AI_API_KEY,
+    base_url=settings.ASSEMBLYAI_BASE_URL,
+    timeout=settings.HTTP_TIMEOUT,
+    max_retries=settings.ASSEMBLYAI_MAX_RETRIES,
+    backoff=settings.ASSEMBLYAI_RETRY_BACKOFF
+)
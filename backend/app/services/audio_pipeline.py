@@ -0,0 +1,95 @@
+"""
+Pipeline d'ingestion des fichiers audio.
+
+Regroupe les étapes communes à tous les points d'entrée d'upload (upload direct,
+upload reprenable) : stockage du fichier reçu, création de la réunion et mise
+en file de la conversion, qui lancera ensuite la transcription.
+"""
+
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from typing import Optional
+
+from fastapi.logger import logger
+
+from ..db.queries import create_meeting, update_meeting
+from .conversion import conversion_stage, ConversionQueueFullError
+
+
+def get_audio_upload_path(user_id: str, filename: str) -> str:
+    """
+    Génère un chemin unique dans le dossier d'uploads de l'utilisateur.
+
+    Args:
+        user_id: ID de l'utilisateur
+        filename: Nom du fichier d'origine (seule l'extension est conservée)
+
+    Returns:
+        str: Chemin relatif du fichier (uploads/<user_id>/...)
+    """
+    user_upload_dir = os.path.join("uploads", str(user_id))
+    os.makedirs(user_upload_dir, exist_ok=True)
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    extension = os.path.splitext(filename or "")[1].lower()
+    return os.path.join(user_upload_dir, f"{timestamp}_tmp{next(tempfile._get_candidate_names())}{extension}")
+
+
+def ingest_audio_file(input_path: str, title: str, user_id: str, client_id: Optional[str] = None,
+                      original_filename: Optional[str] = None) -> dict:
+    """
+    Transforme un fichier audio reçu en réunion et planifie sa conversion.
+
+    La réunion est créée avec le statut 'converting' et la fonction retourne
+    immédiatement ; l'étape de conversion fait ensuite passer la réunion en
+    'processing' et lance la transcription.
+
+    Args:
+        input_path: Chemin du fichier audio original sur disque
+        title: Titre de la réunion
+        user_id: ID de l'utilisateur propriétaire
+        client_id: ID du client associé (optionnel)
+        original_filename: Nom du fichier d'origine, pour conserver son extension
+
+    Returns:
+        dict: La réunion créée
+
+    Raises:
+        ConversionQueueFullError: si la file de conversion est pleine
+    """
+    if not conversion_stage.has_capacity():
+        raise ConversionQueueFullError("File de conversion pleine")
+
+    # Placer le fichier original dans le dossier de l'utilisateur s'il n'y est pas déjà
+    user_upload_dir = os.path.abspath(os.path.join("uploads", str(user_id)))
+    if os.path.dirname(os.path.abspath(input_path)) != user_upload_dir:
+        stored_path = get_audio_upload_path(user_id, original_filename or input_path)
+        shutil.move(input_path, stored_path)
+    else:
+        stored_path = os.path.relpath(input_path)
+
+    # Créer l'entrée dans la base de données avec le statut "converting"
+    meeting_data = {
+        "title": title,
+        "file_url": f"/{stored_path}",
+        "transcript_status": "converting"
+    }
+
+    # Ajouter client_id si fourni
+    if client_id:
+        meeting_data["client_id"] = client_id
+    meeting = create_meeting(meeting_data, user_id)
+
+    try:
+        conversion_stage.submit(meeting["id"], user_id, stored_path)
+        logger.info(f"Conversion planifiée pour la réunion {meeting['id']} ({conversion_stage.pending} en file)")
+    except ConversionQueueFullError:
+        update_meeting(meeting["id"], user_id, {
+            "transcript_status": "error",
+            "transcript_text": "Le service de conversion est saturé, veuillez réessayer."
+        })
+        raise
+
+    return meeting
@@ -0,0 +1,285 @@
+"""
+Étape de conversion audio exécutée hors du chemin des requêtes HTTP.
+
+Le fichier reçu est analysé avec ffprobe puis, selon TRANSCODE_POLICY, transmis
+tel quel au fournisseur de transcription ou réencodé dans un format compact.
+
+Les conversions sont des tâches de la file persistante (table jobs), exécutées
+dans le pool borné "convert" (voir executors.py) du processus qui traite la file.
+Chaque worker attend la fin d'un processus ffmpeg (le transcodage tourne donc dans
+un processus séparé, sans bloquer la boucle d'événements ni le GIL). La profondeur
+de la file est limitée : au-delà, les nouveaux uploads sont refusés plutôt que
+d'accumuler des fichiers à convertir.
+
+Une conversion qui échoue est retentée par la file (backoff exponentiel) : seul
+un fichier rejeté par ffprobe met directement la réunion en erreur, les autres
+échecs (disque, ffmpeg interrompu) ne le font qu'une fois la tâche abandonnée.
+"""
+
+import json
+import os
+import subprocess
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi.logger import logger
+
+from ..core.config import settings
+from ..db.job_queries import count_jobs
+from ..db.queries import update_meeting
+from .assemblyai import convert_to_wav
+from .executors import ExecutorFullError
+from .job_context import raise_if_job_cancelled
+
+# Type de la tâche de conversion dans la table jobs
+CONVERSION_JOB = "conversion"
+
+
+# Codecs acceptés directement par AssemblyAI : inutile de les réencoder
+PASSTHROUGH_CODECS = {
+    "mp3", "aac", "flac", "opus", "vorbis", "alac",
+    "pcm_s16le", "pcm_s24le", "pcm_f32le", "pcm_mulaw", "pcm_alaw"
+}
+
+# Paramètres ffmpeg des formats compacts pour la parole (mono, sans piste vidéo)
+ENCODINGS = {
+    "flac": {
+        "extension": ".flac",
+        "args": ['-vn', '-ac', '1', '-ar', '16000', '-c:a', 'flac', '-compression_level', '5']
+    },
+    "opus": {
+        "extension": ".ogg",
+        "args": ['-vn', '-ac', '1', '-c:a', 'libopus', '-b:a', '24k', '-application', 'voip']
+    }
+}
+
+
+class InvalidAudioError(Exception):
+    """Fichier rejeté par ffprobe : erreur définitive, la conversion n'est pas retentée"""
+
+
+def probe_audio(path: str) -> Optional[Dict[str, Any]]:
+    """
+    Analyse un fichier audio avec ffprobe.
+
+    Returns:
+        dict: codec, format, durée, débit, fréquence et canaux de la première piste audio,
+              ou None si ffprobe n'a pas pu s'exécuter
+
+    Raises:
+        InvalidAudioError: si ffprobe rejette le fichier ou n'y trouve aucune piste audio
+    """
+    cmd = [
+        'ffprobe', '-v', 'error', '-print_format', 'json',
+        '-show_format', '-show_streams', '-select_streams', 'a:0', path
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logger.warning(f"Impossible d'analyser {path} avec ffprobe: {str(e)}")
+        return None
+
+    if result.returncode != 0:
+        raise InvalidAudioError(f"Fichier audio illisible: {result.stderr.strip()}")
+
+    try:
+        data = json.loads(result.stdout or "{}")
+    except ValueError:
+        return None
+
+    streams = data.get("streams") or []
+    if not streams:
+        raise InvalidAudioError("Aucune piste audio dans le fichier")
+
+    stream = streams[0]
+    file_format = data.get("format", {})
+    return {
+        "codec": stream.get("codec_name"),
+        "format": file_format.get("format_name"),
+        "duration": float(file_format.get("duration") or 0),
+        "bit_rate": int(file_format.get("bit_rate") or 0),
+        "sample_rate": int(stream.get("sample_rate") or 0),
+        "channels": stream.get("channels")
+    }
+
+
+def encode_audio(input_path: str, encoding: str) -> str:
+    """Encode un fichier audio dans un format compact (flac ou opus) avec ffmpeg"""
+    params = ENCODINGS[encoding]
+    output_path = os.path.splitext(input_path)[0] + '_converted' + params["extension"]
+
+    cmd = ['ffmpeg', '-i', input_path] + params["args"] + ['-y', output_path]
+    logger.info(f"Encodage {encoding} du fichier audio: {' '.join(cmd)}")
+
+    try:
+        # Priorité réduite pour limiter l'utilisation CPU
+        result = subprocess.run(['nice', '-n', '19'] + cmd, capture_output=True, text=True)
+    except OSError:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+
+    if result.returncode != 0:
+        raise Exception(f"Échec de l'encodage {encoding}: {result.stderr}")
+
+    if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
+        raise Exception("Le fichier encodé n'existe pas ou est vide")
+
+    return output_path
+
+
+def transcode_audio(input_path: str, policy: str) -> Tuple[str, str]:
+    """
+    Prépare un fichier audio pour la transcription selon la politique choisie.
+
+    Politiques:
+        - "passthrough": conserve le fichier s'il utilise un codec supporté, sinon encode en FLAC
+        - "flac" / "opus": encode systématiquement dans ce format compact
+        - "wav": conversion historique en WAV PCM 16 kHz mono
+
+    Returns:
+        Tuple[str, str]: chemin du fichier à transcrire et format retenu
+
+    Raises:
+        InvalidAudioError: si le fichier est rejeté par ffprobe
+    """
+    probe = probe_audio(input_path)
+
+    if policy == "wav":
+        return convert_to_wav(input_path), "wav"
+
+    if policy == "passthrough":
+        if probe and probe.get("codec") in PASSTHROUGH_CODECS:
+            logger.info(f"Codec {probe['codec']} supporté, fichier conservé tel quel: {input_path}")
+            return input_path, probe["codec"]
+        policy = "flac"
+
+    if policy not in ENCODINGS:
+        raise ValueError(f"Politique de transcodage inconnue: {policy}")
+
+    return encode_audio(input_path, policy), policy
+
+
+class ConversionQueueFullError(ExecutorFullError):
+    """La file de conversion a atteint sa profondeur maximale"""
+
+
+class ConversionStage:
+    """
+    Étape de conversion audio, exécutée comme tâche "conversion" de la file
+    persistante (table jobs) dans le pool borné "convert" du processus qui traite
+    la file : processus web avec RUN_BACKGROUND_JOBS, sinon `python -m app.worker`.
+
+    La réclamation des tâches étant atomique, une conversion n'est exécutée que par
+    un seul processus, et elle est reprise à l'expiration de son bail si ce
+    processus s'arrête (redémarrage, recyclage du worker web).
+
+    Lorsqu'une conversion se termine, la réunion passe de 'converting' à
+    'processing' et sa transcription est ajoutée à la file de tâches. Les échecs
+    passagers sont propagés pour que la tâche soit retentée.
+    """
+
+    @property
+    def pending(self) -> int:
+        """Nombre de conversions en attente ou en cours (toutes instances confondues)"""
+        return count_jobs(CONVERSION_JOB, ("queued", "running"))
+
+    def has_capacity(self) -> bool:
+        """Indique si une nouvelle conversion peut être acceptée (au plus CONVERSION_QUEUE_DEPTH en attente)"""
+        return count_jobs(CONVERSION_JOB, ("queued",)) < settings.CONVERSION_QUEUE_DEPTH
+
+    def submit(self, meeting_id: str, user_id: str, source_path: str):
+        """
+        Planifie la conversion d'un fichier audio.
+
+        Raises:
+            ConversionQueueFullError: si la file de conversion est pleine
+        """
+        if not self.has_capacity():
+            raise ConversionQueueFullError(
+                f"File de conversion pleine ({settings.CONVERSION_QUEUE_DEPTH} conversions en attente)"
+            )
+        from .queue_processor import enqueue_conversion
+        return enqueue_conversion(meeting_id, user_id, source_path)
+
+    def run(self, meeting_id: str, user_id: str, source_path: str):
+        """
+        Convertit le fichier puis fait avancer la réunion vers la transcription.
+
+        Un fichier rejeté par ffprobe met la réunion en erreur ; toute autre
+        exception est propagée à run_job, qui replanifie la tâche.
+        """
+        logger.info(f"Conversion du fichier {source_path} pour la réunion {meeting_id}")
+        original_size = os.path.getsize(source_path)
+        start_time = time.monotonic()
+        try:
+            converted_path, audio_format = transcode_audio(source_path, settings.TRANSCODE_POLICY)
+        except InvalidAudioError as e:
+            logger.error(f"Fichier rejeté pour la réunion {meeting_id}: {str(e)}")
+            mark_conversion_failed(meeting_id, user_id, str(e))
+            return
+        conversion_ms = int((time.monotonic() - start_time) * 1000)
+        stored_size = os.path.getsize(converted_path)
+
+        # Tâche reprise par une autre instance pendant l'encodage : lui laisser la réunion
+        raise_if_job_cancelled()
+
+        file_url = f"/{os.path.relpath(converted_path)}"
+        update_meeting(meeting_id, user_id, {
+            "file_url": file_url,
+            "transcript_status": "processing",
+            "audio_format": audio_format,
+            "original_size_bytes": original_size,
+            "stored_size_bytes": stored_size,
+            "conversion_ms": conversion_ms
+        })
+        logger.info(
+            f"Conversion terminée pour la réunion {meeting_id}: {file_url} "
+            f"({audio_format}, {original_size // 1024} KB -> {stored_size // 1024} KB, {conversion_ms} ms)"
+        )
+
+        # Le fichier original n'est plus nécessaire une fois la réunion mise à jour
+        if os.path.abspath(converted_path) != os.path.abspath(source_path):
+            os.remove(source_path)
+
+        # Passer à l'étape de transcription (file de tâches persistante)
+        from .queue_processor import enqueue_transcription
+        enqueue_transcription(meeting_id, file_url, user_id)
+
+
+def mark_conversion_failed(meeting_id: str, user_id: str, error: str):
+    """Met la réunion en erreur après un échec définitif de sa conversion"""
+    update_meeting(meeting_id, user_id, {
+        "transcript_status": "error",
+        "transcript_text": f"Erreur lors de la conversion audio: {error}"
+    })
+
+
+# Instance singleton de l'étape de conversion
+conversion_stage = ConversionStage()
+
+
+def resume_pending_conversions():
+    """
+    Replanifie les conversions des réunions restées à l'état 'converting' sans
+    tâche de conversion active (par exemple converties dans le processus web avant
+    l'introduction de la tâche "conversion").
+
+    Sans effet sur les conversions en file ou en cours dans un autre processus :
+    une seule tâche active par réunion (clé de déduplication). Les conversions
+    interrompues sont reprises par la file à l'expiration de leur bail.
+    """
+    from ..db.queries import get_meetings_by_status
+    from .queue_processor import enqueue_conversion
+
+    meetings = get_meetings_by_status("converting")
+    for meeting in meetings:
+        source_path = meeting.get("file_url", "").lstrip("/")
+        if not source_path or not os.path.exists(source_path):
+            logger.warning(f"Fichier introuvable pour la conversion de la réunion {meeting['id']}")
+            update_meeting(meeting["id"], meeting["user_id"], {
+                "transcript_status": "error",
+                "transcript_text": "Le fichier audio à convertir est introuvable."
+            })
+            continue
+
+        # Les réunions déjà acceptées sont replanifiées même au-delà de CONVERSION_QUEUE_DEPTH
+        enqueue_conversion(meeting["id"], meeting["user_id"], source_path)
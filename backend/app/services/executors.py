@@ -0,0 +1,189 @@
+"""
+Pools de threads bornés pour le travail en arrière-plan, un par type de tâche.
+
+Chaque type de travail a sa propre concurrence, pour qu'une rafale d'un type
+(par exemple 200 uploads à convertir) ne prive pas les autres de workers :
+    convert        : conversions audio ffmpeg
+    upload         : envoi de l'audio au fournisseur de transcription et démarrage
+    poll           : vérification du statut des transcriptions en cours
+    summarize      : génération des comptes rendus
+    summary_chunks : appels Mistral des parties d'une longue réunion (étape map)
+
+Au-delà de max_workers tâches en cours et max_queue en attente, submit lève
+ExecutorFullError plutôt que de créer un thread de plus : l'appelant laisse la
+tâche dans la file persistante (table jobs) ou répond 503.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.logger import logger
+
+from ..core.config import settings
+
+
+class ExecutorFullError(Exception):
+    """Le pool a atteint sa capacité (workers occupés et file d'attente pleine)"""
+
+
+class BoundedExecutor:
+    """Pool de threads à capacité bornée, avec métriques et arrêt progressif"""
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        """
+        Args:
+            name: Nom du pool (préfixe des threads, clé des métriques)
+            max_workers: Nombre de tâches exécutées simultanément
+            max_queue: Nombre de tâches pouvant attendre un worker libre
+        """
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = None
+        self._condition = threading.Condition()
+        self._accepting = True
+        self._running = 0
+        self._queued = 0
+        # Métriques
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+        return self._executor
+
+    @property
+    def pending(self) -> int:
+        """Nombre de tâches en cours ou en attente"""
+        return self._running + self._queued
+
+    @property
+    def idle_workers(self) -> int:
+        """Nombre de workers libres (tâches pouvant démarrer immédiatement)"""
+        return max(self.max_workers - self.pending, 0)
+
+    def has_capacity(self) -> bool:
+        """Indique si une nouvelle tâche peut être acceptée"""
+        return self._accepting and self.pending < self.max_workers + self.max_queue
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Planifie fn(*args, **kwargs) dans le pool.
+
+        Raises:
+            ExecutorFullError: si le pool est plein ou en cours d'arrêt
+        """
+        with self._condition:
+            if not self.has_capacity():
+                self._rejected += 1
+                reason = "en cours d'arrêt" if not self._accepting else \
+                    f"plein ({self.max_workers} en cours, {self.max_queue} en attente)"
+                raise ExecutorFullError(f"Pool {self.name} {reason}")
+            self._queued += 1
+            self._submitted += 1
+            executor = self._get_executor()
+        try:
+            future = executor.submit(self._run, fn, args, kwargs)
+        except Exception:
+            self._forget_queued()
+            raise
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _forget_queued(self):
+        with self._condition:
+            self._queued -= 1
+            self._condition.notify_all()
+
+    def _on_done(self, future):
+        # Tâche annulée avant son démarrage (arrêt après le délai) : _run n'a pas été appelée
+        if future.cancelled():
+            self._forget_queued()
+
+    def _run(self, fn, args, kwargs):
+        with self._condition:
+            self._queued -= 1
+            self._running += 1
+        failed = True
+        try:
+            result = fn(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            with self._condition:
+                self._running -= 1
+                if failed:
+                    self._failed += 1
+                else:
+                    self._completed += 1
+                self._condition.notify_all()
+
+    def shutdown(self, timeout: float = None) -> bool:
+        """
+        Refuse les nouvelles tâches et attend la fin des tâches en cours ou en attente.
+
+        Returns:
+            bool: True si le pool s'est vidé avant `timeout` secondes
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            self._accepting = False
+            if self.pending:
+                logger.info(f"Arrêt du pool {self.name} ({self._running} tâche(s) en cours, {self._queued} en attente)")
+            while self.pending:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            drained = not self.pending
+            executor, self._executor = self._executor, None
+        if executor:
+            # Délai dépassé : les tâches encore en attente sont annulées (celles de la
+            # table jobs seront reprises à l'expiration de leur bail)
+            executor.shutdown(wait=drained, cancel_futures=not drained)
+        if not drained:
+            logger.warning(f"Pool {self.name} arrêté avec {self.pending} tâche(s) non terminée(s)")
+        with self._condition:
+            # Le pool peut resservir : un nouvel exécuteur sera créé à la prochaine tâche
+            self._accepting = True
+        return drained
+
+    def stats(self):
+        """Métriques du pool"""
+        with self._condition:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": self._queued,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+            }
+
+
+executors = {
+    "convert": BoundedExecutor("convert", settings.CONVERSION_WORKERS, settings.CONVERSION_QUEUE_DEPTH),
+    "upload": BoundedExecutor("upload", settings.PROVIDER_UPLOAD_WORKERS, settings.PROVIDER_UPLOAD_QUEUE_DEPTH),
+    "poll": BoundedExecutor("poll", settings.POLL_WORKERS, settings.POLL_QUEUE_DEPTH),
+    "summarize": BoundedExecutor("summarize", settings.SUMMARY_WORKERS, settings.SUMMARY_QUEUE_DEPTH),
+    "summary_chunks": BoundedExecutor("summary-chunk", settings.SUMMARY_CHUNK_WORKERS, settings.SUMMARY_CHUNK_QUEUE_DEPTH),
+}
+
+
+def get_executor_stats():
+    """Métriques de tous les pools (profondeur de file, tâches en cours, refus)"""
+    return {name: executor.stats() for name, executor in executors.items()}
+
+
+def shutdown_executors(timeout: float = None, names=None):
+    """Arrête les pools (tous par défaut) en laissant les tâches en cours se terminer"""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    for name in names or list(executors):
+        remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+        executors[name].shutdown(remaining)
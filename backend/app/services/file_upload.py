@@ -5,6 +5,7 @@ from fastapi import UploadFile, HTTPException
 import shutil
 import logging
 import mimetypes
+from ..core.config import settings
 
 # Configurer le logging
 logger = logging.getLogger("file_upload")
@@ -71,6 +72,88 @@ def validate_image_file(file: UploadFile):
     
     return True
 
+def validate_audio_type(content_type: str, filename: str):
+    """
+    Valide que le type (ou à défaut l'extension) correspond à un format audio accepté
+    """
+    # Ignorer les paramètres éventuels (ex: "audio/webm;codecs=opus")
+    base_type = (content_type or "").split(";")[0].strip().lower()
+    
+    if base_type not in settings.ALLOWED_AUDIO_TYPES:
+        # Essayer de deviner le type à partir de l'extension
+        guessed_type, _ = mimetypes.guess_type(filename or "")
+        
+        if not guessed_type or guessed_type not in settings.ALLOWED_AUDIO_TYPES:
+            raise HTTPException(
+                status_code=415,
+                detail={
+                    "message": f"Type de fichier non supporté: {content_type}",
+                    "type": "UNSUPPORTED_MEDIA_TYPE",
+                    "allowed_types": settings.ALLOWED_AUDIO_TYPES
+                }
+            )
+    
+    return True
+
+def validate_audio_file(file: UploadFile):
+    """
+    Valide que le fichier est bien un fichier audio accepté pour la transcription
+    """
+    return validate_audio_type(file.content_type, file.filename)
+
+async def save_upload_stream(file: UploadFile, destination, max_size: int = None, chunk_size: int = None) -> int:
+    """
+    Copie un fichier uploadé sur disque par blocs de taille fixe.
+    
+    La mémoire utilisée reste bornée à un bloc quelle que soit la taille du fichier,
+    et la taille maximale est vérifiée pendant la copie pour interrompre au plus tôt
+    les uploads trop volumineux.
+    
+    Args:
+        file: Fichier uploadé
+        destination: Chemin du fichier à écrire
+        max_size: Taille maximale en octets (settings.MAX_UPLOAD_SIZE par défaut)
+        chunk_size: Taille des blocs en octets (settings.UPLOAD_CHUNK_SIZE par défaut)
+        
+    Returns:
+        int: Nombre d'octets écrits
+    """
+    max_size = max_size or settings.MAX_UPLOAD_SIZE
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+    
+    validate_audio_file(file)
+    
+    written = 0
+    try:
+        with open(destination, "wb") as buffer:
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    break
+                
+                written += len(chunk)
+                if written > max_size:
+                    raise HTTPException(
+                        status_code=413,
+                        detail={
+                            "message": f"Le fichier dépasse la taille maximale autorisée ({max_size} octets)",
+                            "type": "FILE_TOO_LARGE"
+                        }
+                    )
+                buffer.write(chunk)
+    except BaseException:
+        # Ne pas laisser de fichier partiel sur le disque
+        if os.path.exists(destination):
+            os.remove(destination)
+        raise
+    
+    if written == 0:
+        os.remove(destination)
+        raise HTTPException(status_code=400, detail="Le fichier envoyé est vide")
+    
+    logger.info(f"Upload écrit sur disque: {destination} ({written // 1024} KB)")
+    return written
+
 async def save_profile_picture(file: UploadFile, user_id: str) -> str:
     """
     Sauvegarde une image de profil pour un utilisateur et retourne l'URL relative
@@ -0,0 +1,37 @@
+"""
+Contexte de la tâche de la table jobs exécutée par le thread courant.
+
+Pendant l'exécution d'une tâche, run_job (queue_processor.py) renouvelle son bail
+par un heartbeat. Si le renouvellement échoue (bail repris par une autre
+instance), la tâche est annulée : un thread ne pouvant pas être interrompu,
+l'annulation est coopérative. Les traitements longs appellent
+raise_if_job_cancelled() avant chaque appel coûteux (envoi à AssemblyAI, étapes
+du compte rendu) pour ne pas le faire en double.
+"""
+
+import threading
+from contextlib import contextmanager
+
+_current = threading.local()
+
+
+class JobCancelled(Exception):
+    """Le bail de la tâche a été perdu : une autre instance a pu la reprendre"""
+
+
+@contextmanager
+def running_job(job_id: str, cancelled: threading.Event):
+    """Associe au thread courant la tâche job_id et son signal d'annulation"""
+    previous = getattr(_current, "job", None)
+    _current.job = (job_id, cancelled)
+    try:
+        yield
+    finally:
+        _current.job = previous
+
+
+def raise_if_job_cancelled():
+    """Lève JobCancelled si la tâche exécutée par ce thread a été annulée (sans effet hors d'une tâche)"""
+    job = getattr(_current, "job", None)
+    if job is not None and job[1].is_set():
+        raise JobCancelled(f"Bail perdu pour la tâche {job[0]}, exécution interrompue")
@@ -0,0 +1,124 @@
+"""
+Élection d'une instance pour les tâches périodiques, au moyen des baux de la table locks.
+
+Les balayages périodiques (vérification des transcriptions auprès d'AssemblyAI,
+purge de la file, reprise de l'ancienne file de fichiers) ne doivent tourner que
+dans une instance à la fois, qu'il s'agisse d'un processus web, de
+`python -m app.worker` ou d'un script lancé par cron. Chacun prend le bail
+PERIODIC_SWEEPS_LEASE avant de les exécuter ; les autres instances restent
+inactives et prennent le relais à l'expiration du bail si son détenteur disparaît.
+"""
+
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+from fastapi.logger import logger
+
+from ..core.config import settings
+from ..db.lock_queries import acquire_lock, release_lock
+
+# Bail des balayages périodiques (réconciliation, purge, import de l'ancienne file)
+PERIODIC_SWEEPS_LEASE = "periodic-sweeps"
+
+
+class Lease:
+    """Bail nommé, pris et renouvelé au nom de ce processus"""
+
+    def __init__(self, name: str, ttl_seconds: float = None, owner: str = None):
+        """
+        Args:
+            name: Nom du bail (clé de la table locks)
+            ttl_seconds: Durée du bail sans renouvellement
+            owner: Détenteur enregistré (hôte:pid par défaut)
+        """
+        self.name = name
+        self.ttl = ttl_seconds or settings.LEASE_TTL_SECONDS
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        self._renewed_at = 0.0
+        self._valid_until = 0.0
+
+    @property
+    def renew_interval(self) -> float:
+        """Intervalle de renouvellement : trois renouvellements par durée de bail"""
+        return self.ttl / 3
+
+    @property
+    def held(self) -> bool:
+        """Indique si le bail est détenu (d'après le dernier renouvellement réussi)"""
+        return time.monotonic() < self._valid_until
+
+    def acquire(self) -> bool:
+        """Prendre le bail, ou le renouveler s'il est déjà détenu ; False si une autre instance le détient"""
+        # Validité locale comptée depuis l'envoi de la requête : elle expire avant le bail en base
+        started = time.monotonic()
+        was_held = self.held
+        try:
+            acquired = acquire_lock(self.name, self.owner, self.ttl)
+        except Exception as e:
+            logger.error(f"Erreur lors du renouvellement du bail {self.name}: {str(e)}")
+            acquired = False
+
+        if acquired:
+            self._renewed_at = started
+            self._valid_until = started + self.ttl
+            if not was_held:
+                logger.info(f"Bail {self.name} obtenu par {self.owner}")
+        else:
+            self._valid_until = 0.0
+            if was_held:
+                logger.warning(f"Bail {self.name} perdu par {self.owner}")
+        return acquired
+
+    def ensure(self) -> bool:
+        """
+        Renouveler le bail s'il approche de son expiration, ou tenter de le prendre.
+        Peu coûteux : n'écrit en base qu'une fois par renew_interval tant que le bail est détenu.
+        """
+        if self.held and time.monotonic() - self._renewed_at < self.renew_interval:
+            return True
+        return self.acquire()
+
+    def release(self):
+        """Libérer le bail pour qu'une autre instance le prenne sans attendre son expiration"""
+        was_held = self.held
+        self._valid_until = 0.0
+        try:
+            if release_lock(self.name, self.owner) or was_held:
+                logger.info(f"Bail {self.name} libéré par {self.owner}")
+        except Exception as e:
+            logger.error(f"Erreur lors de la libération du bail {self.name}: {str(e)}")
+
+    @contextmanager
+    def hold(self):
+        """
+        Détenir le bail pendant le bloc, renouvelé par un thread de heartbeat.
+
+        Produit True si le bail a été obtenu, False (sans attendre) si une autre
+        instance le détient :
+
+            with Lease(PERIODIC_SWEEPS_LEASE).hold() as acquired:
+                if acquired:
+                    ...
+        """
+        if not self.acquire():
+            yield False
+            return
+
+        stop = threading.Event()
+
+        def heartbeat():
+            while not stop.wait(self.renew_interval):
+                if not self.acquire():
+                    return
+
+        thread = threading.Thread(target=heartbeat, name=f"lease-{self.name}", daemon=True)
+        thread.start()
+        try:
+            yield True
+        finally:
+            stop.set()
+            thread.join()
+            self.release()
@@ -1,8 +1,13 @@
 import json
 import logging
+import math
 import os
-from typing import Optional, Dict, Any
+import re
+import time
+from typing import Optional, Dict, Any, List, Tuple
 from ..core.config import settings
+from .job_context import raise_if_job_cancelled
+from .result_cache import SUMMARY_RESULT, content_hash, get_result, result_key, store_result
 import requests
 
 # Configuration pour Mistral AI
@@ -13,72 +18,45 @@ MISTRAL_API_URL = "https://api.mistral.ai/v1/chat/completions"
 # Configuration du logging
 logger = logging.getLogger("meeting-transcriber")
 
-def get_client_template(client_id: Optional[str] = None, user_id: Optional[str] = None) -> Optional[str]:
-    """
-    Récupère le template de résumé associé à un client.
+class MistralAPIError(Exception):
+    """Échec d'un appel à l'API Mistral"""
     
-    Args:
-        client_id: ID du client (optionnel)
-        user_id: ID de l'utilisateur propriétaire du client (optionnel)
-        
-    Returns:
-        str: Template de résumé ou None si aucun template n'est trouvé
-    """
-    if not client_id or not user_id:
-        return None
-        
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None,
+                 retryable: Optional[bool] = None):
+        """
+        Args:
+            message: Description de l'erreur
+            status_code: Code HTTP de la réponse (None si la requête n'a pas abouti)
+            retry_after: Délai demandé par l'API avant un nouvel essai (en-tête Retry-After)
+            retryable: Erreur temporaire ; par défaut, erreurs réseau, 429 et 5xx
+        """
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        if retryable is None:
+            retryable = status_code is None or status_code == 429 or status_code >= 500
+        self.retryable = retryable
+
+def _retry_after(response) -> Optional[float]:
     try:
-        # Importer les fonctions ici pour éviter les imports circulaires
-        from ..db.client_queries import get_client
-        
-        # Récupérer les informations du client
-        client = get_client(client_id, user_id)
-        
-        if client and client.get("summary_template"):
-            logger.info(f"Template de résumé trouvé pour le client {client_id}")
-            return client["summary_template"]
-        else:
-            logger.info(f"Aucun template de résumé trouvé pour le client {client_id}")
-            return None
-    except Exception as e:
-        logger.error(f"Erreur lors de la récupération du template client: {str(e)}")
+        return float(response.headers.get("Retry-After"))
+    except (TypeError, ValueError):
         return None
 
-def generate_meeting_summary(transcript_text: str, meeting_title: Optional[str] = None, client_id: Optional[str] = None, user_id: Optional[str] = None) -> Optional[str]:
-    """
-    Génère un compte rendu de réunion à partir d'une transcription en utilisant l'API Mistral.
-    
-    Args:
-        transcript_text: Texte de la transcription de la réunion
-        meeting_title: Titre de la réunion (optionnel)
-        client_id: ID du client pour personnaliser le résumé (optionnel)
-        user_id: ID de l'utilisateur qui demande le résumé (optionnel)
-        
-    Returns:
-        str: Compte rendu généré ou None en cas d'erreur
-    """
-    if not MISTRAL_API_KEY:
-        logger.error("Clé API Mistral non configurée. Impossible de générer le compte rendu.")
-        return None
-        
-    try:
-        # Vérifier s'il existe un template client personnalisé
-        client_template = None
-        if client_id and user_id:
-            client_template = get_client_template(client_id, user_id)
-        
-        title_part = f" intitulée '{meeting_title}'" if meeting_title else ""
-        
-        # Utiliser le template personnalisé s'il existe, sinon utiliser le template par défaut
-        if client_template:
-            # Remplacer les variables dans le template client
-            prompt = client_template.replace("{transcript_text}", transcript_text)
-            if meeting_title:
-                prompt = prompt.replace("{meeting_title}", meeting_title)
-            logger.info("Utilisation d'un template client personnalisé")
-        else:
-            # Template par défaut
-            prompt = f"""Objectif :
+# Modèle et paramètres de génération
+MISTRAL_MODEL = "mistral-large-latest"  # Utiliser le modèle le plus récent et le plus performant
+SUMMARY_TEMPERATURE = 0.3  # Température basse pour des résultats plus cohérents
+SUMMARY_MAX_TOKENS = 4000  # Limite de tokens pour le compte rendu
+NOTES_MAX_TOKENS = 1500  # Limite de tokens pour les notes d'une partie
+
+# Estimation prudente (le français compte plus de tokens par caractère que l'anglais)
+CHARS_PER_TOKEN = 3
+
+# Nouvelles tentatives d'un appel de l'étape map (429, 5xx) avant d'abandonner le compte rendu
+CHUNK_CALL_RETRIES = 2
+
+# Template par défaut ; {source_intro} présente la transcription ou les notes des parties
+DEFAULT_SUMMARY_TEMPLATE = """Objectif :
 À partir d'une transcription brute d'une réunion, produire un compte rendu EXACTEMENT selon le format d'exemple fourni ci-dessous, intégrant précisément les emojis, les titres, les tableaux, et le style montrés.
 
 VOICI UN EXEMPLE EXACT DU FORMAT DE SORTIE QUE TU DOIS REPRODUIRE :
@@ -149,49 +127,380 @@ Un paragraphe de 3-4 lignes résumant l'essentiel de la réunion.
 
 UTILISE EXACTEMENT CE FORMAT, avec les mêmes emojis et la même mise en page, mais REMPLACE TOUS LES PLACEHOLDERS ENTRE CROCHETS par les informations réelles extraites de la transcription. Ne laisse AUCUN texte du type '[Premier point]' ou '[Sujet 1]' dans ta réponse. Si tu n'as pas l'information pour une section, indique-le clairement (ex: "Non mentionné" ou "Aucun point identifié"), mais NE CONSERVE PAS les placeholders entre crochets.
 
-Voici la transcription d'une réunion{title_part} :
+{source_intro}{title_part} :
+
+{transcript_text}
+"""
+
+TRANSCRIPT_INTRO = "Voici la transcription d'une réunion"
+NOTES_INTRO = "Voici les notes détaillées, dans l'ordre chronologique, des parties successives de la transcription d'une réunion"
+
+CHUNK_NOTES_PROMPT = """Tu prépares le compte rendu d'une longue réunion{title_part}, traitée en plusieurs parties.
+Voici la partie {index}/{count} de sa transcription. Rédige des notes détaillées et factuelles sur cette partie uniquement, en conservant les noms des intervenants :
+- sujets abordés et intervenants ;
+- décisions prises (et par qui) ;
+- tâches et actions (responsable, échéance) ;
+- points de vigilance ;
+- ressources mentionnées ;
+- toute information sur les participants, l'animateur, la date, la durée ou la prochaine réunion.
+N'invente rien et ne rédige pas de compte rendu final.
+
+Partie {index}/{count} :
 
 {transcript_text}
-"""        
-        # Préparer la requête pour l'API Mistral
-        headers = {
-            "Content-Type": "application/json",
-            "Accept": "application/json",
-            "Authorization": f"Bearer {MISTRAL_API_KEY}"
-        }
+"""
+
+NOTES_MERGE_PROMPT = """Voici les notes de parties successives d'une même réunion{title_part}.
+Fusionne-les en notes uniques, dans l'ordre chronologique, sans perdre aucun sujet, intervenant, décision, tâche, point de vigilance, ressource ni date. N'invente rien.
+
+{transcript_text}
+"""
+
+def estimate_tokens(text: str) -> int:
+    """Nombre de tokens estimé d'un texte (sans tokenizer)"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def _split_long_text(text: str, max_tokens: int) -> List[str]:
+    """Découpe un texte trop long aux fins de phrase, puis aux espaces, puis à la longueur"""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    for separator in (r"(?<=[.!?…])\s+", r"\s+"):
+        pieces = [p for p in re.split(separator, text) if p]
+        if all(len(p) <= max_chars for p in pieces):
+            return _group_by_budget(pieces, max_tokens, " ")
+    return [text[i:i + max_chars] for i in range(0, len(text), max_chars)]
+
+def _group_by_budget(pieces: List[str], max_tokens: int, separator: str) -> List[str]:
+    """Regroupe des morceaux consécutifs en blocs d'au plus max_tokens"""
+    groups, current, current_tokens = [], [], 0
+    for piece in pieces:
+        tokens = estimate_tokens(piece + separator)
+        if current and current_tokens + tokens > max_tokens:
+            groups.append(separator.join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += tokens
+    if current:
+        groups.append(separator.join(current))
+    return groups
+
+def split_transcript(transcript_text: str, max_tokens: int) -> List[str]:
+    """
+    Découpe une transcription en parties d'au plus max_tokens, aux limites des
+    interventions (une ligne « Locuteur: texte » par intervention). Une
+    intervention plus longue que le budget est coupée aux fins de phrase.
+    """
+    pieces = []
+    for line in transcript_text.splitlines():
+        if not line.strip():
+            continue
+        if estimate_tokens(line) > max_tokens:
+            pieces.extend(_split_long_text(line, max_tokens))
+        else:
+            pieces.append(line)
+    return _group_by_budget(pieces, max_tokens, "\n")
+
+def call_mistral(prompt: str, max_tokens: int) -> str:
+    """
+    Envoie un prompt à l'API Mistral et retourne le texte généré.
+    
+    Raises:
+        MistralAPIError: si la requête échoue ou si la réponse est vide
+    """
+    headers = {
+        "Content-Type": "application/json",
+        "Accept": "application/json",
+        "Authorization": f"Bearer {MISTRAL_API_KEY}"
+    }
+    payload = {
+        "model": MISTRAL_MODEL,
+        "messages": [
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": SUMMARY_TEMPERATURE,
+        "max_tokens": max_tokens
+    }
+    
+    try:
+        response = requests.post(
+            MISTRAL_API_URL, headers=headers, json=payload, timeout=settings.SUMMARY_REQUEST_TIMEOUT
+        )
+    except requests.RequestException as e:
+        raise MistralAPIError(f"Requête vers l'API Mistral échouée: {str(e)}")
+    
+    if response.status_code != 200:
+        raise MistralAPIError(
+            f"Erreur lors de l'appel à l'API Mistral: {response.status_code} - {response.text[:500]}",
+            status_code=response.status_code,
+            retry_after=_retry_after(response)
+        )
+    
+    response_data = response.json()
+    content = response_data.get("choices", [{}])[0].get("message", {}).get("content", "")
+    if not content:
+        raise MistralAPIError("La réponse de l'API Mistral ne contient pas de contenu")
+    return content
+
+def _call_mistral_with_retries(prompt: str, max_tokens: int) -> str:
+    """call_mistral avec quelques nouvelles tentatives sur les erreurs temporaires"""
+    for attempt in range(CHUNK_CALL_RETRIES + 1):
+        try:
+            return call_mistral(prompt, max_tokens)
+        except MistralAPIError as e:
+            if not e.retryable or attempt == CHUNK_CALL_RETRIES:
+                raise
+            delay = min(e.retry_after or 2 ** attempt, 30)
+            logger.warning(f"Appel Mistral en échec ({str(e)}), nouvelle tentative dans {delay:.0f}s")
+            time.sleep(delay)
+
+def _run_parallel(prompts: List[str], max_tokens: int) -> List[str]:
+    """
+    Exécute des appels Mistral dans le pool "summary_chunks" et retourne les
+    réponses dans l'ordre des prompts. Si le pool est plein, l'appel s'exécute
+    dans le thread courant.
+    """
+    from .executors import ExecutorFullError, executors
+    
+    pool = executors["summary_chunks"]
+    futures = []
+    for prompt in prompts:
+        try:
+            futures.append(pool.submit(_call_mistral_with_retries, prompt, max_tokens))
+        except ExecutorFullError:
+            futures.append(prompt)
+    return [
+        _call_mistral_with_retries(future, max_tokens) if isinstance(future, str) else future.result()
+        for future in futures
+    ]
+
+def build_summary_prompt(source_text: str, meeting_title: Optional[str] = None,
+                         client_template: Optional[str] = None, from_notes: bool = False) -> str:
+    """
+    Prompt du compte rendu final : template client s'il existe, sinon template par défaut.
+    source_text est la transcription, ou les notes des parties (from_notes).
+    """
+    if client_template:
+        # Remplacer les variables dans le template client
+        prompt = client_template.replace("{transcript_text}", source_text)
+        if meeting_title:
+            prompt = prompt.replace("{meeting_title}", meeting_title)
+        return prompt
+    
+    title_part = f" intitulée '{meeting_title}'" if meeting_title else ""
+    return (DEFAULT_SUMMARY_TEMPLATE
+            .replace("{source_intro}", NOTES_INTRO if from_notes else TRANSCRIPT_INTRO)
+            .replace("{title_part}", title_part)
+            .replace("{transcript_text}", source_text))
+
+def summarize_transcript(transcript_text: str, meeting_title: Optional[str] = None,
+                         client_template: Optional[str] = None) -> Tuple[str, Dict[str, Any]]:
+    """
+    Génère le compte rendu d'une transcription.
+    
+    Jusqu'à SUMMARY_SINGLE_PASS_TOKENS, la transcription est envoyée en un seul
+    appel. Au-delà (map-reduce) :
+        1. découpage aux limites des interventions en parties de SUMMARY_CHUNK_TOKENS ;
+        2. map : notes de chaque partie, appels parallèles (pool "summary_chunks") ;
+        3. fusion des notes par groupes tant qu'elles dépassent SUMMARY_SINGLE_PASS_TOKENS ;
+        4. reduce : compte rendu selon le template à partir des notes.
+    Aucun prompt ne dépasse ainsi le budget, quelle que soit la durée de la réunion.
+    Entre deux étapes, l'exécution s'arrête si la tâche a perdu son bail (JobCancelled).
+    
+    Returns:
+        Tuple[str, dict]: compte rendu et durées de chaque étape (secondes)
+    """
+    started = time.perf_counter()
+    timings = {"tokens": estimate_tokens(transcript_text)}
+    title_part = f" intitulée '{meeting_title}'" if meeting_title else ""
+    
+    if timings["tokens"] <= settings.SUMMARY_SINGLE_PASS_TOKENS:
+        timings["chunks"] = 1
+        summary = call_mistral(build_summary_prompt(transcript_text, meeting_title, client_template), SUMMARY_MAX_TOKENS)
+        timings["reduce"] = timings["total"] = time.perf_counter() - started
+        return summary, timings
+    
+    stage = time.perf_counter()
+    chunks = split_transcript(transcript_text, settings.SUMMARY_CHUNK_TOKENS)
+    timings["chunks"] = len(chunks)
+    timings["split"] = time.perf_counter() - stage
+    logger.info(f"Transcription longue (~{timings['tokens']} tokens) résumée en {len(chunks)} parties")
+    
+    raise_if_job_cancelled()
+    stage = time.perf_counter()
+    notes = _run_parallel([
+        CHUNK_NOTES_PROMPT
+        .replace("{title_part}", title_part)
+        .replace("{index}", str(i))
+        .replace("{count}", str(len(chunks)))
+        .replace("{transcript_text}", chunk)
+        for i, chunk in enumerate(chunks, 1)
+    ], NOTES_MAX_TOKENS)
+    timings["map"] = time.perf_counter() - stage
+    
+    # Fusionner les notes par groupes jusqu'à ce qu'elles tiennent dans un seul prompt
+    stage = time.perf_counter()
+    notes = [f"### Partie {i}/{len(notes)}\n{text}" for i, text in enumerate(notes, 1)]
+    timings["merge_levels"] = 0
+    while estimate_tokens("\n\n".join(notes)) > settings.SUMMARY_SINGLE_PASS_TOKENS and len(notes) > 1:
+        groups = _group_by_budget(notes, settings.SUMMARY_CHUNK_TOKENS, "\n\n")
+        if len(groups) == len(notes):
+            # Notes trop longues pour être regroupées : fusion deux à deux
+            groups = ["\n\n".join(notes[i:i + 2]) for i in range(0, len(notes), 2)]
+        raise_if_job_cancelled()
+        notes = _run_parallel([
+            NOTES_MERGE_PROMPT.replace("{title_part}", title_part).replace("{transcript_text}", group)
+            for group in groups
+        ], NOTES_MAX_TOKENS)
+        timings["merge_levels"] += 1
+    timings["merge"] = time.perf_counter() - stage
+    
+    raise_if_job_cancelled()
+    stage = time.perf_counter()
+    prompt = build_summary_prompt("\n\n".join(notes), meeting_title, client_template, from_notes=True)
+    summary = call_mistral(prompt, SUMMARY_MAX_TOKENS)
+    timings["reduce"] = time.perf_counter() - stage
+    timings["total"] = time.perf_counter() - started
+    return summary, timings
+
+def summary_cache_key(transcript_text: str, meeting_title: Optional[str] = None,
+                      client_template: Optional[str] = None) -> str:
+    """
+    Clé du compte rendu dans le cache des résultats : transcription, template (client
+    ou par défaut, avec les prompts des parties), titre, modèle et paramètres de
+    génération. Modifier l'un d'eux produit une nouvelle clé, donc un nouveau compte rendu.
+    """
+    prompts = client_template or DEFAULT_SUMMARY_TEMPLATE
+    return result_key(
+        content_hash(transcript_text),
+        content_hash("\n".join((prompts, TRANSCRIPT_INTRO, NOTES_INTRO, CHUNK_NOTES_PROMPT, NOTES_MERGE_PROMPT))),
+        meeting_title,
+        MISTRAL_MODEL,
+        SUMMARY_TEMPERATURE,
+        [SUMMARY_MAX_TOKENS, NOTES_MAX_TOKENS, settings.SUMMARY_SINGLE_PASS_TOKENS, settings.SUMMARY_CHUNK_TOKENS]
+    )
+
+def format_timings(timings: Dict[str, Any]) -> str:
+    """Résumé lisible des durées de summarize_transcript"""
+    if timings.get("chunks", 1) == 1:
+        return f"~{timings['tokens']} tokens, appel unique {timings['total']:.1f}s"
+    return (
+        f"~{timings['tokens']} tokens, {timings['chunks']} parties : découpage {timings['split'] * 1000:.0f} ms, "
+        f"map {timings['map']:.1f}s, fusion {timings['merge']:.1f}s ({timings['merge_levels']} niveau(x)), "
+        f"reduce {timings['reduce']:.1f}s, total {timings['total']:.1f}s"
+    )
+
+def get_client_template(client_id: Optional[str] = None, user_id: Optional[str] = None) -> Optional[str]:
+    """
+    Récupère le template de résumé associé à un client.
+    
+    Args:
+        client_id: ID du client (optionnel)
+        user_id: ID de l'utilisateur propriétaire du client (optionnel)
         
-        payload = {
-            "model": "mistral-large-latest",  # Utiliser le modèle le plus récent et le plus performant
-            "messages": [
-                {"role": "user", "content": prompt}
-            ],
-            "temperature": 0.3,  # Température basse pour des résultats plus cohérents
-            "max_tokens": 4000  # Limite de tokens pour la réponse
-        }
+    Returns:
+        str: Template de résumé ou None si aucun template n'est trouvé
+    """
+    if not client_id or not user_id:
+        return None
         
-        # Envoyer la requête à l'API Mistral
-        logger.info("Envoi de la requête à l'API Mistral pour générer un compte rendu")
-        response = requests.post(MISTRAL_API_URL, headers=headers, json=payload)
+    try:
+        # Importer les fonctions ici pour éviter les imports circulaires
+        from ..db.client_queries import get_client
         
-        # Vérifier la réponse
-        if response.status_code == 200:
-            response_data = response.json()
-            summary = response_data.get("choices", [{}])[0].get("message", {}).get("content", "")
-            
-            if summary:
-                logger.info("Compte rendu généré avec succès par l'API Mistral")
-                return summary
-            else:
-                logger.error("La réponse de l'API Mistral ne contient pas de contenu")
-                return None
+        # Récupérer les informations du client
+        client = get_client(client_id, user_id)
+        
+        if client and client.get("summary_template"):
+            logger.info(f"Template de résumé trouvé pour le client {client_id}")
+            return client["summary_template"]
         else:
-            logger.error(f"Erreur lors de l'appel à l'API Mistral: {response.status_code} - {response.text}")
+            logger.info(f"Aucun template de résumé trouvé pour le client {client_id}")
             return None
+    except Exception as e:
+        logger.error(f"Erreur lors de la récupération du template client: {str(e)}")
+        return None
+
+def generate_meeting_summary(transcript_text: str, meeting_title: Optional[str] = None, client_id: Optional[str] = None, user_id: Optional[str] = None, raise_errors: bool = False) -> Optional[str]:
+    """
+    Génère un compte rendu de réunion à partir d'une transcription en utilisant l'API Mistral.
+    
+    Les transcriptions longues sont résumées par parties en parallèle, puis le
+    compte rendu est rédigé à partir des notes (voir summarize_transcript).
+    Un compte rendu déjà généré pour les mêmes entrées est resservi depuis le
+    cache des résultats (voir summary_cache_key).
+    
+    Args:
+        transcript_text: Texte de la transcription de la réunion
+        meeting_title: Titre de la réunion (optionnel)
+        client_id: ID du client pour personnaliser le résumé (optionnel)
+        user_id: ID de l'utilisateur qui demande le résumé (optionnel)
+        raise_errors: Si True, lève MistralAPIError au lieu de retourner None
+        
+    Returns:
+        str: Compte rendu généré ou None en cas d'erreur
+    """
+    try:
+        if not MISTRAL_API_KEY:
+            raise MistralAPIError("Clé API Mistral non configurée", retryable=False)
+        
+        # Vérifier s'il existe un template client personnalisé
+        client_template = None
+        if client_id and user_id:
+            client_template = get_client_template(client_id, user_id)
+        if client_template:
+            logger.info("Utilisation d'un template client personnalisé")
+        
+        # Même transcription, template, titre et paramètres : compte rendu déjà facturé
+        cache_key = summary_cache_key(transcript_text, meeting_title, client_template)
+        cached = get_result(SUMMARY_RESULT, cache_key)
+        if cached:
+            logger.info("Compte rendu servi depuis le cache des résultats")
+            return cached["summary"]
+        
+        summary, timings = summarize_transcript(transcript_text, meeting_title, client_template)
+        logger.info(f"Compte rendu généré avec succès par l'API Mistral ({format_timings(timings)})")
+        store_result(SUMMARY_RESULT, cache_key, {"summary": summary})
+        return summary
             
     except Exception as e:
         logger.error(f"Erreur lors de la génération du compte rendu: {str(e)}")
+        if raise_errors:
+            raise
         return None
 
+def generate_summary_for_meeting(meeting: Dict[str, Any], user_id: str, client_id: Optional[str] = None) -> str:
+    """
+    Génère le compte rendu d'une réunion dont la transcription est terminée et l'enregistre.
+    
+    Args:
+        meeting: Réunion (avec transcript_text)
+        user_id: Identifiant de l'utilisateur
+        client_id: Client dont le template personnalise le compte rendu (par défaut celui de la réunion)
+    
+    Raises:
+        MistralAPIError: si l'appel à Mistral a échoué (voir retryable)
+    """
+    from ..db.queries import update_meeting
+    from ..services.transcript_render import render_transcript
+    
+    meeting_id = meeting["id"]
+    # Appliquer les noms personnalisés des locuteurs (rendu, sans réécrire la transcription)
+    formatted_transcript = render_transcript(meeting, user_id) or meeting["transcript_text"]
+    
+    logger.info(f"Génération du compte rendu pour la réunion {meeting_id}")
+    summary_text = generate_meeting_summary(
+        formatted_transcript,
+        meeting.get("title", "Réunion"),
+        client_id or meeting.get("client_id"),
+        user_id,
+        raise_errors=True
+    )
+    update_meeting(meeting_id, user_id, {
+        "summary_text": summary_text,
+        "summary_status": "completed"
+    })
+    logger.info(f"Compte rendu généré avec succès pour la réunion {meeting_id}")
+    return summary_text
+
 def process_meeting_summary(meeting_id: str, user_id: str, client_id: Optional[str] = None, async_mode: bool = False):
     """
     Traite la génération du compte rendu pour une réunion spécifique.
@@ -202,13 +511,13 @@ def process_meeting_summary(meeting_id: str, user_id: str, client_id: Optional[s
         meeting_id: Identifiant de la réunion
         user_id: Identifiant de l'utilisateur
         client_id: Identifiant du client pour personnaliser le résumé (optionnel)
-        async_mode: Si True, retourne immédiatement après avoir mis à jour le statut (pour API)
+        async_mode: Si True, ajoute la génération à la file de tâches (pool "summarize")
+            et retourne immédiatement après avoir mis à jour le statut (pour API)
     
     Returns:
-        bool: True si le traitement a réussi, False sinon
+        bool: True si le traitement a réussi (ou a été planifié), False sinon
     """
-    from ..db.queries import get_meeting, update_meeting, get_meeting_speakers
-    from ..services.transcription_checker import get_assemblyai_transcript_details, replace_speaker_names_in_text
+    from ..db.queries import get_meeting, update_meeting
     
     try:
         # Récupérer les données de la réunion
@@ -218,51 +527,21 @@ def process_meeting_summary(meeting_id: str, user_id: str, client_id: Optional[s
             return False
         
         # Vérifier que nous avons une transcription
-        transcript_text = meeting.get("transcript_text")
-        if not transcript_text:
+        if not meeting.get("transcript_text"):
             logger.error(f"Aucune transcription disponible pour la réunion {meeting_id}")
             return False
         
-        # Récupérer les noms personnalisés des locuteurs
-        speakers_data = get_meeting_speakers(meeting_id, user_id)
-        speaker_names = {}
-        if speakers_data:
-            for speaker in speakers_data:
-                speaker_names[speaker['speaker_id']] = speaker['custom_name']
-            logger.info(f"Noms personnalisés des locuteurs récupérés: {speaker_names}")
-        
-        # Utiliser la transcription avec les noms personnalisés si disponibles
-        if speaker_names:
-            formatted_transcript = replace_speaker_names_in_text(transcript_text, speaker_names)
-            logger.info("Transcription formatée avec les noms personnalisés")
-        else:
-            formatted_transcript = transcript_text
-            logger.info("Aucun nom personnalisé trouvé, utilisation de la transcription originale")
-        
         # Mettre à jour le statut en "processing"
         update_meeting(meeting_id, user_id, {"summary_status": "processing"})
         
         if async_mode:
-            logger.info(f"Mode asynchrone activé pour la réunion {meeting_id}, statut mis à jour")
+            from .queue_processor import enqueue_summary
+            enqueue_summary(meeting_id, user_id, client_id)
+            logger.info(f"Génération du compte rendu planifiée pour la réunion {meeting_id}")
             return True
         
-        # Générer le compte rendu avec la transcription formatée
-        logger.info(f"Génération du compte rendu pour la réunion {meeting_id}")
-        summary_text = generate_meeting_summary(formatted_transcript, meeting.get("title", "Réunion"), client_id)
-        
-        if summary_text:
-            # Mettre à jour la base de données avec le compte rendu
-            update_meeting(meeting_id, user_id, {
-                "summary_text": summary_text,
-                "summary_status": "completed"
-            })
-            logger.info(f"Compte rendu généré avec succès pour la réunion {meeting_id}")
-            return True
-        else:
-            # Marquer comme erreur
-            update_meeting(meeting_id, user_id, {"summary_status": "error"})
-            logger.error(f"Échec de la génération du compte rendu pour la réunion {meeting_id}")
-            return False
+        generate_summary_for_meeting(meeting, user_id, client_id)
+        return True
     
     except Exception as e:
         logger.error(f"Erreur lors du traitement du compte rendu pour la réunion {meeting_id}: {str(e)}")
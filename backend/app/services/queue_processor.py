@@ -1,33 +1,418 @@
 """
-Module pour le traitement des transcriptions en file d'attente.
+Module pour le traitement des tâches en file d'attente (conversions, transcriptions, comptes rendus).
 Fournit un service autonome qui s'exécute en arrière-plan au sein de l'application FastAPI.
+
+Les tâches sont stockées dans la table jobs (voir db/job_queries.py) : chaque
+instance de l'API réclame des lots de tâches avec un bail, si bien qu'une tâche
+n'est exécutée que par une seule instance et qu'elle est reprise si l'instance
+s'arrête en cours de route. Le bail d'une tâche en cours est renouvelé par un
+heartbeat (job_lease_heartbeat), quelle que soit sa durée. Les balayages périodiques (réconciliation, purge)
+ne tournent que dans l'instance qui détient leur bail (voir leases.py).
 """
 
 import os
 import json
 import logging
 import asyncio
+import socket
 import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from ..core.config import settings
-from ..db.queries import get_meeting, update_meeting
-from .assemblyai import process_transcription
+from ..db.queries import get_meeting, iter_meetings_by_status, update_meeting
+from ..db.cache_queries import purge_idle_results
+from ..db.firebase import delete_partial_upload, purge_orphan_partial_uploads
+from ..db.upload_queries import get_upload_session_ids, purge_stale_upload_sessions
+from ..db.job_queries import (
+    claim_jobs, complete_job, enqueue_job, extend_job_lease, fail_job, purge_finished_jobs, release_job
+)
+from .assemblyai import handle_transcript_webhook, process_transcription
+from .conversion import CONVERSION_JOB, conversion_stage, mark_conversion_failed
+from .executors import ExecutorFullError, executors, shutdown_executors
+from .job_context import JobCancelled, running_job
+from .leases import PERIODIC_SWEEPS_LEASE, Lease
 from fastapi.logger import logger
 
+# Identifiant du worker, enregistré comme détenteur du bail des tâches qu'il réclame
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# Délai avant de retraiter une notification AssemblyAI arrivée avant l'ID de sa transcription
+WEBHOOK_RETRY_DELAY_SECONDS = 15
+
+# Intervalle entre deux purges des tâches terminées, du cache des résultats et des uploads abandonnés
+PURGE_INTERVAL_SECONDS = 3600
+
+def transcription_dedupe_key(meeting_id):
+    return f"transcription:{meeting_id}"
+
+def enqueue_transcription(meeting_id, file_url, user_id, delay_seconds=0):
+    """Ajoute la transcription d'une réunion à la file (une seule tâche active par réunion)"""
+    job = enqueue_job(
+        "transcription",
+        {"meeting_id": meeting_id, "file_url": file_url, "user_id": user_id},
+        dedupe_key=transcription_dedupe_key(meeting_id),
+        delay_seconds=delay_seconds
+    )
+    queue_processor.notify()
+    return job
+
+def conversion_dedupe_key(meeting_id):
+    return f"conversion:{meeting_id}"
+
+def enqueue_conversion(meeting_id, user_id, source_path):
+    """Ajoute la conversion audio d'une réunion à la file (une seule tâche active par réunion)"""
+    job = enqueue_job(
+        CONVERSION_JOB,
+        {"meeting_id": meeting_id, "user_id": user_id, "source_path": source_path},
+        dedupe_key=conversion_dedupe_key(meeting_id)
+    )
+    queue_processor.notify()
+    return job
+
+def enqueue_transcription_poll(meeting_id, transcript_id, user_id, check=1, max_checks=20, interval_seconds=30):
+    """
+    Planifie une vérification du statut d'une transcription dans interval_seconds.
+    Sans webhook, chaque vérification replanifie la suivante tant que la
+    transcription est en cours (au plus max_checks vérifications).
+    """
+    return enqueue_job(
+        "transcription_poll",
+        {
+            "meeting_id": meeting_id,
+            "transcript_id": transcript_id,
+            "user_id": user_id,
+            "check": check,
+            "max_checks": max_checks,
+            "interval_seconds": interval_seconds
+        },
+        delay_seconds=interval_seconds
+    )
+
+def enqueue_transcript_webhook(transcript_id, status):
+    """
+    Replanifie une notification AssemblyAI reçue avant l'enregistrement de l'ID de
+    transcription dans sa réunion (une seule tâche active par transcription).
+    """
+    job = enqueue_job(
+        "transcript_webhook",
+        {"transcript_id": transcript_id, "status": status},
+        dedupe_key=f"transcript_webhook:{transcript_id}",
+        delay_seconds=WEBHOOK_RETRY_DELAY_SECONDS
+    )
+    queue_processor.notify()
+    return job
+
+def summary_dedupe_key(meeting_id):
+    return f"summary:{meeting_id}"
+
+def enqueue_summary(meeting_id, user_id, client_id=None):
+    """
+    Ajoute la génération du compte rendu d'une réunion à la file (une seule tâche
+    active par réunion). Sans client_id, le template du client de la réunion est utilisé.
+    """
+    job = enqueue_job(
+        "summary",
+        {"meeting_id": meeting_id, "user_id": user_id, "client_id": client_id},
+        dedupe_key=summary_dedupe_key(meeting_id)
+    )
+    queue_processor.notify()
+    return job
+
+def requeue_stuck_summaries():
+    """
+    Replanifie les comptes rendus restés en statut 'processing' sans tâche active
+    (demandés avant la file de tâches, ou tâche perdue). La déduplication évite
+    de planifier deux fois un compte rendu déjà en file.
+    """
+    queued = 0
+    for meeting in iter_meetings_by_status("processing", status_column="summary_status"):
+        if meeting.get("transcript_status") != "completed":
+            continue
+        enqueue_summary(meeting["id"], meeting["user_id"])
+        queued += 1
+    if queued:
+        logger.info(f"{queued} compte(s) rendu(s) en 'processing' remis en file")
+    return queued
+
+def handle_conversion_job(payload):
+    """Convertit l'audio d'une réunion encore à l'état 'converting'"""
+    meeting_id = payload["meeting_id"]
+    user_id = payload["user_id"]
+    
+    meeting = get_meeting(meeting_id, user_id)
+    if not meeting:
+        logger.warning(f"La réunion {meeting_id} n'existe plus, tâche de conversion ignorée")
+        return
+    if meeting.get("transcript_status") != "converting":
+        logger.info(f"Conversion déjà effectuée pour la réunion {meeting_id} (statut: {meeting.get('transcript_status')})")
+        return
+    
+    # Fichier rejeté par ffprobe : réunion en erreur ; les autres échecs sont retentés
+    conversion_stage.run(meeting_id, user_id, payload["source_path"])
+
+def handle_transcription_job(payload):
+    """
+    Soumet l'audio d'une réunion à AssemblyAI.
+
+    Lève une exception si la soumission a échoué, pour que la tâche soit retentée.
+    """
+    meeting_id = payload["meeting_id"]
+    user_id = payload["user_id"]
+    
+    # Vérifier que la réunion existe et que la transcription n'a pas déjà été soumise
+    meeting = get_meeting(meeting_id, user_id)
+    if not meeting:
+        logger.warning(f"La réunion {meeting_id} n'existe plus, tâche de transcription ignorée")
+        return
+    status = meeting.get("transcript_status")
+    if status == "completed" or (status == "processing" and meeting.get("transcript_id")):
+        logger.info(f"Transcription déjà soumise pour la réunion {meeting_id} (statut: {status})")
+        return
+    
+    process_transcription(meeting_id, payload["file_url"], user_id)
+    
+    # process_transcription enregistre ses erreurs dans la réunion sans les lever
+    meeting = get_meeting(meeting_id, user_id)
+    if meeting and meeting.get("transcript_status") == "error":
+        raise RuntimeError(meeting.get("transcript_text") or "Échec de la transcription")
+
+def handle_transcription_poll_job(payload):
+    """Vérifie une fois le statut d'une transcription auprès d'AssemblyAI"""
+    from .transcription_checker import check_and_update_transcription
+    
+    meeting_id = payload["meeting_id"]
+    meeting = get_meeting(meeting_id, payload["user_id"])
+    if not meeting:
+        logger.warning(f"Réunion {meeting_id} non trouvée, arrêt des vérifications")
+        return
+    if meeting.get("transcript_status") in ("completed", "error"):
+        return
+    
+    logger.info(f"Vérification {payload['check']}/{payload['max_checks']} de la transcription {payload['transcript_id']}")
+    meeting = check_and_update_transcription(meeting)
+    if meeting.get("transcript_status") == "processing" and payload["check"] < payload["max_checks"]:
+        enqueue_transcription_poll(
+            meeting_id, payload["transcript_id"], payload["user_id"],
+            check=payload["check"] + 1,
+            max_checks=payload["max_checks"],
+            interval_seconds=payload["interval_seconds"]
+        )
+
+def handle_transcript_webhook_job(payload):
+    """
+    Retraite une notification AssemblyAI replanifiée ; si la réunion est toujours
+    inconnue, l'exception fait retenter la tâche avec backoff.
+    """
+    handle_transcript_webhook(payload["transcript_id"], payload.get("status"), defer_unknown=False)
+
+def handle_summary_job(payload):
+    """
+    Génère le compte rendu d'une réunion avec Mistral.
+
+    Les erreurs temporaires (réseau, 429, 5xx) sont levées pour que la tâche soit
+    retentée avec backoff ; les autres marquent le compte rendu en erreur.
+    """
+    from .mistral_summary import MistralAPIError, generate_summary_for_meeting
+    
+    meeting_id = payload["meeting_id"]
+    user_id = payload["user_id"]
+    
+    meeting = get_meeting(meeting_id, user_id)
+    if not meeting:
+        logger.warning(f"La réunion {meeting_id} n'existe plus, tâche de compte rendu ignorée")
+        return
+    if meeting.get("summary_status") == "completed":
+        logger.info(f"Compte rendu déjà généré pour la réunion {meeting_id}")
+        return
+    if not meeting.get("transcript_text"):
+        logger.error(f"Aucune transcription disponible pour la réunion {meeting_id}")
+        update_meeting(meeting_id, user_id, {"summary_status": "error"})
+        return
+    
+    try:
+        generate_summary_for_meeting(meeting, user_id, payload.get("client_id"))
+    except MistralAPIError as e:
+        if e.retryable:
+            raise
+        update_meeting(meeting_id, user_id, {"summary_status": "error"})
+
+def mark_conversion_job_failed(payload):
+    """Réunion en erreur lorsque toutes les tentatives de conversion ont échoué"""
+    mark_conversion_failed(
+        payload["meeting_id"], payload["user_id"], "la conversion a échoué après plusieurs tentatives"
+    )
+
+def mark_summary_failed(payload):
+    """Compte rendu en erreur lorsque toutes les tentatives ont échoué"""
+    update_meeting(payload["meeting_id"], payload["user_id"], {"summary_status": "error"})
+
+# Fonctions exécutant chaque type de tâche, avec le payload de la tâche
+JOB_HANDLERS = {
+    CONVERSION_JOB: handle_conversion_job,
+    "transcription": handle_transcription_job,
+    "transcription_poll": handle_transcription_poll_job,
+    "transcript_webhook": handle_transcript_webhook_job,
+    "summary": handle_summary_job,
+}
+
+# Fonctions appelées avec le payload lorsqu'une tâche est abandonnée (dead)
+JOB_DEAD_HANDLERS = {
+    CONVERSION_JOB: mark_conversion_job_failed,
+    "summary": mark_summary_failed,
+}
+
+# Pool (voir executors.py) dans lequel s'exécute chaque type de tâche
+JOB_POOLS = {
+    CONVERSION_JOB: "convert",
+    "transcription": "upload",
+    "transcription_poll": "poll",
+    "transcript_webhook": "poll",
+    "summary": "summarize",
+}
+
+def purge_stale_uploads(older_than_seconds=None):
+    """
+    Supprimer les sessions d'upload reprenable sans activité depuis
+    UPLOAD_SESSION_TTL_HOURS et leur fichier partiel, ainsi que les fichiers
+    partiels restés sans session. Retourne le nombre de sessions supprimées.
+    """
+    if older_than_seconds is None:
+        older_than_seconds = settings.UPLOAD_SESSION_TTL_HOURS * 3600
+    purged = purge_stale_upload_sessions(older_than_seconds)
+    for upload_id in purged:
+        delete_partial_upload(upload_id)
+    orphans = purge_orphan_partial_uploads(get_upload_session_ids(), older_than_seconds)
+    if orphans:
+        logger.info(f"{orphans} fichier(s) partiel(s) sans session supprimé(s)")
+    return len(purged)
+
+@contextmanager
+def job_lease_heartbeat(job_id, worker_id, lease_seconds=None):
+    """
+    Renouvelle le bail de la tâche au tiers de sa durée tant que le bloc s'exécute,
+    pour qu'une tâche plus longue que JOB_LEASE_SECONDS ne soit pas reprise par une
+    autre instance. Produit l'événement d'annulation, positionné si le bail est perdu.
+    """
+    lease_seconds = lease_seconds or settings.JOB_LEASE_SECONDS
+    stop = threading.Event()
+    cancelled = threading.Event()
+    
+    def heartbeat():
+        while not stop.wait(lease_seconds / 3):
+            try:
+                renewed = extend_job_lease(job_id, worker_id, lease_seconds)
+            except Exception as e:
+                # Erreur passagère : nouvel essai au prochain renouvellement, avant l'expiration
+                logger.error(f"Erreur lors du renouvellement du bail de la tâche {job_id}: {str(e)}")
+                continue
+            if not renewed:
+                logger.warning(f"Bail perdu pour la tâche {job_id}, annulation de son exécution")
+                cancelled.set()
+                return
+    
+    thread = threading.Thread(target=heartbeat, name=f"job-heartbeat-{job_id[:8]}", daemon=True)
+    thread.start()
+    try:
+        yield cancelled
+    finally:
+        stop.set()
+        thread.join()
+
+def run_job(job, worker_id=WORKER_ID):
+    """Exécute une tâche réclamée puis enregistre son résultat (terminée ou à retenter)"""
+    handler = JOB_HANDLERS.get(job["type"])
+    try:
+        if handler is None:
+            raise ValueError(f"Type de tâche inconnu: {job['type']}")
+        logger.info(f"Exécution de la tâche {job['type']} {job['id']} (tentative {job['attempts']}/{job['max_attempts']})")
+        with job_lease_heartbeat(job["id"], worker_id) as cancelled, running_job(job["id"], cancelled):
+            handler(job["payload"])
+    except JobCancelled as e:
+        # La tâche appartient désormais à une autre instance : ne pas enregistrer de résultat
+        logger.warning(str(e))
+        return False
+    except Exception as e:
+        logger.error(f"Erreur lors de la tâche {job['type']} {job['id']}: {str(e)}")
+        # Délai demandé par l'API appelée (limite de débit), respecté avant la tentative suivante
+        state = fail_job(job["id"], worker_id, e, retry_after=getattr(e, "retry_after", None))
+        on_dead = JOB_DEAD_HANDLERS.get(job["type"])
+        if state == "dead" and on_dead:
+            try:
+                on_dead(job["payload"])
+            except Exception as hook_error:
+                logger.error(f"Erreur après l'abandon de la tâche {job['id']}: {str(hook_error)}")
+        return False
+    if not complete_job(job["id"], worker_id):
+        logger.warning(f"Bail perdu pour la tâche {job['id']} avant la fin de son exécution")
+    return True
+
+def import_legacy_queue_files():
+    """
+    Transfère dans la table jobs les fichiers JSON de l'ancienne file d'attente
+    (répertoire queue/ à côté des uploads), puis les supprime.
+    """
+    queue_dir = os.path.join(settings.UPLOADS_DIR.parent, "queue")
+    if not os.path.isdir(queue_dir):
+        return 0
+    
+    imported = 0
+    for queue_file in [f for f in os.listdir(queue_dir) if f.endswith('.json')]:
+        queue_file_path = os.path.join(queue_dir, queue_file)
+        try:
+            with open(queue_file_path, 'r') as f:
+                data = json.load(f)
+            
+            meeting_id = data.get('meeting_id')
+            file_url = data.get('file_url')
+            user_id = data.get('user_id')
+            created_at = data.get('created_at')
+            
+            # Si le fichier a plus de 24h, considérer qu'il est obsolète
+            if created_at and datetime.now() - datetime.fromisoformat(created_at) > timedelta(hours=24):
+                logger.warning(f"Fichier de queue obsolète (>24h): {queue_file}")
+            elif not all([meeting_id, file_url, user_id]):
+                logger.error(f"Données incomplètes dans le fichier de queue: {queue_file}")
+                continue
+            else:
+                enqueue_transcription(meeting_id, file_url, user_id)
+                imported += 1
+            os.remove(queue_file_path)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'import du fichier de queue {queue_file}: {str(e)}")
+    
+    if imported:
+        logger.info(f"{imported} fichier(s) de l'ancienne file d'attente importé(s) dans la table jobs")
+    return imported
+
 class QueueProcessor:
     """
-    Gestionnaire de file d'attente pour les transcriptions audio.
-    S'exécute en arrière-plan et traite périodiquement les fichiers de queue.
+    Worker de la file de tâches persistante (table jobs).
+    S'exécute en arrière-plan, réclame périodiquement des tâches exécutables et les
+    exécute dans le pool borné de leur type : il ne réclame jamais plus de tâches
+    que le pool n'a de workers libres, les autres restent dans la table.
     """
     
-    def __init__(self, interval_seconds=10):
+    def __init__(self, interval_seconds=None, reconcile_interval_seconds=None):
         """
         Initialise le processeur de file d'attente.
         
         Args:
-            interval_seconds (int): Intervalle entre chaque traitement de la file d'attente
+            interval_seconds (int): Intervalle entre deux réclamations de tâches
+            reconcile_interval_seconds (int): Intervalle entre deux vérifications des transcriptions
+                en cours auprès d'AssemblyAI (TRANSCRIPTION_RECONCILE_INTERVAL par défaut). Ce balayage
+                ne sert qu'à rattraper les notifications perdues : sans webhooks, le suivi de chaque
+                transcription est assuré par ses tâches "transcription_poll".
         """
-        self.interval = interval_seconds
+        self.interval = interval_seconds or settings.JOB_POLL_INTERVAL
+        self.reconcile_interval = reconcile_interval_seconds or settings.TRANSCRIPTION_RECONCILE_INTERVAL
+        self._last_reconcile = 0.0
+        self._last_purge = 0.0
+        self._reconcile_future = None
+        # Bail des balayages périodiques, partagé avec les autres instances et les scripts
+        self.sweeps_lease = Lease(PERIODIC_SWEEPS_LEASE, owner=WORKER_ID)
+        self._loop = None
+        self._wakeup = None
         self.is_running = False
         self.task = None
         self.lock = threading.Lock()
@@ -40,15 +425,25 @@ class QueueProcessor:
                 return
             
             self.is_running = True
-            logger.info(f"Démarrage du processeur de file d'attente (intervalle: {self.interval}s)")
-            self.task = asyncio.create_task(self._run_processor())
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+            logger.info(f"Démarrage du processeur de file d'attente (intervalle: {self.interval}s, worker: {WORKER_ID})")
             
-            # Traiter la file d'attente immédiatement au démarrage
-            await asyncio.to_thread(self._process_queue)
+            if await asyncio.to_thread(self.sweeps_lease.ensure):
+                # Reprendre les fichiers de l'ancienne file d'attente et les comptes rendus
+                # restés en 'processing' (jamais générés par l'ancien mode asynchrone)
+                await asyncio.to_thread(import_legacy_queue_files)
+                await asyncio.to_thread(requeue_stuck_summaries)
+                
+                # Vérifier les transcriptions en cours au démarrage
+                logger.info("Vérification des transcriptions en cours au démarrage")
+                self._last_reconcile = time.monotonic()
+                await asyncio.to_thread(self._check_pending_transcriptions)
+            else:
+                logger.info("Balayages périodiques assurés par une autre instance")
             
-            # Vérifier les transcriptions en cours au démarrage
-            logger.info("Vérification des transcriptions en cours au démarrage")
-            await asyncio.to_thread(self._check_pending_transcriptions)
+            # Première réclamation de tâches immédiatement, puis périodiquement
+            self.task = asyncio.create_task(self._run_processor())
     
     async def stop(self):
         """Arrête le processeur de file d'attente"""
@@ -66,135 +461,107 @@ class QueueProcessor:
                 except asyncio.CancelledError:
                     pass
                 self.task = None
+            self._loop = None
+    
+    def notify(self):
+        """Réveille le processeur pour réclamer des tâches sans attendre l'intervalle (appelable depuis un thread)"""
+        loop = self._loop
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:
+                # Boucle d'événements déjà fermée
+                pass
     
     async def _run_processor(self):
         """Exécute le processeur de file d'attente en boucle"""
         while self.is_running:
             try:
-                logger.info("Traitement périodique de la file d'attente de transcription")
-                self._process_queue()
+                await asyncio.to_thread(self._process_queue)
                 
-                # Vérifier les transcriptions en cours à chaque itération (toutes les 10 secondes)
-                logger.info("Vérification périodique des transcriptions en cours")
-                self._check_pending_transcriptions()
+                # Balayages périodiques : seulement dans l'instance qui détient le bail
+                if await asyncio.to_thread(self.sweeps_lease.ensure):
+                    # Vérifier les transcriptions en cours (réconciliation si les webhooks sont actifs)
+                    if time.monotonic() - self._last_reconcile >= self.reconcile_interval:
+                        logger.info("Vérification périodique des transcriptions en cours")
+                        self._last_reconcile = time.monotonic()
+                        self._check_pending_transcriptions()
+                    
+                    if time.monotonic() - self._last_purge >= PURGE_INTERVAL_SECONDS:
+                        self._last_purge = time.monotonic()
+                        purged = await asyncio.to_thread(purge_finished_jobs)
+                        if purged:
+                            logger.info(f"{purged} tâche(s) terminée(s) supprimée(s) de la file")
+                        purged = await asyncio.to_thread(purge_idle_results)
+                        if purged:
+                            logger.info(f"{purged} résultat(s) inutilisé(s) supprimé(s) du cache")
+                        purged = await asyncio.to_thread(purge_stale_uploads)
+                        if purged:
+                            logger.info(f"{purged} session(s) d'upload abandonnée(s) supprimée(s)")
             except Exception as e:
                 logger.error(f"Erreur lors du traitement de la file d'attente: {str(e)}")
                 import traceback
                 logger.error(traceback.format_exc())
             
-            await asyncio.sleep(self.interval)
+            # Attendre l'intervalle (borné pour renouveler le bail à temps),
+            # ou une nouvelle tâche / un worker libéré
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=min(self.interval, self.sweeps_lease.renew_interval)
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
     
     def _process_queue(self):
-        """Traite tous les fichiers dans le répertoire de queue"""
-        queue_dir = os.path.join(settings.UPLOADS_DIR.parent, "queue")
-        
-        if not os.path.exists(queue_dir):
-            logger.info(f"Le répertoire de queue n'existe pas encore: {queue_dir}")
-            os.makedirs(queue_dir, exist_ok=True)
-            logger.info(f"Répertoire de queue créé: {queue_dir}")
-            return
-        
-        queue_files = [f for f in os.listdir(queue_dir) if f.endswith('.json')]
-        if queue_files:
-            logger.info(f"Traitement de {len(queue_files)} fichiers dans la queue")
+        """Réclame, pour chaque pool, autant de tâches exécutables qu'il a de workers libres"""
+        pools = {}
+        for job_type, pool_name in JOB_POOLS.items():
+            pools.setdefault(pool_name, []).append(job_type)
         
-        for queue_file in queue_files:
-            try:
-                queue_file_path = os.path.join(queue_dir, queue_file)
-                
-                # Lire les données du fichier
-                with open(queue_file_path, 'r') as f:
-                    data = json.load(f)
-                
-                meeting_id = data.get('meeting_id')
-                file_url = data.get('file_url')
-                user_id = data.get('user_id')
-                created_at = data.get('created_at')
-                
-                # Vérifier l'ancienneté du fichier
-                if created_at:
-                    created_datetime = datetime.fromisoformat(created_at)
-                    age = datetime.now() - created_datetime
-                    # Si le fichier a plus de 24h, considérer qu'il est obsolète
-                    if age > timedelta(hours=24):
-                        logger.warning(f"Fichier de queue obsolète (>24h): {queue_file}")
-                        os.remove(queue_file_path)
-                        continue
-                
-                if not all([meeting_id, file_url, user_id]):
-                    logger.error(f"Données incomplètes dans le fichier de queue: {queue_file}")
-                    continue
-                
-                # Vérifier que la réunion existe et qu'elle est toujours en attente/processing
-                meeting = get_meeting(meeting_id, user_id)
-                if not meeting:
-                    logger.warning(f"La réunion {meeting_id} n'existe plus, suppression du fichier de queue")
-                    os.remove(queue_file_path)
-                    continue
-                
-                status = meeting.get('transcript_status')
-                if status not in ['pending', 'processing']:
-                    logger.info(f"La réunion {meeting_id} a déjà le statut {status}, pas besoin de retraitement")
-                    os.remove(queue_file_path)
-                    continue
-                
-                logger.info(f"Traitement de la transcription pour la réunion {meeting_id} (statut actuel: {status})")
-                
-                # Mettre à jour le statut en "processing" si nécessaire
-                if status == 'pending':
-                    update_meeting(meeting_id, user_id, {"transcript_status": "processing"})
-                
-                # Traiter la transcription dans un thread séparé pour ne pas bloquer la boucle principale
-                thread = threading.Thread(
-                    target=self.process_transcription_wrapper,
-                    args=(meeting_id, file_url, user_id, queue_file_path)
-                )
-                thread.daemon = True
-                thread.start()
-                logger.info(f"Thread de transcription lancé pour {meeting_id}")
-                
-            except Exception as e:
-                logger.error(f"Erreur lors du traitement du fichier {queue_file}: {str(e)}")
-                import traceback
-                logger.error(traceback.format_exc())
+        claimed = 0
+        for pool_name, job_types in pools.items():
+            executor = executors[pool_name]
+            limit = min(executor.idle_workers, settings.JOB_BATCH_SIZE)
+            if limit <= 0 or not self.is_running:
+                continue
+            jobs = claim_jobs(WORKER_ID, limit, job_types=job_types)
+            for job in jobs:
+                try:
+                    executor.submit(self._run_job, job)
+                except ExecutorFullError:
+                    # Pool rempli entre-temps (ou en cours d'arrêt) : rendre la tâche
+                    release_job(job["id"], WORKER_ID)
+            claimed += len(jobs)
+        if claimed:
+            logger.info(f"{claimed} tâche(s) réclamée(s) par {WORKER_ID}")
+        return claimed
+    
+    def _run_job(self, job):
+        try:
+            run_job(job)
+        finally:
+            # Un worker s'est libéré : d'autres tâches peuvent être réclamées
+            self.notify()
     
     def _check_pending_transcriptions(self):
-        """Vérifie et met à jour les transcriptions en cours"""
+        """Vérifie et met à jour les transcriptions en cours (une seule vérification à la fois)"""
+        if self._reconcile_future is not None and not self._reconcile_future.done():
+            logger.info("Vérification des transcriptions en cours déjà lancée")
+            return
         try:
             logger.info("Vérification des transcriptions en cours")
             from .assemblyai import process_pending_transcriptions
             
-            # Utiliser un thread séparé pour ne pas bloquer la boucle principale
-            thread = threading.Thread(
-                target=process_pending_transcriptions
-            )
-            thread.daemon = True
-            thread.start()
-            logger.info("Thread de vérification des transcriptions lancé")
+            # Exécutée dans le pool "poll" pour ne pas bloquer la boucle principale
+            self._reconcile_future = executors["poll"].submit(process_pending_transcriptions)
+        except ExecutorFullError as e:
+            logger.warning(f"Vérification des transcriptions reportée: {str(e)}")
         except Exception as e:
             logger.error(f"Erreur lors de la vérification des transcriptions en cours: {str(e)}")
             import traceback
             logger.error(traceback.format_exc())
     
-    def process_transcription_wrapper(self, meeting_id, file_url, user_id, queue_file_path):
-        """Wrapper pour process_transcription qui supprime le fichier de queue à la fin"""
-        try:
-            logger.info(f"Traitement de la transcription pour {meeting_id}")
-            process_transcription(meeting_id, file_url, user_id)
-            logger.info(f"Transcription terminée pour {meeting_id}")
-        except Exception as e:
-            logger.error(f"Erreur lors de la transcription pour {meeting_id}: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
-        finally:
-            # Supprimer le fichier de queue
-            try:
-                if os.path.exists(queue_file_path):
-                    os.remove(queue_file_path)
-                    logger.info(f"Fichier de queue supprimé: {queue_file_path}")
-            except Exception as e:
-                logger.error(f"Impossible de supprimer le fichier de queue {queue_file_path}: {str(e)}")
-
 # Instance singleton du processeur de file d'attente
 queue_processor = QueueProcessor()
 
@@ -205,5 +572,12 @@ async def start_queue_processor():
 
 # Fonction pour arrêter le processeur
 async def stop_queue_processor():
-    """Arrête le processeur de file d'attente"""
+    """Arrête le processeur de file d'attente puis laisse le travail en cours se terminer"""
     await queue_processor.stop()
+    # Les tâches en cours (conversions comprises, même sans processeur dans ce processus)
+    # se terminent ; les tâches non réclamées restent dans la table
+    await asyncio.to_thread(shutdown_executors, settings.EXECUTOR_DRAIN_TIMEOUT)
+    # Le balayage en cours est terminé : une autre instance peut prendre le relais sans
+    # attendre l'expiration du bail
+    if queue_processor.sweeps_lease.held:
+        await asyncio.to_thread(queue_processor.sweeps_lease.release)
@@ -0,0 +1,228 @@
+"""
+Réconciliation des transcriptions bloquées en état 'processing'.
+
+Les réunions dont la fin de transcription n'a pas été reçue (webhook perdu,
+redémarrage pendant le traitement) sont rapprochées de la liste des
+transcriptions AssemblyAI en un seul passage :
+
+1. la liste des transcriptions est parcourue page par page, une seule fois ;
+2. un index par ID de transcription et par nom de fichier audio est construit ;
+3. toutes les réunions bloquées sont comparées à cet index ;
+4. seules les transcriptions terminées correspondantes sont récupérées en détail,
+   en parallèle avec un nombre de requêtes simultanées borné.
+"""
+
+import logging
+import os
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from ..core.config import settings
+from ..db.queries import get_meetings_by_status, get_pending_transcriptions, update_meeting
+from .assemblyai import TranscriptObject, process_completed_transcript
+from .assemblyai_client import assemblyai_client
+
+logger = logging.getLogger("meeting-transcriber")
+
+# Empêche deux balayages simultanés (démarrage et boucle périodique)
+_sweep_lock = threading.Lock()
+
+
+def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Convertit une date ISO (SQLite ou AssemblyAI) en datetime naïf"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "")[:19].replace(" ", "T"))
+    except ValueError:
+        return None
+
+
+def _extract_transcript_id(meeting: Dict[str, Any]) -> Optional[str]:
+    """ID de transcription de la réunion (colonne dédiée ou ancien format 'ID: xyz' dans le texte)"""
+    if meeting.get("transcript_id"):
+        return meeting["transcript_id"]
+    transcript_text = meeting.get("transcript_text") or ""
+    if "ID:" in transcript_text:
+        return transcript_text.split("ID:")[-1].strip() or None
+    return None
+
+
+def _audio_name(url: Optional[str]) -> str:
+    return os.path.basename(url) if url else ""
+
+
+def list_recent_transcripts(oldest: Optional[datetime] = None,
+                            wanted_ids: Optional[set] = None) -> List[Dict[str, Any]]:
+    """
+    Parcourt la liste des transcriptions AssemblyAI, de la plus récente à la plus ancienne.
+
+    Le parcours s'arrête à la dernière page, après RECONCILE_MAX_PAGES pages, ou dès que
+    les transcriptions listées sont antérieures à `oldest` et que tous les `wanted_ids`
+    ont été vus.
+    """
+    transcripts = []
+    remaining_ids = set(wanted_ids or ())
+    params = {"limit": settings.RECONCILE_PAGE_SIZE}
+
+    for _ in range(settings.RECONCILE_MAX_PAGES):
+        page = assemblyai_client.list_transcripts_sync(**params)
+        items = page.get("transcripts", [])
+        transcripts.extend(items)
+        remaining_ids.difference_update(item.get("id") for item in items)
+
+        if len(items) < settings.RECONCILE_PAGE_SIZE or not page.get("page_details", {}).get("prev_url"):
+            break
+
+        oldest_listed = _parse_datetime(items[-1].get("created"))
+        if oldest and oldest_listed and oldest_listed < oldest and not remaining_ids:
+            break
+
+        params["before_id"] = items[-1]["id"]
+
+    return transcripts
+
+
+def _match_meetings(meetings: List[Dict[str, Any]], transcripts: List[Dict[str, Any]]):
+    """
+    Associe chaque réunion à une entrée de la liste AssemblyAI.
+
+    Returns:
+        Tuple[list, list]: couples (réunion, entrée de liste) trouvés,
+                           et couples (réunion, transcript_id) absents de la liste
+    """
+    by_id = {item["id"]: item for item in transcripts if item.get("id")}
+    by_audio_name = {}
+    for item in transcripts:
+        name = _audio_name(item.get("audio_url"))
+        if name:
+            by_audio_name.setdefault(name, item)
+
+    matched, unlisted = [], []
+    for meeting in meetings:
+        transcript_id = _extract_transcript_id(meeting)
+        if transcript_id:
+            if transcript_id in by_id:
+                matched.append((meeting, by_id[transcript_id]))
+            else:
+                unlisted.append((meeting, transcript_id))
+            continue
+
+        file_name = _audio_name(meeting.get("file_url"))
+        if file_name and file_name in by_audio_name:
+            matched.append((meeting, by_audio_name[file_name]))
+
+    return matched, unlisted
+
+
+def _apply_transcript(meeting: Dict[str, Any], transcript_id: str) -> str:
+    """Récupère une transcription et met à jour la réunion selon son statut"""
+    meeting_id = meeting["id"]
+    user_id = meeting["user_id"]
+
+    transcript_data = assemblyai_client.get_transcript_sync(transcript_id)
+    status = transcript_data.get("status")
+
+    if status == "completed":
+        logger.info(f"Réconciliation: transcription {transcript_id} terminée pour la réunion {meeting_id}")
+        if not meeting.get("transcript_id"):
+            update_meeting(meeting_id, user_id, {"transcript_id": transcript_id})
+        process_completed_transcript(meeting_id, user_id, TranscriptObject(transcript_data))
+    elif status == "error":
+        _mark_error(meeting, transcript_data.get("error"))
+    return status
+
+
+def _mark_error(meeting: Dict[str, Any], error_message: Optional[str]):
+    error_message = error_message or "Unknown error"
+    logger.error(f"Réconciliation: erreur de transcription pour {meeting['id']}: {error_message}")
+    update_meeting(meeting["id"], meeting["user_id"], {
+        "transcript_status": "error",
+        "transcript_text": f"Erreur lors de la transcription: {error_message}"
+    })
+
+
+def reconcile_transcriptions() -> Dict[str, int]:
+    """
+    Rapproche les réunions bloquées en 'processing' des transcriptions AssemblyAI.
+
+    Returns:
+        dict: Statistiques du balayage (réunions examinées, terminées, en erreur, requêtes de détail)
+    """
+    stats = {"meetings": 0, "listed": 0, "completed": 0, "errors": 0, "fetched": 0}
+
+    if not _sweep_lock.acquire(blocking=False):
+        logger.info("Réconciliation déjà en cours, balayage ignoré")
+        return stats
+
+    try:
+        pending_meetings = get_pending_transcriptions()
+        if pending_meetings:
+            # Les réunions 'pending' ne sont pas relancées automatiquement
+            logger.info(f"Transcriptions en attente: {len(pending_meetings)}")
+
+        meetings = get_meetings_by_status("processing")
+        stats["meetings"] = len(meetings)
+        if not meetings:
+            logger.info("Aucune transcription bloquée en état 'processing'")
+            return stats
+
+        if not assemblyai_client.api_key:
+            logger.error("La clé API AssemblyAI n'est pas définie")
+            return stats
+
+        wanted_ids = {tid for tid in (_extract_transcript_id(m) for m in meetings) if tid}
+        created_dates = [d for d in (_parse_datetime(m.get("created_at")) for m in meetings) if d]
+        oldest = min(created_dates) if created_dates else None
+
+        try:
+            transcripts = list_recent_transcripts(oldest, wanted_ids)
+        except Exception as e:
+            logger.error(f"Erreur lors de la récupération de la liste des transcriptions: {str(e)}")
+            transcripts = []
+        stats["listed"] = len(transcripts)
+
+        matched, unlisted = _match_meetings(meetings, transcripts)
+
+        # Décider, à partir de la liste seule, quelles transcriptions doivent être récupérées
+        to_fetch = []
+        for meeting, item in matched:
+            status = item.get("status")
+            if status == "completed":
+                to_fetch.append((meeting, item["id"]))
+            elif status == "error":
+                _mark_error(meeting, item.get("error"))
+                stats["errors"] += 1
+        # Transcriptions connues mais absentes des pages parcourues : vérification individuelle
+        to_fetch.extend(unlisted)
+
+        logger.info(
+            f"Réconciliation: {len(meetings)} réunion(s) bloquée(s), {len(transcripts)} transcription(s) listée(s), "
+            f"{len(matched)} correspondance(s), {len(to_fetch)} récupération(s)"
+        )
+
+        if to_fetch:
+            with ThreadPoolExecutor(max_workers=settings.RECONCILE_CONCURRENCY,
+                                    thread_name_prefix="reconciliation") as executor:
+                futures = [(meeting, executor.submit(_apply_transcript, meeting, tid)) for meeting, tid in to_fetch]
+                for meeting, future in futures:
+                    stats["fetched"] += 1
+                    try:
+                        status = future.result()
+                        if status == "completed":
+                            stats["completed"] += 1
+                        elif status == "error":
+                            stats["errors"] += 1
+                    except Exception as e:
+                        logger.error(f"Erreur lors de la réconciliation de la réunion {meeting['id']}: {str(e)}")
+
+        return stats
+    except Exception as e:
+        logger.error(f"Erreur lors de la réconciliation des transcriptions: {str(e)}")
+        logger.error(traceback.format_exc())
+        return stats
+    finally:
+        _sweep_lock.release()
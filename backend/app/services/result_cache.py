@@ -0,0 +1,65 @@
+"""
+Réutilisation des comptes rendus et transcriptions déjà produits pour le même contenu.
+
+Relancer /meetings/{id}/generate-summary, le balayage des comptes rendus ou
+réimporter le même fichier audio ne rappelle ni Mistral ni AssemblyAI si le
+résultat est en cache (table result_cache, voir db/cache_queries.py). Les clés
+sont des empreintes de tout ce qui détermine le résultat :
+    summary    : transcription rendue, templates, titre, modèle et paramètres de génération
+    transcript : contenu du fichier audio et paramètres de transcription
+
+Le cache ne fait jamais échouer le traitement : une erreur de lecture est un
+défaut de cache, une erreur d'écriture est ignorée (journalisée).
+"""
+
+import hashlib
+import json
+
+from fastapi.logger import logger
+
+from ..core.config import settings
+from ..db.cache_queries import get_cached_result, put_cached_result
+
+SUMMARY_RESULT = "summary"
+TRANSCRIPT_RESULT = "transcript"
+
+
+def content_hash(text: str) -> str:
+    """Empreinte SHA-256 (hexadécimale) d'un texte"""
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def file_sha256(path: str) -> str:
+    """Empreinte SHA-256 d'un fichier, lu par blocs (mémoire bornée)"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(settings.UPLOAD_CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def result_key(*parts) -> str:
+    """Clé de cache : empreinte des éléments qui déterminent le résultat (sérialisables en JSON)"""
+    return content_hash(json.dumps(parts, sort_keys=True, ensure_ascii=False))
+
+
+def get_result(kind: str, key: str):
+    """Résultat en cache, ou None (cache désactivé, absent ou illisible)"""
+    if not settings.RESULT_CACHE_ENABLED:
+        return None
+    try:
+        return get_cached_result(kind, key)
+    except Exception as e:
+        logger.warning(f"Lecture du cache {kind} impossible: {str(e)}")
+        return None
+
+
+def store_result(kind: str, key: str, value):
+    """Mettre un résultat en cache, sans jamais lever d'erreur"""
+    if not settings.RESULT_CACHE_ENABLED:
+        return
+    try:
+        if not put_cached_result(kind, key, value):
+            logger.info(f"Résultat {kind} trop volumineux pour le cache (limite {settings.RESULT_CACHE_MAX_ENTRY_MB} MB)")
+    except Exception as e:
+        logger.warning(f"Écriture dans le cache {kind} impossible: {str(e)}")
@@ -0,0 +1,105 @@
+"""
+Rendu des transcriptions avec les noms personnalisés des locuteurs.
+
+Les transcriptions sont stockées une seule fois avec les identifiants canoniques
+(« Speaker A: ... »). Les noms définis dans meeting_speakers sont appliqués au
+moment de la réponse ; renommer un locuteur n'écrit donc qu'une ligne et
+incrémente meetings.speakers_version.
+
+Les réunions antérieures à ce stockage ont des noms déjà écrits dans
+transcript_text : elles sont rendues depuis la transcription structurée,
+récupérée chez AssemblyAI puis enregistrée localement au premier rendu.
+
+Les rendus sont mis en cache par (réunion, speakers_version) : tant que ni le
+texte ni les noms ne changent, une lecture ne refait aucun formatage.
+"""
+
+import re
+from typing import Dict, Optional
+
+from fastapi.logger import logger
+
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..db.async_queries import run_db
+from ..db.queries import get_meeting_speakers
+from .transcription_checker import format_transcript_text, get_transcript_details
+
+# Préfixe de locuteur canonique en début de ligne
+SPEAKER_LINE_PATTERN = re.compile(r"^Speaker ([A-Za-z0-9]+):", re.MULTILINE)
+
+# La clé change avec le contenu : les rendus n'expirent pas, ils sont évincés (LRU)
+_cache = TTLCache("transcript_render", maxsize=settings.TRANSCRIPT_RENDER_CACHE_SIZE, ttl=None)
+
+
+def get_speaker_names(meeting_id: str, user_id: str) -> Dict[str, str]:
+    """Mapping {speaker_id: custom_name} des locuteurs renommés d'une réunion"""
+    speakers_data = get_meeting_speakers(meeting_id, user_id) or []
+    return {s["speaker_id"]: s["custom_name"] for s in speakers_data if s.get("custom_name")}
+
+
+def apply_speaker_names(transcript_text: str, speaker_names: Dict[str, str]) -> str:
+    """
+    Remplace les préfixes « Speaker X: » d'un texte canonique par les noms personnalisés.
+
+    Les noms peuvent être indexés par l'ID simple ("A") ou complet ("Speaker A").
+    """
+    if not transcript_text or not speaker_names:
+        return transcript_text
+
+    def replace(match):
+        speaker = match.group(1)
+        name = speaker_names.get(speaker) or speaker_names.get(f"Speaker {speaker}")
+        return f"{name}:" if name else match.group(0)
+
+    return SPEAKER_LINE_PATTERN.sub(replace, transcript_text)
+
+
+def render_transcript(meeting: dict, user_id: str) -> Optional[str]:
+    """
+    Retourne le texte de transcription d'une réunion avec les noms personnalisés appliqués.
+
+    Args:
+        meeting: Réunion telle que retournée par get_meeting
+        user_id: ID du propriétaire de la réunion
+
+    Returns:
+        str: Transcription prête à afficher (inchangée si aucun locuteur n'est renommé)
+    """
+    transcript_text = meeting.get("transcript_text")
+    if meeting.get("transcript_status") != "completed" or not transcript_text:
+        return transcript_text
+
+    key = (meeting["id"], meeting.get("speakers_version") or 0)
+    rendered = _cache.get(key)
+    if rendered is not None:
+        return rendered
+
+    speaker_names = get_speaker_names(meeting["id"], user_id)
+    # Sans préfixe canonique, le texte peut contenir des noms écrits par l'ancienne route des locuteurs
+    canonical = SPEAKER_LINE_PATTERN.search(transcript_text) is not None
+    if not speaker_names and canonical:
+        rendered = transcript_text
+    else:
+        # Rendu depuis la transcription structurée (copie locale, sinon récupérée et enregistrée)
+        transcript_data = None
+        try:
+            transcript_data = get_transcript_details(meeting["id"], meeting.get("transcript_id"))
+        except Exception as e:
+            logger.warning(f"Transcription structurée illisible pour {meeting['id']}: {str(e)}")
+
+        if transcript_data and transcript_data.get("utterances"):
+            rendered = format_transcript_text(transcript_data, speaker_names)
+        else:
+            rendered = apply_speaker_names(transcript_text, speaker_names)
+            if transcript_data is None and not canonical:
+                # Transcription structurée indisponible (AssemblyAI injoignable) : réessayer au prochain rendu
+                return rendered
+
+    _cache.set(key, rendered)
+    return rendered
+
+
+async def render_transcript_async(meeting: dict, user_id: str) -> Optional[str]:
+    """render_transcript exécuté dans le pool de threads de la base (routes async)"""
+    return await run_db(render_transcript, meeting, user_id)
@@ -1,13 +1,11 @@
-import requests
 import logging
 from typing import Dict, Any, Optional
 
+from .assemblyai_client import assemblyai_client
+
 # Configuration du logging
 logger = logging.getLogger("transcription-checker")
 
-# Clé API AssemblyAI
-ASSEMBLYAI_API_KEY = "3419005ee6924e08a14235043cabcd4e"
-
 def check_and_update_transcription(meeting: Dict[str, Any]) -> Dict[str, Any]:
     """
     Vérifie le statut d'une transcription auprès d'AssemblyAI et met à jour les données de la réunion si nécessaire.
@@ -76,6 +74,9 @@ def check_and_update_transcription(meeting: Dict[str, Any]) -> Dict[str, Any]:
         else:
             speakers_count = 1
         
+        # Conserver la transcription structurée localement
+        _store_fetched_transcript(meeting['id'], transcript_id, transcript_data)
+        
         # Mettre à jour les données de la réunion
         meeting['transcript_status'] = 'completed'
         meeting['transcript_text'] = transcript_text
@@ -110,23 +111,59 @@ def check_and_update_transcription(meeting: Dict[str, Any]) -> Dict[str, Any]:
 
 def get_assemblyai_transcript_details(transcript_id: str) -> Optional[Dict[str, Any]]:
     """Récupérer les détails d'une transcription AssemblyAI"""
-    headers = {
-        "authorization": ASSEMBLYAI_API_KEY
-    }
-    
     try:
-        url = f"https://api.assemblyai.com/v2/transcript/{transcript_id}"
-        response = requests.get(url, headers=headers)
-        
-        if response.status_code == 200:
-            return response.json()
-        else:
-            logger.error(f"Erreur lors de la récupération des détails de la transcription: {response.status_code} - {response.text}")
-            return None
+        return assemblyai_client.get_transcript_sync(transcript_id)
     except Exception as e:
         logger.error(f"Erreur lors de la récupération des détails de la transcription: {str(e)}")
         return None
 
+async def get_assemblyai_transcript_details_async(transcript_id: str) -> Optional[Dict[str, Any]]:
+    """Récupérer les détails d'une transcription AssemblyAI sans bloquer la boucle d'événements"""
+    try:
+        return await assemblyai_client.get_transcript(transcript_id)
+    except Exception as e:
+        logger.error(f"Erreur lors de la récupération des détails de la transcription: {str(e)}")
+        return None
+
+def _store_fetched_transcript(meeting_id: str, transcript_id: str, transcript_data: Optional[Dict[str, Any]]):
+    """Enregistre localement une transcription récupérée chez AssemblyAI (réunions antérieures au stockage local)"""
+    if not transcript_data or transcript_data.get('status') != 'completed':
+        return
+    try:
+        from ..db.transcript_queries import save_transcript_data
+        save_transcript_data(meeting_id, transcript_id, transcript_data)
+    except Exception as e:
+        logger.warning(f"Impossible d'enregistrer la transcription de la réunion {meeting_id}: {str(e)}")
+
+def get_transcript_details(meeting_id: str, transcript_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Récupérer la transcription structurée d'une réunion.
+    
+    La copie locale est utilisée en priorité ; AssemblyAI n'est interrogé que si
+    elle n'existe pas encore, et le résultat est alors enregistré localement.
+    """
+    from ..db.transcript_queries import get_transcript_data
+    
+    transcript_data = get_transcript_data(meeting_id)
+    if transcript_data or not transcript_id:
+        return transcript_data
+    
+    transcript_data = get_assemblyai_transcript_details(transcript_id)
+    _store_fetched_transcript(meeting_id, transcript_id, transcript_data)
+    return transcript_data
+
+async def get_transcript_details_async(meeting_id: str, transcript_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Variante asynchrone de get_transcript_details (accès base dans le pool de threads dédié)"""
+    from ..db.async_queries import get_transcript_data_async, run_db
+    
+    transcript_data = await get_transcript_data_async(meeting_id)
+    if transcript_data or not transcript_id:
+        return transcript_data
+    
+    transcript_data = await get_assemblyai_transcript_details_async(transcript_id)
+    await run_db(_store_fetched_transcript, meeting_id, transcript_id, transcript_data)
+    return transcript_data
+
 def format_transcript_text(transcript_data: Dict[str, Any], speaker_names: Optional[Dict[str, str]] = None) -> str:
     """Formater le texte de la transcription avec les locuteurs
     
@@ -0,0 +1,70 @@
+"""
+Processus worker dédié au traitement en arrière-plan.
+
+    python -m app.worker
+
+Exécute, hors des workers web, le processeur de la file de tâches (conversions
+audio ffmpeg, transcriptions, vérifications de statut, comptes rendus), la
+réconciliation périodique avec AssemblyAI et la reprise des conversions
+interrompues. Les workers web sont alors lancés avec RUN_BACKGROUND_JOBS=false :
+ils se contentent d'ajouter les tâches à la table jobs (prises en charge ici en
+au plus JOB_POLL_INTERVAL secondes), si bien que leur recyclage n'interrompt
+aucune conversion. Le débit HTTP et le débit des tâches se dimensionnent
+séparément (nombre de workers web d'un côté, nombre de processus worker et
+taille des pools de l'autre).
+
+La concurrence du worker se règle par ses propres variables d'environnement
+(PROVIDER_UPLOAD_WORKERS, POLL_WORKERS, SUMMARY_WORKERS, CONVERSION_WORKERS,
+JOB_POLL_INTERVAL, DB_POOL_SIZE...). Plusieurs processus worker peuvent tourner en
+parallèle : chaque tâche n'est réclamée que par l'un d'eux (voir db/job_queries.py).
+
+Le processus s'arrête proprement sur SIGTERM ou SIGINT : il ne réclame plus de
+tâches et laisse celles en cours se terminer (EXECUTOR_DRAIN_TIMEOUT).
+"""
+
+import asyncio
+import logging
+import signal
+
+from .core.config import settings
+from .services.queue_processor import WORKER_ID, start_queue_processor, stop_queue_processor
+
+logger = logging.getLogger("meeting-transcriber-worker")
+
+async def run_worker():
+    """Démarre le traitement en arrière-plan et attend un signal d'arrêt"""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    logger.info(f"Démarrage du worker {WORKER_ID}")
+
+    # Relancer les conversions audio interrompues par un redémarrage
+    from .services.conversion import resume_pending_conversions
+    await asyncio.to_thread(resume_pending_conversions)
+
+    await start_queue_processor()
+    await stop.wait()
+
+    logger.info(f"Arrêt du worker {WORKER_ID}")
+    await stop_queue_processor()
+
+    from .services.assemblyai_client import assemblyai_client
+    await assemblyai_client.aclose()
+
+    from .db.async_queries import shutdown_db_executor
+    await asyncio.to_thread(shutdown_db_executor)
+    from .db.database import db_writer
+    await asyncio.to_thread(db_writer.stop)
+    logger.info("Worker arrêté")
+
+def main():
+    logging.basicConfig(
+        level=getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    )
+    asyncio.run(run_worker())
+
+if __name__ == "__main__":
+    main()
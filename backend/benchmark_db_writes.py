@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark du débit d'écriture SQLite sous charge concurrente.
+
+Imite des uploads simultanés (create_meeting) et des mises à jour de statut
+(update_meeting, comme le font le processeur de file et les threads de
+transcription) depuis de nombreux threads, puis affiche le nombre d'écritures
+par seconde, la latence et les erreurs (« database is locked »).
+
+La base est créée dans un répertoire temporaire (RENDER_DISK_PATH est redéfini
+avant l'import de l'application).
+
+Usage:
+    python benchmark_db_writes.py [nombre_de_threads] [écritures_par_thread]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+BENCH_DIR = tempfile.mkdtemp(prefix="gilbert-writes-")
+os.environ["RENDER_DISK_PATH"] = BENCH_DIR
+
+from app.db.database import create_user  # noqa: E402
+from app.db.queries import create_meeting, update_meeting  # noqa: E402
+
+DEFAULT_THREADS = 32
+DEFAULT_WRITES = 50
+STATUSES = ("processing", "completed")
+
+
+def worker(user_id, writes, latencies, errors):
+    meeting = None
+    for i in range(writes):
+        start = time.perf_counter()
+        try:
+            if meeting is None or i % 5 == 0:
+                # Un upload toutes les cinq écritures, le reste en mises à jour de statut
+                meeting = create_meeting({"title": f"Réunion {i}", "file_url": f"/uploads/{i}.mp3"}, user_id)
+            else:
+                update_meeting(meeting["id"], user_id, {"transcript_status": STATUSES[i % 2]})
+        except Exception as e:
+            errors.append(repr(e))
+        latencies.append(time.perf_counter() - start)
+
+
+def main(thread_count, writes):
+    user = create_user({"email": f"bench-{uuid.uuid4()}@example.com", "hashed_password": "x"})
+    latencies, errors = [], []
+    threads = [
+        threading.Thread(target=worker, args=(user["id"], writes, latencies, errors))
+        for _ in range(thread_count)
+    ]
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    total = thread_count * writes
+    print(f"{total} écritures depuis {thread_count} threads en {elapsed:.2f}s")
+    print(f"Débit: {total / elapsed:.0f} écritures/s")
+    print(f"Latence p50: {latencies[len(latencies) // 2] * 1000:.1f} ms, "
+          f"p99: {latencies[int(len(latencies) * 0.99)] * 1000:.1f} ms, "
+          f"max: {latencies[-1] * 1000:.1f} ms")
+    print(f"Erreurs: {len(errors)}" + (f" (ex: {errors[0]})" if errors else ""))
+
+
+if __name__ == "__main__":
+    thread_count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_THREADS
+    writes = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_WRITES
+    try:
+        main(thread_count, writes)
+    finally:
+        shutil.rmtree(BENCH_DIR, ignore_errors=True)
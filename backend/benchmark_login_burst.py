@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Benchmark d'une rafale de connexions.
+
+Des clients simultanés se connectent (POST /auth/login/json, vérification
+bcrypt) pendant qu'une sonde interroge en continu un endpoint sans rapport
+(GET /meetings/ d'un autre utilisateur, déjà authentifié). Affiche la latence
+des connexions et celle de la sonde : tant que bcrypt s'exécute dans le pool
+dédié, la boucle d'événements reste disponible et le p99 de la sonde ne dépend
+pas de la rafale.
+
+Avec --blocking, bcrypt est exécuté directement dans la boucle d'événements
+(comportement antérieur), pour comparaison.
+
+La base est créée dans un répertoire temporaire (RENDER_DISK_PATH est redéfini
+avant l'import de l'application).
+
+Usage:
+    python benchmark_login_burst.py [nombre_de_connexions] [clients_simultanés] [--blocking] [--rounds=N]
+"""
+
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter
+from datetime import timedelta
+
+BENCH_DIR = tempfile.mkdtemp(prefix="gilbert-login-")
+os.environ["RENDER_DISK_PATH"] = BENCH_DIR
+
+DEFAULT_ROUNDS = 10
+ROUNDS = next(
+    (a.split("=", 1)[1] for a in sys.argv[1:] if a.startswith("--rounds=")),
+    str(DEFAULT_ROUNDS)
+)
+os.environ["BCRYPT_ROUNDS"] = ROUNDS
+
+import httpx  # noqa: E402
+
+from app.core import security  # noqa: E402
+from app.core.security import create_access_token, password_verify_cache  # noqa: E402
+from app.db import async_queries, database  # noqa: E402
+from app.db.database import create_user, get_password_hash  # noqa: E402
+from app.db.queries import create_meeting  # noqa: E402
+from app.main import app  # noqa: E402
+
+DEFAULT_LOGINS = 40
+DEFAULT_CLIENTS = 8
+USERS = 8
+PASSWORD = "mot-de-passe-du-benchmark"
+PROBE_INTERVAL = 0.005
+
+
+def setup():
+    # Sans le cache de vérification, chaque connexion paie bcrypt
+    password_verify_cache.maxsize = 0
+    hashed_password = get_password_hash(PASSWORD)
+    emails = []
+    for i in range(USERS):
+        email = f"login-{i}-{uuid.uuid4()}@example.com"
+        create_user({"email": email, "hashed_password": hashed_password, "full_name": f"Login {i}"})
+        emails.append(email)
+
+    reader = create_user({
+        "email": f"reader-{uuid.uuid4()}@example.com",
+        "hashed_password": "x",
+        "full_name": "Reader"
+    })
+    for i in range(20):
+        create_meeting({"title": f"Réunion {i}", "file_url": f"/uploads/{i}.mp3"}, reader["id"])
+    token = create_access_token({"sub": reader["id"]}, timedelta(hours=1))
+    return emails, token
+
+
+def use_blocking_calls():
+    """Exécute bcrypt dans la boucle d'événements, comme avant le pool dédié"""
+    async def verify_inline(plain_password, hashed_password):
+        return security.verify_password(plain_password, hashed_password)
+    security.verify_password_async = verify_inline
+    # Les routes ont importé la fonction : la remplacer aussi dans leur module
+    from app.routes import auth
+    auth.verify_password_async = verify_inline
+
+
+def percentile(values, ratio):
+    values = sorted(values)
+    return values[min(int(len(values) * ratio), len(values) - 1)] * 1000
+
+
+async def run_probe_only(client, headers, duration):
+    latencies = []
+    scheduled = time.perf_counter()
+    deadline = scheduled + duration
+    while scheduled < deadline:
+        await client.get("/meetings/?limit=20", headers=headers)
+        end = time.perf_counter()
+        latencies.append(end - scheduled)
+        scheduled = end + PROBE_INTERVAL
+        await asyncio.sleep(PROBE_INTERVAL)
+    return latencies
+
+
+async def run_burst(count, clients, emails, token):
+    headers = {"Authorization": f"Bearer {token}"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=300) as client:
+        # Référence : latence de la sonde sans rafale
+        baseline = await run_probe_only(client, headers, 1.0)
+
+        latencies, probe_latencies = [], []
+        statuses = Counter()
+        remaining = iter(range(count))
+        done = asyncio.Event()
+
+        async def worker():
+            for i in remaining:
+                start = time.perf_counter()
+                try:
+                    response = await client.post("/auth/login/json", json={
+                        "email": emails[i % len(emails)],
+                        "password": PASSWORD
+                    })
+                    statuses[response.status_code] += 1
+                except Exception as e:
+                    statuses[type(e).__name__] += 1
+                latencies.append(time.perf_counter() - start)
+
+        async def probe():
+            # Latence mesurée depuis l'instant prévu de l'appel : si la boucle d'événements
+            # est bloquée, l'attente avant le réveil de la sonde est comptée
+            scheduled = time.perf_counter()
+            while not done.is_set():
+                response = await client.get("/meetings/?limit=20", headers=headers)
+                assert response.status_code == 200, response.text
+                end = time.perf_counter()
+                probe_latencies.append(end - scheduled)
+                scheduled = end + PROBE_INTERVAL
+                await asyncio.sleep(PROBE_INTERVAL)
+
+        probe_task = asyncio.create_task(probe())
+        await asyncio.sleep(PROBE_INTERVAL)
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe_task
+
+    return statuses, elapsed, latencies, baseline, probe_latencies
+
+
+def main(count, clients, blocking):
+    emails, token = setup()
+    if blocking:
+        use_blocking_calls()
+
+    statuses, elapsed, latencies, baseline, probe_latencies = asyncio.run(run_burst(count, clients, emails, token))
+
+    mode = "bloquant (boucle d'événements)" if blocking else "pool bcrypt dédié"
+    print(f"Mode: {mode}, coût bcrypt: {ROUNDS}")
+    print(f"{count} connexions depuis {clients} clients en {elapsed:.2f}s, débit: {count / elapsed:.1f} connexions/s")
+    print(f"Statuts HTTP: {dict(statuses)}")
+    print(f"Latence connexions p50: {percentile(latencies, 0.5):.1f} ms, p99: {percentile(latencies, 0.99):.1f} ms")
+    print(f"Sonde /meetings/ sans rafale ({len(baseline)} appels) p50: {percentile(baseline, 0.5):.1f} ms, "
+          f"p99: {percentile(baseline, 0.99):.1f} ms")
+    print(f"Sonde /meetings/ pendant la rafale ({len(probe_latencies)} appels) p50: "
+          f"{percentile(probe_latencies, 0.5):.1f} ms, p99: {percentile(probe_latencies, 0.99):.1f} ms, "
+          f"max: {max(probe_latencies) * 1000:.1f} ms")
+
+    assert set(statuses) == {200}, f"Connexions en échec: {dict(statuses)}"
+    print("OK")
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    count = int(args[0]) if args else DEFAULT_LOGINS
+    clients = int(args[1]) if len(args) > 1 else DEFAULT_CLIENTS
+    try:
+        main(count, clients, "--blocking" in sys.argv)
+    finally:
+        security.shutdown_password_executor()
+        async_queries.shutdown_db_executor()
+        database.db_pool.close_all()
+        shutil.rmtree(BENCH_DIR, ignore_errors=True)
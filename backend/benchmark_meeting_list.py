@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la liste des réunions d'un utilisateur.
+
+Compare l'ancienne requête (`get_meetings_by_user` : SELECT * puis normalisation
+de chaque transcription) avec la requête projetée `list_meetings_page`, en liste
+complète et en première page, pour 1 000 et 10 000 réunions par utilisateur.
+Le temps mesuré inclut la sérialisation JSON de la réponse, dont la taille est
+également affichée.
+
+La base est créée dans un répertoire temporaire (RENDER_DISK_PATH est redéfini
+avant l'import de l'application).
+
+Usage:
+    python benchmark_meeting_list.py [nombre_de_réunions ...]
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+BENCH_DIR = tempfile.mkdtemp(prefix="gilbert-bench-")
+os.environ["RENDER_DISK_PATH"] = BENCH_DIR
+
+from app.db.database import execute_write  # noqa: E402
+from app.db.queries import get_meetings_by_user, list_meetings_page  # noqa: E402
+
+DEFAULT_COUNTS = [1000, 10000]
+PAGE_SIZE = 50
+TRANSCRIPT_LINES = 400  # ~30 Ko de transcription par réunion
+SUMMARY_TEXT = "Résumé de la réunion. " * 150
+
+
+def make_transcript():
+    return "\n".join(
+        f"Speaker {'AB'[i % 2]}: Intervention numéro {i} sur l'avancement du projet."
+        for i in range(TRANSCRIPT_LINES)
+    )
+
+
+def populate(count):
+    """Crée un utilisateur avec `count` réunions terminées"""
+    user_id = str(uuid.uuid4())
+    transcript = make_transcript()
+    start = datetime(2024, 1, 1)
+
+    def write(conn):
+        conn.execute(
+            "INSERT INTO users (id, email, hashed_password, full_name, created_at) VALUES (?, ?, ?, ?, ?)",
+            (user_id, f"bench-{user_id}@example.com", "x", "Bench", start.isoformat())
+        )
+        conn.executemany(
+            """
+            INSERT INTO meetings (id, user_id, title, file_url, transcript_text, transcript_status,
+                                  created_at, duration_seconds, speakers_count, summary_text, summary_status)
+            VALUES (?, ?, ?, ?, ?, 'completed', ?, 1800, 2, ?, 'completed')
+            """,
+            [
+                (str(uuid.uuid4()), user_id, f"Réunion {i}", f"/uploads/{user_id}/{i}.mp3",
+                 transcript, (start + timedelta(minutes=i)).isoformat(), SUMMARY_TEXT)
+                for i in range(count)
+            ]
+        )
+
+    execute_write(write)
+    return user_id
+
+
+def measure(func):
+    """Retourne (durée en ms, taille JSON en Ko) d'un appel"""
+    start = time.perf_counter()
+    payload = json.dumps(func(), default=str)
+    elapsed = (time.perf_counter() - start) * 1000
+    return elapsed, len(payload.encode("utf-8")) / 1024
+
+
+def main(counts):
+    print(f"{'Réunions':>9} | {'Requête':<28} | {'Durée (ms)':>10} | {'Taille (Ko)':>12}")
+    print("-" * 70)
+    for count in counts:
+        user_id = populate(count)
+        cases = [
+            ("SELECT * (ancienne)", lambda: get_meetings_by_user(user_id)),
+            ("projetée, liste complète", lambda: list_meetings_page(user_id)[0]),
+            (f"projetée, page de {PAGE_SIZE}", lambda: list_meetings_page(user_id, limit=PAGE_SIZE)[0]),
+        ]
+        for label, func in cases:
+            elapsed, size = measure(func)
+            print(f"{count:>9} | {label:<28} | {elapsed:>10.1f} | {size:>12.0f}")
+
+        # Parcours complet par curseur
+        start = time.perf_counter()
+        pages, seen, cursor = 0, 0, None
+        while True:
+            meetings, cursor = list_meetings_page(user_id, limit=PAGE_SIZE, cursor=cursor)
+            pages += 1
+            seen += len(meetings)
+            if not cursor:
+                break
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{count:>9} | {f'parcours ({pages} pages)':<28} | {elapsed:>10.1f} | {'':>12}")
+        assert seen == count, f"{seen} réunions parcourues au lieu de {count}"
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or DEFAULT_COUNTS
+    try:
+        main(counts)
+    finally:
+        shutil.rmtree(BENCH_DIR, ignore_errors=True)
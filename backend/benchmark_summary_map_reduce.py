@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Benchmark du compte rendu d'une longue réunion : appel unique contre map-reduce.
+
+Une transcription synthétique (150 mots par minute, six locuteurs) est résumée
+deux fois avec summarize_transcript : en un seul appel (comportement antérieur)
+puis par parties (map-reduce). L'API Mistral est remplacée par un modèle de
+latence :
+    durée d'un appel = base + prefill × tokens d'entrée
+                       + tokens de sortie × (decode + contexte × tokens d'entrée)
+le dernier terme traduisant le ralentissement de la génération sur un long
+contexte. Un appel dont l'entrée et la sortie dépassent --context-window
+échoue (400), comme l'API réelle.
+
+Les durées sont simulées à l'échelle --scale (0.02 par défaut) puis ramenées à
+l'échelle réelle à l'affichage. Les paramètres du modèle sont des ordres de
+grandeur à ajuster avec les durées mesurées en production (journal
+« Compte rendu généré avec succès ... »).
+
+La base est créée dans un répertoire temporaire (RENDER_DISK_PATH est redéfini
+avant l'import de l'application).
+
+Usage:
+    python benchmark_summary_map_reduce.py [minutes] [--scale=F] [--base-ms=N] [--prefill-ms=N]
+        [--decode-ms=N] [--context-us=N] [--context-window=N]
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+BENCH_DIR = tempfile.mkdtemp(prefix="gilbert-summary-")
+os.environ["RENDER_DISK_PATH"] = BENCH_DIR
+
+
+def option(name, default):
+    return next((float(a.split("=", 1)[1]) for a in sys.argv[1:] if a.startswith(f"--{name}=")), default)
+
+
+SCALE = option("scale", 0.02)
+BASE_MS = option("base-ms", 500)
+PREFILL_MS = option("prefill-ms", 0.3)  # par token d'entrée
+DECODE_MS = option("decode-ms", 20)  # par token de sortie
+CONTEXT_US = option("context-us", 0.6)  # par token de sortie et par token de contexte
+CONTEXT_WINDOW = int(option("context-window", 32000))
+SUMMARY_OUTPUT_TOKENS = 2500
+
+from app.core.config import settings  # noqa: E402
+from app.db import database  # noqa: E402
+from app.services import mistral_summary  # noqa: E402
+from app.services.executors import shutdown_executors  # noqa: E402
+from app.services.mistral_summary import MistralAPIError, estimate_tokens, format_timings, summarize_transcript  # noqa: E402
+
+DEFAULT_MINUTES = 180
+WORDS = (
+    "projet budget client livraison équipe planning réunion décision risque retard objectif "
+    "contrat validation priorité ressource développement test production recrutement formation "
+    "semaine trimestre indicateur qualité support fournisseur migration sécurité documentation"
+).split()
+
+
+def synthetic_transcript(minutes):
+    rng = random.Random(42)
+    lines, words = [], 0
+    while words < minutes * 150:
+        sentence_count = rng.randint(1, 4)
+        text = " ".join(
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 18))).capitalize() + "."
+            for _ in range(sentence_count)
+        )
+        lines.append(f"Speaker {rng.choice('ABCDEF')}: {text}")
+        words += len(text.split())
+    return "\n".join(lines)
+
+
+class FakeResponse:
+    def __init__(self, status_code, content="", text=""):
+        self.status_code = status_code
+        self.text = text
+        self.headers = {}
+        self._content = content
+
+    def json(self):
+        return {"choices": [{"message": {"content": self._content}}]}
+
+
+calls = []
+
+
+def fake_post(url, headers=None, json=None, timeout=None):
+    prompt = json["messages"][0]["content"]
+    input_tokens = estimate_tokens(prompt)
+    if input_tokens + json["max_tokens"] > CONTEXT_WINDOW:
+        calls.append(("overflow", input_tokens, 0))
+        return FakeResponse(400, text=f"Prompt contains {input_tokens} tokens, too large for model with {CONTEXT_WINDOW}")
+    final = "VOICI UN EXEMPLE" in prompt
+    output_tokens = SUMMARY_OUTPUT_TOKENS if final else min(json["max_tokens"], max(200, input_tokens // 8))
+    latency_ms = (BASE_MS + PREFILL_MS * input_tokens
+                  + output_tokens * (DECODE_MS + CONTEXT_US / 1000 * input_tokens))
+    time.sleep(latency_ms / 1000 * SCALE)
+    calls.append(("final" if final else "chunk", input_tokens, output_tokens))
+    return FakeResponse(200, content="x" * (output_tokens * mistral_summary.CHARS_PER_TOKEN))
+
+
+def run(transcript, single_pass):
+    calls.clear()
+    settings.SUMMARY_SINGLE_PASS_TOKENS = 10 ** 9 if single_pass else SINGLE_PASS_TOKENS
+    try:
+        _, timings = summarize_transcript(transcript, "Comité de pilotage")
+    except MistralAPIError as e:
+        return None, str(e)
+    # Durées ramenées à l'échelle réelle
+    for key in ("split", "map", "merge", "reduce", "total"):
+        if key in timings:
+            timings[key] /= SCALE
+    return timings, None
+
+
+def main(minutes):
+    mistral_summary.requests.post = fake_post
+    transcript = synthetic_transcript(minutes)
+    print(f"Réunion de {minutes} min: {len(transcript)} caractères, ~{estimate_tokens(transcript)} tokens, "
+          f"fenêtre de contexte {CONTEXT_WINDOW} tokens")
+
+    single, error = run(transcript, single_pass=True)
+    print(f"Appel unique : {format_timings(single) if single else 'échec — ' + error}")
+
+    mapped, error = run(transcript, single_pass=False)
+    assert mapped, error
+    largest = max(tokens for _, tokens, _ in calls)
+    print(f"Map-reduce   : {format_timings(mapped)}")
+    print(f"Appels: {len(calls)}, plus grand prompt: ~{largest} tokens")
+    assert not any(kind == "overflow" for kind, _, _ in calls)
+    if single:
+        print(f"Gain: {single['total'] / mapped['total']:.1f}x")
+    print("OK")
+
+
+SINGLE_PASS_TOKENS = settings.SUMMARY_SINGLE_PASS_TOKENS
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    try:
+        main(int(args[0]) if args else DEFAULT_MINUTES)
+    finally:
+        shutdown_executors()
+        database.db_writer.stop()
+        database.db_pool.close_all()
+        shutil.rmtree(BENCH_DIR, ignore_errors=True)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark de l'empreinte mémoire de l'écriture des uploads sur disque.
+
+Compare la lecture complète du fichier (`await file.read()`, avant le
+changement) avec la copie par blocs de `save_upload_stream` (après) pour des
+tailles de fichiers croissantes.
+
+La mémoire mesurée est le pic de RSS du processus (resource.getrusage,
+ru_maxrss) : c'est ce que voit le système (et la limite mémoire de l'instance),
+y compris les tampons alloués hors de l'allocateur Python. Le pic de RSS ne
+redescend jamais au cours de la vie d'un processus : chaque mesure est donc
+faite dans un processus Python distinct. Le tableau indique le pic pendant
+l'écriture et son écart avec le RSS avant l'écriture (imports compris).
+
+Usage:
+    RENDER_DISK_PATH=/tmp python benchmark_upload_memory.py [taille_mo ...]
+"""
+
+import asyncio
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+DEFAULT_SIZES_MB = [10, 50, 100]
+STRATEGIES = ("read", "stream")
+
+
+def peak_rss_mb():
+    """Pic de RSS du processus courant, en Mo (ru_maxrss est en Ko sous Linux, en octets sous macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def make_upload(path):
+    """Construit un UploadFile à partir d'un fichier existant"""
+    from starlette.datastructures import Headers, UploadFile
+
+    return UploadFile(
+        open(path, "rb"),
+        filename="bench.mp3",
+        headers=Headers({"content-type": "audio/mpeg"}),
+    )
+
+
+async def read_whole(upload, destination):
+    """Ancienne implémentation: lecture complète en mémoire"""
+    with open(destination, "wb") as f:
+        content = await upload.read()
+        f.write(content)
+
+
+async def run_strategy(strategy, source, destination):
+    """Exécute une stratégie d'écriture dans le processus courant ; retourne (RSS avant, pic) en Mo"""
+    from app.services.file_upload import save_upload_stream
+
+    upload = make_upload(source)
+    before = peak_rss_mb()
+    try:
+        if strategy == "read":
+            await read_whole(upload, destination)
+        else:
+            await save_upload_stream(upload, destination, max_size=os.path.getsize(source) + 1)
+        return before, peak_rss_mb()
+    finally:
+        await upload.close()
+        if os.path.exists(destination):
+            os.remove(destination)
+
+
+def measure(strategy, source, destination):
+    """Mesure une stratégie dans un nouveau processus ; retourne (pic, écart avec le RSS avant l'écriture) en Mo"""
+    output = subprocess.run(
+        [sys.executable, __file__, "--child", strategy, source, destination],
+        check=True, capture_output=True, text=True,
+    ).stdout.split()
+    before, peak = float(output[-2]), float(output[-1])
+    return peak, peak - before
+
+
+def main(sizes_mb):
+    print(f"{'Taille':>10} | {'read() complet (pic / +écriture)':>32} | {'par blocs (pic / +écriture)':>28}")
+    print("-" * 78)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for size_mb in sizes_mb:
+            source = os.path.join(temp_dir, f"source_{size_mb}.mp3")
+            with open(source, "wb") as f:
+                for _ in range(size_mb):
+                    f.write(os.urandom(1024 * 1024))
+
+            destination = os.path.join(temp_dir, "destination.mp3")
+            whole_peak, whole_delta = measure("read", source, destination)
+            streamed_peak, streamed_delta = measure("stream", source, destination)
+            print(
+                f"{size_mb:>7} Mo | {whole_peak:>17.1f} Mo / {whole_delta:>6.1f} Mo"
+                f" | {streamed_peak:>13.1f} Mo / {streamed_delta:>6.1f} Mo"
+            )
+            os.remove(source)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        strategy, source, destination = sys.argv[2:5]
+        assert strategy in STRATEGIES
+        before, peak = asyncio.run(run_strategy(strategy, source, destination))
+        print(f"{before:.3f} {peak:.3f}")
+    else:
+        sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES_MB
+        main(sizes)
@@ -9,6 +9,7 @@ from app.services.assemblyai import transcribe_meeting, process_transcription, u
 from app.db.database import get_db_connection, release_db_connection
 from app.db.queries import update_meeting
 from app.core.config import Settings
+from app.services.leases import PERIODIC_SWEEPS_LEASE, Lease
 
 # Configuration du logging
 logging.basicConfig(
@@ -245,4 +246,12 @@ if __name__ == "__main__":
     else:
         logger.error(f"Le répertoire d'uploads n'existe pas: {settings.UPLOADS_DIR}")
     
-    process_transcriptions(meeting_id)
+    if meeting_id:
+        process_transcriptions(meeting_id)
+    else:
+        # Le balayage complet ne doit pas tourner en même temps que celui d'une autre instance
+        with Lease(PERIODIC_SWEEPS_LEASE).hold() as acquired:
+            if acquired:
+                process_transcriptions()
+            else:
+                logger.info("Vérification déjà assurée par une autre instance, rien à faire")
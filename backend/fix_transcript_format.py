@@ -12,7 +12,7 @@ BASE_DIR = Path(__file__).resolve().parent
 if str(BASE_DIR) not in sys.path:
     sys.path.append(str(BASE_DIR))
 
-from app.db.database import get_db_connection, release_db_connection
+from app.db.database import get_db_connection, release_db_connection, execute_write
 from app.db.queries import normalize_transcript_format
 
 def format_raw_text(text):
@@ -60,14 +60,12 @@ def fix_transcript_formats():
             # Si le texte a été modifié, mettre à jour la base de données
             if formatted_text != text:
                 logger.info(f"Correction du format pour la réunion {meeting_id}...")
-                cursor.execute(
+                execute_write(lambda write_conn: write_conn.execute(
                     "UPDATE meetings SET transcript_text = ? WHERE id = ? AND user_id = ?",
                     (formatted_text, meeting_id, user_id)
-                )
+                ))
                 fixed_count += 1
         
-        # Valider les modifications
-        conn.commit()
         logger.info(f"Formatage terminé. {fixed_count} réunions mises à jour sur {len(meetings)}.")
         
         # Vérifier les réunions sans préfixe "Speaker"
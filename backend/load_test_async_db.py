@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Test de charge de l'accès asynchrone à la base de données.
+
+Des clients simultanés envoient des requêtes à l'application (liste des
+réunions, détail et renommage d'une réunion, profil) pendant qu'une sonde interroge /health
+en continu.
+Affiche le débit, la latence des requêtes et celle de la sonde : tant que les
+requêtes base sont exécutées dans le pool de threads dédié, la boucle
+d'événements reste disponible et /health répond en quelques millisecondes.
+
+Avec --blocking, les fonctions `xxx_async` exécutent la requête directement
+dans la boucle d'événements (comportement antérieur), pour comparaison.
+
+Sur un disque local, une requête SQLite ne dure que quelques microsecondes et
+le coût du framework domine. --latency-ms=N ajoute N ms d'attente à chaque
+instruction SQL, pour reproduire un disque réseau (disque persistant Render)
+ou un pool de connexions saturé.
+
+La base est créée dans un répertoire temporaire (RENDER_DISK_PATH est redéfini
+avant l'import de l'application).
+
+Usage:
+    python load_test_async_db.py [nombre_de_requêtes] [clients_simultanés] [--blocking] [--latency-ms=N]
+"""
+
+import asyncio
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter
+from datetime import timedelta
+
+BENCH_DIR = tempfile.mkdtemp(prefix="gilbert-async-")
+os.environ["RENDER_DISK_PATH"] = BENCH_DIR
+
+DEFAULT_LATENCY_MS = 2
+LATENCY_MS = next(
+    (float(a.split("=", 1)[1]) for a in sys.argv[1:] if a.startswith("--latency-ms=")),
+    DEFAULT_LATENCY_MS
+)
+
+
+def connect_with_latency(*args, **kwargs):
+    """Connexion SQLite dont chaque instruction attend LATENCY_MS (entrées/sorties simulées)"""
+    conn = _sqlite_connect(*args, **kwargs)
+    if LATENCY_MS:
+        conn.set_trace_callback(lambda statement: time.sleep(LATENCY_MS / 1000))
+    return conn
+
+
+_sqlite_connect = sqlite3.connect
+sqlite3.connect = connect_with_latency
+
+import httpx  # noqa: E402
+
+from app.core.security import create_access_token  # noqa: E402
+from app.db import async_queries, database  # noqa: E402
+from app.db.database import create_user  # noqa: E402
+from app.db.queries import create_meeting, update_meeting  # noqa: E402
+from app.main import app  # noqa: E402
+
+DEFAULT_REQUESTS = 2000
+DEFAULT_CLIENTS = 64
+MEETINGS = 300
+PROBE_INTERVAL = 0.005
+
+
+def setup():
+    user = create_user({
+        "email": f"load-{uuid.uuid4()}@example.com",
+        "hashed_password": "x",
+        "full_name": "Load"
+    })
+    transcript = "\n".join(f"Speaker {'AB'[i % 2]}: phrase numéro {i} de la réunion." for i in range(400))
+    meeting_ids = []
+    for i in range(MEETINGS):
+        meeting = create_meeting({"title": f"Réunion {i}", "file_url": f"/uploads/{i}.mp3"}, user["id"])
+        update_meeting(meeting["id"], user["id"], {"transcript_status": "completed", "transcript_text": transcript})
+        meeting_ids.append(meeting["id"])
+    token = create_access_token({"sub": user["id"]}, timedelta(hours=1))
+    return meeting_ids, token
+
+
+def use_blocking_calls():
+    """Exécute les requêtes dans la boucle d'événements, comme avant la couche asynchrone"""
+    async def run_inline(fn, *args, **kwargs):
+        return fn(*args, **kwargs)
+    async_queries.run_db = run_inline
+
+
+def percentile(values, ratio):
+    values = sorted(values)
+    return values[min(int(len(values) * ratio), len(values) - 1)] * 1000
+
+
+async def run_load(count, clients, meeting_ids, token):
+    headers = {"Authorization": f"Bearer {token}"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=120) as client:
+        latencies, probe_latencies = [], []
+        statuses = Counter()
+        remaining = iter(range(count))
+        done = asyncio.Event()
+
+        async def worker():
+            for i in remaining:
+                meeting_id = meeting_ids[i % len(meeting_ids)]
+                kind = i % 4
+                start = time.perf_counter()
+                try:
+                    if kind == 0:
+                        response = await client.get("/meetings/?limit=20", headers=headers)
+                    elif kind == 1:
+                        response = await client.get(f"/meetings/{meeting_id}", headers=headers)
+                    elif kind == 2:
+                        response = await client.put(f"/meetings/{meeting_id}", headers=headers,
+                                                    json={"title": f"Réunion renommée {i}"})
+                    else:
+                        response = await client.get("/auth/me", headers=headers)
+                    statuses[response.status_code] += 1
+                except Exception as e:
+                    statuses[type(e).__name__] += 1
+                latencies.append(time.perf_counter() - start)
+
+        async def probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/health")
+                probe_latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(PROBE_INTERVAL)
+
+        probe_task = asyncio.create_task(probe())
+        await asyncio.sleep(PROBE_INTERVAL)
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe_task
+
+    return statuses, elapsed, latencies, probe_latencies
+
+
+def main(count, clients, blocking):
+    meeting_ids, token = setup()
+    if blocking:
+        use_blocking_calls()
+
+    statuses, elapsed, latencies, probe_latencies = asyncio.run(run_load(count, clients, meeting_ids, token))
+
+    mode = "bloquant (boucle d'événements)" if blocking else "asynchrone (pool de threads)"
+    print(f"Mode: {mode}, latence simulée par instruction: {LATENCY_MS} ms")
+    print(f"{count} requêtes depuis {clients} clients en {elapsed:.2f}s, débit: {count / elapsed:.0f} requêtes/s")
+    print(f"Statuts HTTP: {dict(statuses)}")
+    print(f"Latence requêtes p50: {percentile(latencies, 0.5):.1f} ms, p99: {percentile(latencies, 0.99):.1f} ms")
+    print(f"Sonde /health ({len(probe_latencies)} appels) p50: {percentile(probe_latencies, 0.5):.1f} ms, "
+          f"p99: {percentile(probe_latencies, 0.99):.1f} ms, max: {max(probe_latencies) * 1000:.1f} ms")
+
+    assert set(statuses) == {200}, f"Requêtes en échec: {dict(statuses)}"
+    print("OK")
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    count = int(args[0]) if args else DEFAULT_REQUESTS
+    clients = int(args[1]) if len(args) > 1 else DEFAULT_CLIENTS
+    try:
+        main(count, clients, "--blocking" in sys.argv)
+    finally:
+        async_queries.shutdown_db_executor()
+        database.db_pool.close_all()
+        shutil.rmtree(BENCH_DIR, ignore_errors=True)
@@ -9,6 +9,7 @@ import sys
 import os
 import logging
 from app.services.assemblyai import _process_transcription
+from app.services.leases import PERIODIC_SWEEPS_LEASE, Lease
 import traceback
 import argparse
 
@@ -93,7 +94,14 @@ def run_continuous(interval=60):
             time.sleep(interval)
 
 def check_and_process():
-    """Vérifie et traite les réunions en attente"""
+    """Vérifie et traite les réunions en attente, si aucune autre instance ne le fait déjà"""
+    with Lease(PERIODIC_SWEEPS_LEASE).hold() as acquired:
+        if not acquired:
+            logger.info("Vérification déjà assurée par une autre instance, cycle ignoré")
+            return
+        _check_and_process()
+
+def _check_and_process():
     logger.info("Vérification des réunions en attente")
     
     # Récupérer les réunions en processing ou pending
@@ -1,20 +1,17 @@
 #!/usr/bin/env python3
 """
-Script pour traiter la queue de transcription.
+Script pour traiter la file de tâches (table jobs, voir app/db/job_queries.py).
 À exécuter périodiquement pour reprendre les transcriptions interrompues.
 
 Peut être configuré comme un service systemd ou avec cron :
 * * * * * cd /path/to/app && python process_transcription_queue.py >> /path/to/logs/queue_processor.log 2>&1
 """
 
-import os
-import json
 import logging
-import time
-from datetime import datetime, timedelta
 from app.core.config import settings
-from app.services.assemblyai import _process_transcription
-from app.db.queries import get_meeting, update_meeting
+from app.db.job_queries import claim_jobs
+from app.services.leases import PERIODIC_SWEEPS_LEASE, Lease
+from app.services.queue_processor import JOB_HANDLERS, WORKER_ID, import_legacy_queue_files, run_job
 
 # Configuration du logging
 logging.basicConfig(
@@ -24,73 +21,25 @@ logging.basicConfig(
 logger = logging.getLogger('queue-processor')
 
 def process_queue():
-    """Traite tous les fichiers dans le répertoire de queue"""
-    queue_dir = os.path.join(settings.UPLOADS_DIR.parent, "queue")
+    """Exécute les tâches exécutables de la file (table jobs) jusqu'à ce qu'elle soit vide"""
+    # Import de l'ancienne file : par l'instance qui détient le bail des balayages
+    with Lease(PERIODIC_SWEEPS_LEASE, owner=WORKER_ID).hold() as acquired:
+        if acquired:
+            import_legacy_queue_files()
     
-    if not os.path.exists(queue_dir):
-        logger.info(f"Le répertoire de queue n'existe pas encore: {queue_dir}")
-        return
+    processed = 0
+    while True:
+        # Les tâches sont réclamées avec un bail : une instance de l'API ou une autre
+        # exécution de ce script ne peut pas les exécuter en même temps
+        jobs = claim_jobs(WORKER_ID, settings.JOB_BATCH_SIZE, job_types=JOB_HANDLERS)
+        if not jobs:
+            break
+        for job in jobs:
+            run_job(job)
+            processed += 1
     
-    queue_files = [f for f in os.listdir(queue_dir) if f.endswith('.json')]
-    logger.info(f"Traitement de {len(queue_files)} fichiers dans la queue")
-    
-    for queue_file in queue_files:
-        try:
-            queue_file_path = os.path.join(queue_dir, queue_file)
-            
-            # Lire les données du fichier
-            with open(queue_file_path, 'r') as f:
-                data = json.load(f)
-            
-            meeting_id = data.get('meeting_id')
-            file_url = data.get('file_url')
-            user_id = data.get('user_id')
-            created_at = data.get('created_at')
-            
-            # Vérifier l'ancienneté du fichier
-            if created_at:
-                created_datetime = datetime.fromisoformat(created_at)
-                age = datetime.now() - created_datetime
-                # Si le fichier a plus de 24h, considérer qu'il est obsolète
-                if age > timedelta(hours=24):
-                    logger.warning(f"Fichier de queue obsolète (>24h): {queue_file}")
-                    os.remove(queue_file_path)
-                    continue
-            
-            if not all([meeting_id, file_url, user_id]):
-                logger.error(f"Données incomplètes dans le fichier de queue: {queue_file}")
-                continue
-            
-            # Vérifier que la réunion existe et qu'elle est toujours en attente/processing
-            meeting = get_meeting(meeting_id, user_id)
-            if not meeting:
-                logger.warning(f"La réunion {meeting_id} n'existe plus, suppression du fichier de queue")
-                os.remove(queue_file_path)
-                continue
-            
-            status = meeting.get('transcript_status')
-            if status not in ['pending', 'processing']:
-                logger.info(f"La réunion {meeting_id} a déjà le statut {status}, pas besoin de retraitement")
-                os.remove(queue_file_path)
-                continue
-            
-            logger.info(f"Traitement de la transcription pour la réunion {meeting_id} (statut actuel: {status})")
-            
-            # Mettre à jour le statut en "processing" si nécessaire
-            if status == 'pending':
-                update_meeting(meeting_id, user_id, {"transcript_status": "processing"})
-            
-            # Traiter la transcription
-            _process_transcription(meeting_id, file_url, user_id)
-            
-            # Supprimer le fichier de queue
-            os.remove(queue_file_path)
-            logger.info(f"Transcription terminée pour {meeting_id}, fichier de queue supprimé")
-            
-        except Exception as e:
-            logger.error(f"Erreur lors du traitement du fichier {queue_file}: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
+    logger.info(f"{processed} tâche(s) traitée(s)")
+    return processed
 
 if __name__ == "__main__":
     logger.info("Démarrage du processeur de queue de transcription")
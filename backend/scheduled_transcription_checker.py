@@ -5,6 +5,9 @@ Script de vérification périodique des transcriptions
 
 Exemple de configuration cron (vérification toutes les 15 minutes):
 */15 * * * * cd /chemin/vers/MeetingTranscriberBackend && python scheduled_transcription_checker.py >> logs/transcription_checker.log 2>&1
+
+La vérification ne s'exécute que si aucune autre instance (API, worker, autre
+script) ne détient le bail des balayages périodiques (voir app/services/leases.py).
 """
 
 import sqlite3
@@ -16,6 +19,8 @@ import time
 from datetime import datetime
 from pathlib import Path
 
+from app.services.leases import PERIODIC_SWEEPS_LEASE, Lease
+
 # Configuration du logging
 logging.basicConfig(
     level=logging.INFO,
@@ -229,19 +234,24 @@ def main():
     logger.info("=== Démarrage de la vérification périodique des transcriptions ===")
     
     try:
-        # Vérifier les réunions en cours de traitement
-        check_processing_meetings()
-        
-        # Vérifier les réunions en attente (à implémenter si nécessaire)
-        # check_pending_meetings()
+        with Lease(PERIODIC_SWEEPS_LEASE).hold() as acquired:
+            if not acquired:
+                logger.info("Vérification déjà assurée par une autre instance, rien à faire")
+                return
+            
+            # Vérifier les réunions en cours de traitement
+            check_processing_meetings()
+            
+            # Vérifier les réunions en attente (à implémenter si nécessaire)
+            # check_pending_meetings()
         
         logger.info("Vérification terminée avec succès")
     except Exception as e:
         logger.error(f"Erreur lors de la vérification des transcriptions: {str(e)}")
         import traceback
         logger.error(traceback.format_exc())
-    
-    logger.info("=== Fin de la vérification périodique des transcriptions ===")
+    finally:
+        logger.info("=== Fin de la vérification périodique des transcriptions ===")
 
 if __name__ == "__main__":
     main()
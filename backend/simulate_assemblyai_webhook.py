@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Serveur local imitant AssemblyAI pour tester les webhooks de fin de transcription.
+
+Le serveur accepte les uploads et les demandes de transcription comme l'API
+AssemblyAI, puis appelle le webhook_url fourni (avec l'en-tête d'authentification
+demandé) quelques secondes plus tard.
+
+Utilisation:
+    1. Lancer le serveur factice:
+        python simulate_assemblyai_webhook.py serve --port 8765
+    2. Lancer l'API en la pointant vers ce serveur:
+        ASSEMBLYAI_BASE_URL=http://localhost:8765/v2 \\
+        WEBHOOK_BASE_URL=http://localhost:8000 \\
+        ASSEMBLYAI_WEBHOOK_SECRET=dev-secret \\
+        uvicorn app.main:app --port 8000
+    3. Uploader une réunion : la transcription est terminée par webhook.
+
+Pour envoyer manuellement une notification pour une transcription existante:
+    python simulate_assemblyai_webhook.py notify <transcript_id> --api http://localhost:8000 --secret dev-secret
+"""
+
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+TRANSCRIPTS = {}
+
+FAKE_UTTERANCES = [
+    {"speaker": "A", "text": "Bonjour à tous, commençons la réunion."},
+    {"speaker": "B", "text": "Merci, je vais présenter les résultats du trimestre."},
+    {"speaker": "A", "text": "Parfait, nous ferons un point sur les actions ensuite."}
+]
+
+
+def send_webhook(webhook_url, transcript_id, status="completed", header_name=None, header_value=None):
+    """Envoie une notification de fin de transcription au webhook de l'API"""
+    headers = {"content-type": "application/json"}
+    if header_name and header_value:
+        headers[header_name] = header_value
+    response = requests.post(
+        webhook_url,
+        headers=headers,
+        json={"transcript_id": transcript_id, "status": status},
+        timeout=10
+    )
+    print(f"Webhook {transcript_id} -> {webhook_url}: {response.status_code} {response.text}")
+    return response
+
+
+class FakeAssemblyAIHandler(BaseHTTPRequestHandler):
+    delay = 2.0
+
+    def _send_json(self, data, status=200):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            data = b""
+            while True:
+                size = int(self.rfile.readline().strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    return data
+                data += self.rfile.read(size)
+                self.rfile.readline()
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def do_POST(self):
+        body = self._read_body()
+
+        if self.path == "/v2/upload":
+            file_id = uuid.uuid4().hex
+            print(f"Upload reçu: {len(body)} octets")
+            return self._send_json({"upload_url": f"http://{self.headers.get('Host')}/v2/files/{file_id}"})
+
+        if self.path == "/v2/transcript":
+            request = json.loads(body or b"{}")
+            transcript_id = uuid.uuid4().hex
+            TRANSCRIPTS[transcript_id] = {
+                "id": transcript_id,
+                "status": "processing",
+                "audio_url": request.get("audio_url"),
+                "webhook_url": request.get("webhook_url")
+            }
+            print(f"Transcription {transcript_id} démarrée (webhook: {request.get('webhook_url')})")
+
+            if request.get("webhook_url"):
+                def complete():
+                    time.sleep(self.delay)
+                    TRANSCRIPTS[transcript_id]["status"] = "completed"
+                    send_webhook(
+                        request["webhook_url"], transcript_id,
+                        header_name=request.get("webhook_auth_header_name"),
+                        header_value=request.get("webhook_auth_header_value")
+                    )
+                threading.Thread(target=complete, daemon=True).start()
+
+            return self._send_json({"id": transcript_id, "status": "queued"})
+
+        self._send_json({"error": "Not found"}, status=404)
+
+    def do_GET(self):
+        if self.path.startswith("/v2/transcript/"):
+            transcript_id = self.path.rsplit("/", 1)[-1]
+            transcript = TRANSCRIPTS.get(transcript_id, {"id": transcript_id, "status": "completed"})
+            data = dict(transcript)
+            if data["status"] == "completed":
+                data.update({
+                    "text": " ".join(u["text"] for u in FAKE_UTTERANCES),
+                    "utterances": FAKE_UTTERANCES,
+                    "audio_duration": 42
+                })
+            return self._send_json(data)
+
+        if self.path.startswith("/v2/transcript"):
+            return self._send_json({
+                "transcripts": [
+                    {"id": t["id"], "status": t["status"], "audio_url": t.get("audio_url")}
+                    for t in TRANSCRIPTS.values()
+                ],
+                "page_details": {"prev_url": None}
+            })
+
+        self._send_json({"error": "Not found"}, status=404)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulateur de webhooks AssemblyAI")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve = subparsers.add_parser("serve", help="Lancer le serveur AssemblyAI factice")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--delay", type=float, default=2.0, help="Délai avant l'envoi du webhook (secondes)")
+
+    notify = subparsers.add_parser("notify", help="Envoyer une notification pour une transcription")
+    notify.add_argument("transcript_id")
+    notify.add_argument("--api", default="http://localhost:8000")
+    notify.add_argument("--secret", default="")
+    notify.add_argument("--header", default="X-Gilbert-Webhook-Secret")
+    notify.add_argument("--status", default="completed")
+
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        FakeAssemblyAIHandler.delay = args.delay
+        server = ThreadingHTTPServer(("0.0.0.0", args.port), FakeAssemblyAIHandler)
+        print(f"Serveur AssemblyAI factice sur http://localhost:{args.port}/v2")
+        server.serve_forever()
+    else:
+        send_webhook(
+            f"{args.api.rstrip('/')}/webhooks/assemblyai", args.transcript_id, args.status,
+            header_name=args.header, header_value=args.secret
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -29,6 +29,13 @@ fi
 mkdir -p uploads/audio
 mkdir -p logs
 
+# Traitement en arrière-plan dans un processus dédié, arrêté avec l'API
+echo "⚙️ Démarrage du worker de traitement en arrière-plan"
+python -m app.worker &
+WORKER_PID=$!
+trap 'kill -TERM $WORKER_PID 2>/dev/null; wait $WORKER_PID' EXIT
+
 # Lancer l'application avec uvicorn en mode production
+# (les workers web ne lancent pas de traitement en arrière-plan)
 echo "🚀 Démarrage de l'API Meeting Transcriber en mode production"
-uvicorn app.main:app --host 0.0.0.0 --port 8000 --workers 4 --log-level info
+RUN_BACKGROUND_JOBS=false uvicorn app.main:app --host 0.0.0.0 --port 8000 --workers 4 --log-level info
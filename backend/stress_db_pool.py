@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test de charge du pool de connexions SQLite.
+
+Envoie plusieurs centaines de requêtes simultanées à l'application (liste des
+réunions, détail, validation d'IDs) pendant que des threads de fond imitent
+les threads de transcription en mettant à jour des réunions. Vérifie ensuite
+qu'aucune requête n'a échoué, que le nombre de connexions ouvertes n'a jamais
+dépassé DB_POOL_SIZE et que toutes les connexions sont revenues dans le pool.
+
+La base est créée dans un répertoire temporaire (RENDER_DISK_PATH est redéfini
+avant l'import de l'application).
+
+Usage:
+    python stress_db_pool.py [nombre_de_requêtes] [nombre_de_threads_de_fond]
+"""
+
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import timedelta
+
+BENCH_DIR = tempfile.mkdtemp(prefix="gilbert-pool-")
+os.environ["RENDER_DISK_PATH"] = BENCH_DIR
+
+import httpx  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.db import database  # noqa: E402
+from app.db.database import create_user, get_pool_stats  # noqa: E402
+from app.db.queries import create_meeting, get_meeting, update_meeting  # noqa: E402
+from app.main import app  # noqa: E402
+
+DEFAULT_REQUESTS = 500
+DEFAULT_THREADS = 50
+
+
+def setup():
+    user = create_user({
+        "email": f"stress-{uuid.uuid4()}@example.com",
+        "hashed_password": "x",
+        "full_name": "Stress"
+    })
+    meetings = [
+        create_meeting({"title": f"Réunion {i}", "file_url": f"/uploads/{i}.mp3"}, user["id"])
+        for i in range(20)
+    ]
+    token = create_access_token({"sub": user["id"]}, timedelta(hours=1))
+    return user, [m["id"] for m in meetings], token
+
+
+def background_worker(user_id, meeting_ids, index, errors):
+    """Imite un thread de transcription : lectures et écritures hors requête HTTP"""
+    try:
+        meeting_id = meeting_ids[index % len(meeting_ids)]
+        for step in range(5):
+            get_meeting(meeting_id, user_id)
+            update_meeting(meeting_id, user_id, {"speakers_count": step})
+    except Exception as e:
+        errors.append(repr(e))
+
+
+async def run_requests(count, meeting_ids, token):
+    headers = {"Authorization": f"Bearer {token}"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=120) as client:
+        def request(i):
+            kind = i % 3
+            if kind == 0:
+                return client.get("/meetings/", headers=headers)
+            if kind == 1:
+                return client.get(f"/meetings/{meeting_ids[i % len(meeting_ids)]}", headers=headers)
+            return client.post("/meetings/validate-ids", headers=headers,
+                               json=meeting_ids[:5] + [str(uuid.uuid4())])
+
+        responses = await asyncio.gather(*(request(i) for i in range(count)), return_exceptions=True)
+    return Counter(r.status_code if isinstance(r, httpx.Response) else type(r).__name__ for r in responses)
+
+
+def main(count, thread_count):
+    user, meeting_ids, token = setup()
+
+    # Surveille le nombre maximal de connexions ouvertes pendant le test
+    peak = {"open": 0, "in_use": 0}
+    stop = threading.Event()
+
+    def monitor():
+        while not stop.is_set():
+            stats = get_pool_stats()
+            peak["open"] = max(peak["open"], stats["open"])
+            peak["in_use"] = max(peak["in_use"], stats["in_use"])
+            time.sleep(0.001)
+
+    errors = []
+    threads = [threading.Thread(target=monitor, daemon=True)] + [
+        threading.Thread(target=background_worker, args=(user["id"], meeting_ids, i, errors))
+        for i in range(thread_count)
+    ]
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    statuses = asyncio.run(run_requests(count, meeting_ids, token))
+    for thread in threads[1:]:
+        thread.join()
+    stop.set()
+    elapsed = time.perf_counter() - start
+
+    stats = get_pool_stats()
+    print(f"{count} requêtes + {thread_count} threads de fond en {elapsed:.2f}s")
+    print(f"Statuts HTTP: {dict(statuses)}")
+    print(f"Erreurs des threads de fond: {len(errors)}")
+    print(f"Pic de connexions ouvertes: {peak['open']} / DB_POOL_SIZE={settings.DB_POOL_SIZE}")
+    print(f"Métriques du pool: {stats}")
+
+    assert set(statuses) == {200}, f"Requêtes en échec: {dict(statuses)}"
+    assert not errors, errors[:5]
+    assert peak["open"] <= settings.DB_POOL_SIZE, "Le pool a dépassé sa taille maximale"
+    assert stats["in_use"] == 0, "Des connexions n'ont pas été rendues au pool"
+    print("OK")
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_REQUESTS
+    thread_count = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_THREADS
+    try:
+        main(count, thread_count)
+    finally:
+        database.db_pool.close_all()
+        shutil.rmtree(BENCH_DIR, ignore_errors=True)
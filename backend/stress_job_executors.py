@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Test de charge du travail en arrière-plan : rafale d'uploads.
+
+Chaque upload passe par les étapes réelles de l'application : tâche de
+conversion puis tâche de transcription dans la table jobs, réclamées par le
+processeur de file et exécutées dans les pools "convert" et "upload". La conversion ffmpeg et
+l'envoi à AssemblyAI sont remplacés par des attentes (--convert-ms, --upload-ms).
+
+Les uploads refusés par la file de conversion pleine (503 pour le client) sont
+réessayés après une courte attente, comme le ferait le frontend.
+
+Affiche le nombre maximal de threads observé : il reste borné par la taille des
+pools, quel que soit le nombre d'uploads.
+
+La base est créée dans un répertoire temporaire (RENDER_DISK_PATH est redéfini
+avant l'import de l'application).
+
+Usage:
+    python stress_job_executors.py [nombre_d_uploads] [--convert-ms=N] [--upload-ms=N]
+"""
+
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+BENCH_DIR = tempfile.mkdtemp(prefix="gilbert-jobs-")
+os.environ["RENDER_DISK_PATH"] = BENCH_DIR
+os.environ.setdefault("JOB_POLL_INTERVAL", "1")
+
+
+def option(name, default):
+    return next((float(a.split("=", 1)[1]) for a in sys.argv[1:] if a.startswith(f"--{name}=")), default)
+
+
+CONVERT_MS = option("convert-ms", 50)
+UPLOAD_MS = option("upload-ms", 200)
+
+from app.db import database  # noqa: E402
+from app.db.database import create_user  # noqa: E402
+from app.db.job_queries import get_job_counts  # noqa: E402
+from app.db.queries import create_meeting, get_meetings_by_status, update_meeting  # noqa: E402
+from app.services import conversion, queue_processor  # noqa: E402
+from app.services.conversion import ConversionQueueFullError, conversion_stage  # noqa: E402
+from app.services.executors import get_executor_stats  # noqa: E402
+
+DEFAULT_UPLOADS = 200
+
+
+def fake_transcode(source_path, policy):
+    time.sleep(CONVERT_MS / 1000)
+    return source_path, "mp3"
+
+
+def fake_process_transcription(meeting_id, file_url, user_id):
+    time.sleep(UPLOAD_MS / 1000)
+    update_meeting(meeting_id, user_id, {"transcript_status": "processing", "transcript_id": f"tr-{meeting_id}"})
+
+
+conversion.transcode_audio = fake_transcode
+queue_processor.process_transcription = fake_process_transcription
+# Pas de réconciliation auprès d'AssemblyAI pendant le test
+queue_processor.QueueProcessor._check_pending_transcriptions = lambda self: None
+
+
+def setup(count):
+    user = create_user({
+        "email": f"jobs-{uuid.uuid4()}@example.com",
+        "hashed_password": "x",
+        "full_name": "Jobs"
+    })
+    meetings = []
+    for i in range(count):
+        path = os.path.join(BENCH_DIR, f"upload-{i}.mp3")
+        with open(path, "wb") as f:
+            f.write(b"\0" * 1024)
+        meeting = create_meeting({"title": f"Réunion {i}", "file_url": f"/{path}", "transcript_status": "converting"}, user["id"])
+        meetings.append((meeting["id"], user["id"], path))
+    return meetings
+
+
+async def run_burst(meetings):
+    peak_threads = threading.active_count()
+    rejected = 0
+    done = asyncio.Event()
+
+    async def sample_threads():
+        nonlocal peak_threads
+        while not done.is_set():
+            peak_threads = max(peak_threads, threading.active_count())
+            await asyncio.sleep(0.01)
+
+    sampler = asyncio.create_task(sample_threads())
+    await queue_processor.start_queue_processor()
+    start = time.perf_counter()
+
+    for meeting_id, user_id, path in meetings:
+        while True:
+            try:
+                conversion_stage.submit(meeting_id, user_id, path)
+                break
+            except ConversionQueueFullError:
+                rejected += 1
+                await asyncio.sleep(0.05)
+
+    # Attendre que toutes les transcriptions aient été soumises
+    while len(await asyncio.to_thread(get_meetings_by_status, "processing")) < len(meetings) or \
+            any(m.get("transcript_id") is None for m in await asyncio.to_thread(get_meetings_by_status, "processing")):
+        await asyncio.sleep(0.2)
+    elapsed = time.perf_counter() - start
+
+    stats = get_executor_stats()
+    await queue_processor.stop_queue_processor()
+    done.set()
+    await sampler
+    return elapsed, peak_threads, rejected, stats
+
+
+def main(count):
+    meetings = setup(count)
+    threads_before = threading.active_count()
+    elapsed, peak_threads, rejected, stats = asyncio.run(run_burst(meetings))
+
+    print(f"{count} uploads (conversion {CONVERT_MS:.0f} ms, envoi {UPLOAD_MS:.0f} ms) traités en {elapsed:.2f}s")
+    print(f"Threads: {threads_before} au repos, {peak_threads} au maximum pendant la rafale")
+    print(f"Uploads refusés puis réessayés (file de conversion pleine): {rejected}")
+    for name, pool in stats.items():
+        print(f"Pool {name}: {pool}")
+    print(f"Tâches: {get_job_counts()}")
+    assert get_job_counts()["transcription"]["done"] == count
+    print("OK")
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    try:
+        main(int(args[0]) if args else DEFAULT_UPLOADS)
+    finally:
+        database.db_writer.stop()
+        database.db_pool.close_all()
+        shutil.rmtree(BENCH_DIR, ignore_errors=True)
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Test des baux de la table jobs : une tâche plus longue que son bail n'est
+exécutée qu'une fois.
+
+Deux workers (identifiants distincts, comme deux instances de l'API ou deux
+processus `python -m app.worker`) réclament en boucle des tâches qui durent
+plusieurs fois JOB_LEASE_SECONDS :
+    1. sans renouvellement du bail (contrôle) : les tâches sont reprises par
+       l'autre worker pendant leur exécution ;
+    2. avec le heartbeat de run_job : chaque tâche n'est exécutée qu'une fois ;
+    3. bail repris par une autre instance en cours d'exécution : la tâche
+       s'arrête à son prochain point d'annulation, sans enregistrer de résultat.
+
+La base est créée dans un répertoire temporaire (RENDER_DISK_PATH est redéfini
+avant l'import de l'application).
+
+Usage:
+    python stress_job_leases.py [nombre_de_taches] [--lease=S] [--duration=S]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+
+def option(name, default):
+    return next((float(a.split("=", 1)[1]) for a in sys.argv[1:] if a.startswith(f"--{name}=")), default)
+
+
+LEASE_SECONDS = int(option("lease", 2))
+DURATION = option("duration", 5)
+
+BENCH_DIR = tempfile.mkdtemp(prefix="gilbert-leases-")
+os.environ["RENDER_DISK_PATH"] = BENCH_DIR
+os.environ["JOB_LEASE_SECONDS"] = str(LEASE_SECONDS)
+
+from app.db import database  # noqa: E402
+from app.db.database import execute_write  # noqa: E402
+from app.db.job_queries import claim_jobs, enqueue_job, get_job  # noqa: E402
+from app.services import queue_processor  # noqa: E402
+from app.services.job_context import raise_if_job_cancelled  # noqa: E402
+
+DEFAULT_JOBS = 4
+JOB_TYPE = "lease_test"
+
+runs = Counter()
+runs_lock = threading.Lock()
+
+
+def long_job(payload):
+    with runs_lock:
+        runs[payload["n"]] += 1
+    deadline = time.monotonic() + payload["duration"]
+    while time.monotonic() < deadline:
+        raise_if_job_cancelled()
+        time.sleep(0.1)
+
+
+def run_workers(count):
+    """Deux workers réclament les tâches jusqu'à ce qu'elles soient toutes terminées"""
+    runs.clear()
+    jobs = [enqueue_job(JOB_TYPE, {"n": n, "duration": DURATION})["id"] for n in range(count)]
+    threads = []
+    stop = threading.Event()
+
+    def worker(worker_id):
+        while not stop.is_set():
+            for job in claim_jobs(worker_id, 1, job_types=[JOB_TYPE]):
+                thread = threading.Thread(target=queue_processor.run_job, args=(job, worker_id))
+                thread.start()
+                threads.append(thread)
+            time.sleep(0.2)
+
+    workers = [threading.Thread(target=worker, args=(f"worker-{i}",)) for i in (1, 2)]
+    for thread in workers:
+        thread.start()
+    deadline = time.monotonic() + DURATION * 4 + 10
+    while time.monotonic() < deadline and any(get_job(job_id)["state"] != "done" for job_id in jobs):
+        time.sleep(0.2)
+    stop.set()
+    for thread in workers + threads:
+        thread.join()
+    return jobs
+
+
+def main(count):
+    queue_processor.JOB_HANDLERS[JOB_TYPE] = long_job
+    print(f"{count} tâche(s) de {DURATION:.0f}s, bail de {LEASE_SECONDS}s, 2 workers")
+
+    # 1. Contrôle : heartbeat sans effet, le bail expire pendant l'exécution
+    extend_job_lease = queue_processor.extend_job_lease
+    queue_processor.extend_job_lease = lambda *args, **kwargs: True
+    run_workers(count)
+    duplicated = sum(1 for n in range(count) if runs[n] > 1)
+    print(f"Sans renouvellement du bail : {sum(runs.values())} exécution(s), {duplicated} tâche(s) exécutée(s) plusieurs fois")
+    assert duplicated > 0
+    queue_processor.extend_job_lease = extend_job_lease
+
+    # 2. Heartbeat de run_job
+    jobs = run_workers(count)
+    print(f"Avec heartbeat : {sum(runs.values())} exécution(s)")
+    assert all(runs[n] == 1 for n in range(count)), runs
+    assert all(get_job(job_id)["state"] == "done" and get_job(job_id)["attempts"] == 1 for job_id in jobs)
+
+    # 3. Bail repris par une autre instance : annulation coopérative
+    runs.clear()
+    job = enqueue_job(JOB_TYPE, {"n": 0, "duration": DURATION})
+    job = claim_jobs("worker-1", 1, job_types=[JOB_TYPE])[0]
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(ok=queue_processor.run_job(job, "worker-1")))
+    thread.start()
+    time.sleep(0.5)
+    execute_write(lambda conn: conn.execute("UPDATE jobs SET lease_owner = 'thief' WHERE id = ?", (job["id"],)))
+    started = time.monotonic()
+    thread.join()
+    stopped_after = time.monotonic() - started
+    stored = get_job(job["id"])
+    print(f"Bail repris : exécution interrompue après {stopped_after:.1f}s, tâche {stored['state']} ({stored['lease_owner']})")
+    assert result["ok"] is False and stopped_after < LEASE_SECONDS
+    assert stored["state"] == "running" and stored["lease_owner"] == "thief"
+    print("OK")
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    try:
+        main(int(args[0]) if args else DEFAULT_JOBS)
+    finally:
+        database.db_writer.stop()
+        database.db_pool.close_all()
+        shutil.rmtree(BENCH_DIR, ignore_errors=True)
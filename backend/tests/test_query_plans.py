@@ -0,0 +1,111 @@
+"""
+Test de non-régression des plans d'exécution des requêtes fréquentes sur meetings.
+
+Chaque requête est capturée telle qu'exécutée par app.db.queries (paramètres
+inclus), puis passée à EXPLAIN QUERY PLAN : aucune ne doit parcourir toute la
+table ni trier les résultats dans un B-tree temporaire.
+
+Usage:
+    python -m pytest tests/test_query_plans.py
+    python tests/test_query_plans.py
+"""
+
+import os
+import sys
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+
+# Base temporaire : RENDER_DISK_PATH doit être défini avant l'import de l'application
+os.environ["RENDER_DISK_PATH"] = tempfile.mkdtemp(prefix="gilbert-plans-")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.database import execute_write, get_db_connection, release_db_connection  # noqa: E402
+from app.db.queries import (  # noqa: E402
+    encode_meeting_cursor,
+    get_meetings_by_status,
+    get_meetings_by_status_page,
+    get_pending_transcriptions,
+    list_meetings_page,
+)
+
+USER_ID = f"plan-{uuid.uuid4()}"
+
+
+def populate():
+    """Ajoute quelques réunions pour que les requêtes paginées aient des données"""
+    start = datetime.utcnow() - timedelta(hours=1)
+    execute_write(lambda conn: conn.executemany(
+        """
+        INSERT INTO meetings (id, user_id, title, file_url, transcript_status, summary_status, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (str(uuid.uuid4()), USER_ID, f"Réunion {i}", f"/uploads/{i}.mp3",
+             ("pending", "processing", "completed")[i % 3], ("processing", "completed")[i % 2],
+             (start + timedelta(minutes=i)).isoformat())
+            for i in range(30)
+        ]
+    ))
+
+
+def capture_statements(func):
+    """Exécute func et retourne les SELECT envoyés à SQLite (paramètres développés)"""
+    statements = []
+    conn = get_db_connection()
+    conn.set_trace_callback(statements.append)
+    try:
+        func()
+    finally:
+        conn.set_trace_callback(None)
+        release_db_connection(conn)
+    return [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+
+
+def query_plan(statement):
+    conn = get_db_connection()
+    try:
+        rows = conn.execute(f"EXPLAIN QUERY PLAN {statement}").fetchall()
+        return [row["detail"] for row in rows]
+    finally:
+        release_db_connection(conn)
+
+
+def assert_indexed(label, func):
+    statements = capture_statements(func)
+    assert statements, f"{label}: aucune requête exécutée"
+    for statement in statements:
+        plan = query_plan(statement)
+        full_scans = [d for d in plan if d.startswith("SCAN meetings")]
+        temp_sorts = [d for d in plan if "TEMP B-TREE" in d]
+        assert not full_scans, f"{label}: parcours complet de la table ({plan})"
+        assert not temp_sorts, f"{label}: tri temporaire ({plan})"
+
+
+def cursor_for(meetings):
+    return encode_meeting_cursor(meetings[len(meetings) // 2])
+
+
+def test_hot_meeting_queries_use_indexes():
+    populate()
+    first_page, _ = list_meetings_page(USER_ID, limit=10)
+    processing_page, _ = get_meetings_by_status_page("processing", limit=5)
+
+    cases = {
+        "liste des réunions": lambda: list_meetings_page(USER_ID),
+        "liste des réunions (page suivante)": lambda: list_meetings_page(USER_ID, limit=10, cursor=cursor_for(first_page)),
+        "liste des réunions par statut": lambda: list_meetings_page(USER_ID, status="completed", limit=10),
+        "transcriptions en attente": lambda: get_pending_transcriptions(),
+        "réunions par statut": lambda: get_meetings_by_status("processing"),
+        "réunions par statut (page suivante)": lambda: get_meetings_by_status_page(
+            "processing", limit=5, cursor=cursor_for(processing_page)
+        ),
+        "résumés en cours": lambda: get_meetings_by_status_page("processing", status_column="summary_status"),
+    }
+    for label, func in cases.items():
+        assert_indexed(label, func)
+
+
+if __name__ == "__main__":
+    test_hot_meeting_queries_use_indexes()
+    print("Plans d'exécution OK")
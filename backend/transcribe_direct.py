@@ -10,7 +10,7 @@ import logging
 import json
 import uuid
 from dotenv import load_dotenv
-from app.db.database import get_db_connection, release_db_connection
+from app.db.database import execute_write
 from app.db.queries import update_meeting, get_meeting
 from app.services.assemblyai import transcribe_with_sdk
 
@@ -26,27 +26,22 @@ logger = logging.getLogger('transcribe-direct')
 
 def create_meeting(user_id, title, file_url):
     """Crée une nouvelle réunion dans la base de données"""
-    conn = get_db_connection()
     try:
-        cursor = conn.cursor()
         meeting_id = str(uuid.uuid4())
         
-        cursor.execute(
+        execute_write(lambda conn: conn.execute(
             """
             INSERT INTO meetings (id, user_id, title, recording_url, transcript_status, created_at)
             VALUES (?, ?, ?, ?, ?, datetime('now'))
             """,
             (meeting_id, user_id, title, file_url, "pending")
-        )
+        ))
         
-        conn.commit()
         logger.info(f"Nouvelle réunion créée: {meeting_id}")
         return meeting_id
     except Exception as e:
         logger.error(f"Erreur lors de la création de la réunion: {str(e)}")
         return None
-    finally:
-        release_db_connection(conn)
 
 def transcribe_and_update(audio_url, meeting_id=None, user_id=None, title=None):
     """
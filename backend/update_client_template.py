@@ -4,7 +4,7 @@ Script pour mettre u00e0 jour le modu00e8le de compte rendu d'un client
 """
 
 import logging
-from app.db.database import get_db_connection, release_db_connection
+from app.db.database import get_db_connection, release_db_connection, execute_write
 
 # Configuration du logging
 logging.basicConfig(
@@ -73,12 +73,10 @@ def update_client_template(client_id, new_template):
             return False
         
         # Mettre u00e0 jour le modu00e8le de compte rendu
-        cursor.execute(
+        execute_write(lambda write_conn: write_conn.execute(
             "UPDATE clients SET summary_template = ? WHERE id = ?",
             (new_template, client_id)
-        )
-        
-        conn.commit()
+        ))
         
         logger.info(f"Modu00e8le mis u00e0 jour pour le client {client['name']}")
         
@@ -21,7 +21,7 @@ export interface Meeting {
   name?: string;
   title?: string; 
   file_url?: string;
-  transcript_status: 'pending' | 'processing' | 'completed' | 'error' | 'deleted';
+  transcript_status: 'pending' | 'converting' | 'processing' | 'completed' | 'error' | 'deleted';
   transcript_text?: string;
   user_id: string;
   created_at: string;
@@ -51,7 +51,7 @@ export interface Meeting {
 export interface TranscriptResponse {
   meeting_id: string;
   transcript_text: string;
-  transcript_status: 'pending' | 'processing' | 'completed' | 'error' | 'deleted';
+  transcript_status: 'pending' | 'converting' | 'processing' | 'completed' | 'error' | 'deleted';
   error?: string; // Message d'erreur éventuel
   utterances?: Array<{
     speaker: string;